@@ -0,0 +1,158 @@
+"""
+Per-request overhead of the throttling middleware: the former
+`BaseHTTPMiddleware` implementation vs the plain ASGI one.
+
+Requests are sent straight to the ASGI app (no server, no sockets), so
+the numbers are the cost of the middleware stack itself. `/echo` is
+throttled, `/healthcheck` is in the exempt paths of the ASGI middleware.
+
+    PYTHONPATH=. uv run python benchmarks/middleware_overhead.py -n 20000
+"""
+
+import asyncio
+import math
+import os
+import statistics
+import time
+
+import click
+
+# every request must pass, the buckets are not what is measured
+os.environ.setdefault("THROTTLING_BACKEND", "local")
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000000")
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import (
+    BaseHTTPMiddleware,
+    RequestResponseEndpoint,
+)
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp
+
+from ml_service.api.middlewares import ThrottlingMiddleware
+from ml_service.settings.config import config
+from ml_service.settings.metrics import Counters
+from ml_service.utils.rate_limit import create_rate_limiter, request_cost
+
+
+class LegacyThrottlingMiddleware(BaseHTTPMiddleware):
+    """The `BaseHTTPMiddleware` version the ASGI middleware replaced."""
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(app)
+        self.limiter = create_rate_limiter(config.throttling)
+        self.cost_per_mb = config.throttling.cost_per_mb
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        client_ip = request.client.host if request.client else "unknown"
+        cost = 1.0
+        if self.cost_per_mb:
+            length = request.headers.get("content-length", "")
+            cost = request_cost(
+                int(length) if length.isdigit() else 0, self.cost_per_mb
+            )
+
+        allowed, retry_after = self.limiter.acquire(client_ip, cost)
+        if not allowed:
+            Counters.REJECTED_REQUESTS.value.inc()
+            headers = (
+                {"Retry-After": str(math.ceil(retry_after))}
+                if math.isfinite(retry_after)
+                else None
+            )
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Too Many Requests"},
+                headers=headers,
+            )
+
+        Counters.SUCCESSFUL_REQUESTS.value.inc()
+        return await call_next(request)
+
+
+def build_app(middleware: type | None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/echo")
+    async def echo() -> dict:
+        return {"status": "ok"}
+
+    @app.get("/healthcheck")
+    async def healthcheck() -> dict:
+        return {"status": "ok"}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def request(app: ASGIApp, path: str) -> int:
+    status = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app: ASGIApp, path: str, requests: int, rounds: int) -> list[float]:
+    for _ in range(min(requests, 1000)):  # warm up (routing, lazy imports)
+        assert await request(app, path) == 200
+    per_request = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await request(app, path)
+        per_request.append((time.perf_counter() - start) / requests)
+    return per_request
+
+
+@click.command()
+@click.option("--requests", "-n", default=10000, show_default=True)
+@click.option("--rounds", "-r", default=5, show_default=True)
+def main(requests: int, rounds: int) -> None:
+    variants = {
+        "none": build_app(None),
+        "basehttp": build_app(LegacyThrottlingMiddleware),
+        "asgi": build_app(ThrottlingMiddleware),
+    }
+
+    async def run() -> None:
+        click.echo(f"{'middleware':<10} {'path':<13} {'median':>9} {'overhead':>9}")
+        for path in ("/echo", "/healthcheck"):
+            baseline = None
+            for name, app in variants.items():
+                median = statistics.median(await measure(app, path, requests, rounds))
+                baseline = median if baseline is None else baseline
+                click.echo(
+                    f"{name:<10} {path:<13} {median * 1e6:>7.1f}us"
+                    f" {(median - baseline) * 1e6:>7.1f}us"
+                )
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Latency vs accuracy of OCR preprocessing presets.
+
+Every image in DATASET with a ground truth `<name>.txt` next to it is
+recognised by each engine twice: on the original upload and with the
+engine preset from `ml_service.domains.ocr.preprocessing.PRESETS`.
+
+    PYTHONPATH=. uv run python benchmarks/ocr_preprocessing.py photos/ -e tesseract -e easyocr
+
+Accuracy is 1 - CER (character error rate, whitespace-insensitive).
+"""
+
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import click
+
+from ml_service.domains.ocr.base import BaseOCRHandler
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.preprocessing import PRESETS, Preprocessing
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+
+
+def create_handler(engine: str) -> BaseOCRHandler:
+    match engine:
+        case "tesseract":
+            from ml_service.domains.ocr.tesseract import TesseractOCRHandler
+
+            return TesseractOCRHandler()
+        case "easyocr":
+            from ml_service.domains.ocr.easy_ocr import EasyOCRHandler
+
+            return EasyOCRHandler()
+        case _:
+            raise click.BadParameter(f"Unsupported engine: {engine}")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def char_error_rate(reference: str, hypothesis: str) -> float:
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    if not reference:
+        return float(bool(hypothesis))
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_char != hyp_char),
+                )
+            )
+        previous = current
+    return min(previous[-1] / len(reference), 1.0)
+
+
+def run_once(
+    handler: BaseOCRHandler, data: bytes, preprocessing: Preprocessing | None
+) -> tuple[float, float, str, tuple[int, int]]:
+    envelope = ImageEnvelope(data)
+    envelope.decode()
+
+    start = time.perf_counter()
+    prepared = preprocessing.apply(envelope) if preprocessing else envelope
+    prepared.image.load()
+    preprocess_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = handler._process_image(prepared)
+    ocr_time = time.perf_counter() - start
+    return preprocess_time, ocr_time, result.text, prepared.image.size
+
+
+@click.command()
+@click.argument(
+    "dataset", type=click.Path(exists=True, file_okay=False, path_type=Path)
+)
+@click.option(
+    "--engine",
+    "-e",
+    "engines",
+    multiple=True,
+    default=["tesseract"],
+    show_default=True,
+)
+@click.option("--repeat", "-n", default=1, show_default=True, help="Runs per image.")
+def main(dataset: Path, engines: tuple[str, ...], repeat: int) -> None:
+    samples = [
+        (path, path.with_suffix(".txt").read_text(encoding="utf-8"))
+        for path in sorted(dataset.iterdir())
+        if path.suffix.lower() in IMAGE_SUFFIXES and path.with_suffix(".txt").exists()
+    ]
+    if not samples:
+        raise click.UsageError(f"No images with ground truth found in {dataset}")
+
+    click.echo(
+        f"{'engine':<10} {'variant':<8} {'megapixels':>10} {'preprocess':>11}"
+        f" {'ocr':>9} {'total':>9} {'accuracy':>9}"
+    )
+    for engine in engines:
+        handler = create_handler(engine)
+        variants = {"original": None, "preset": PRESETS.get(engine)}
+        for variant, preprocessing in variants.items():
+            stats: dict[str, list[float]] = defaultdict(list)
+            for path, reference in samples:
+                data = path.read_bytes()
+                for _ in range(repeat):
+                    pre, ocr, text, (width, height) = run_once(
+                        handler, data, preprocessing
+                    )
+                    stats["megapixels"].append(width * height / 1e6)
+                    stats["preprocess"].append(pre)
+                    stats["ocr"].append(ocr)
+                    stats["total"].append(pre + ocr)
+                    stats["accuracy"].append(1 - char_error_rate(reference, text))
+
+            mean = {key: statistics.fmean(values) for key, values in stats.items()}
+            click.echo(
+                f"{engine:<10} {variant:<8} {mean['megapixels']:>10.1f}"
+                f" {mean['preprocess'] * 1000:>9.0f}ms {mean['ocr'] * 1000:>7.0f}ms"
+                f" {mean['total'] * 1000:>7.0f}ms {mean['accuracy']:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
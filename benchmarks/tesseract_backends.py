@@ -0,0 +1,115 @@
+"""
+Tesseract backends: in-process C API vs a `tesseract` subprocess per image.
+
+Every image in DATASET is recognised `--repeat` times by each backend,
+sequentially and from `--threads` threads at once (the C API keeps one
+engine per thread, the first call of each thread includes initialization
+and is excluded).
+
+    PYTHONPATH=. uv run python benchmarks/tesseract_backends.py photos/ -t 4
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import click
+
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.preprocessing import PRESETS
+from ml_service.domains.ocr.tesseract import TesseractOCRHandler, capi
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+
+
+def load_images(dataset: Path, preprocess: bool) -> list[ImageEnvelope]:
+    images = []
+    for path in sorted(dataset.iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        envelope = ImageEnvelope(path.read_bytes())
+        if preprocess:
+            envelope = PRESETS["tesseract"].apply(envelope)
+        # decode up front, only recognition is measured
+        envelope.decode()
+        _ = envelope.array
+        images.append(envelope)
+    return images
+
+
+def timed(handler: TesseractOCRHandler, image: ImageEnvelope) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = handler._process_image(image)
+    return time.perf_counter() - start, result.text
+
+
+@click.command()
+@click.argument(
+    "dataset", type=click.Path(exists=True, file_okay=False, path_type=Path)
+)
+@click.option("--repeat", "-n", default=3, show_default=True, help="Runs per image.")
+@click.option("--threads", "-t", default=4, show_default=True)
+@click.option("--psm", default=3, show_default=True)
+@click.option("--oem", default=3, show_default=True)
+@click.option("--lang", default="rus+eng", show_default=True)
+@click.option("--preprocess/--no-preprocess", default=True, show_default=True)
+def main(
+    dataset: Path,
+    repeat: int,
+    threads: int,
+    psm: int,
+    oem: int,
+    lang: str,
+    preprocess: bool,
+) -> None:
+    images = load_images(dataset, preprocess)
+    if not images:
+        raise click.UsageError(f"No images found in {dataset}")
+
+    backends = ["subprocess"] + (["capi"] if capi.is_available() else [])
+    if len(backends) == 1:
+        click.echo("libtesseract is not installed, measuring the subprocess only")
+
+    texts: dict[str, list[str]] = {}
+    click.echo(
+        f"{'backend':<11} {'mean':>9} {'p95':>9} {'images/s':>9}"
+        f" {'images/s x' + str(threads):>13}"
+    )
+    for backend in backends:
+        handler = TesseractOCRHandler(lang=lang, psm=psm, oem=oem, backend=backend)
+        timed(handler, images[0])  # warm up (engine init, page cache)
+
+        latencies = []
+        for _ in range(repeat):
+            for image in images:
+                latency, _ = timed(handler, image)
+                latencies.append(latency)
+        texts[backend] = [timed(handler, image)[1] for image in images]
+
+        jobs = images * repeat
+        with ThreadPoolExecutor(threads) as pool:
+            list(
+                pool.map(
+                    lambda image, handler=handler: timed(handler, image),
+                    images[:1] * threads,
+                )
+            )
+            start = time.perf_counter()
+            list(pool.map(lambda image, handler=handler: timed(handler, image), jobs))
+            parallel = len(jobs) / (time.perf_counter() - start)
+
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+        click.echo(
+            f"{backend:<11} {statistics.fmean(latencies) * 1000:>7.0f}ms"
+            f" {p95 * 1000:>7.0f}ms {1 / statistics.fmean(latencies):>9.2f}"
+            f" {parallel:>13.2f}"
+        )
+
+    if len(texts) == 2:
+        same = sum(a == b for a, b in zip(texts["subprocess"], texts["capi"]))
+        click.echo(f"identical text: {same}/{len(images)} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import uvicorn
 
 from ml_service.settings.logger import logger
 from ml_service.settings.config import config
+from ml_service.domains.ocr.model_host import start_model_host
+from ml_service.utils.rate_limit import init_shared_state, remove_shared_state
 
 
 def main():
@@ -10,11 +12,20 @@ def main():
 
 if __name__ == "__main__":
     logger.warning(config)
-    uvicorn.run(
-        "ml_service.app:app",
-        host=config.app.host,
-        port=config.app.port,
-        workers=config.app.workers,
-        reload=config.reload,
-        log_config=None,  # Disable Uvicorn's default logging config to use our custom logger
-    )
+    # workers attach to one throttling table shared by the whole host
+    init_shared_state(config.throttling)
+    # models are loaded once here instead of in every uvicorn worker
+    model_host = start_model_host(config.ocr) if config.ocr.model_host else None
+    try:
+        uvicorn.run(
+            "ml_service.app:app",
+            host=config.app.host,
+            port=config.app.port,
+            workers=config.app.workers,
+            reload=config.reload,
+            log_config=None,  # Disable Uvicorn's default logging config to use our custom logger
+        )
+    finally:
+        if model_host is not None:
+            model_host.shutdown()
+        remove_shared_state(config.throttling)
@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
+from ml_service.db import models  # noqa: F401, registers the tables
+from ml_service.db.database import Base
 from ml_service.settings.logger import logger
 from ml_service.settings.config import config as app_config
 
@@ -15,12 +17,14 @@ logger.info("Alembic environment starting up...")
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
+# "%" must be escaped for the ini interpolation
+config.set_main_option("sqlalchemy.url", app_config.database.url.replace("%", "%%"))
 
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
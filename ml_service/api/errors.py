@@ -0,0 +1,20 @@
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from ml_service.utils.executors import ExecutorSaturatedError
+
+# executor tasks take a fraction of a second to a few seconds
+SATURATED_RETRY_AFTER = 1
+
+
+async def executor_saturated_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Back-pressure of a full executor is an overload (503), not a server error."""
+    return JSONResponse(
+        {"detail": "Service is overloaded, retry later"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(SATURATED_RETRY_AFTER)},
+    )
+
+
+def add_exception_handlers(app: FastAPI) -> None:
+    app.add_exception_handler(ExecutorSaturatedError, executor_saturated_handler)
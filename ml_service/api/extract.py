@@ -0,0 +1,145 @@
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from PIL import UnidentifiedImageError
+
+from ml_service.api.schemas import (
+    ExtractResponse,
+    FieldSchema,
+    MultiPageResponse,
+    OCRSchema,
+)
+from ml_service.domains.extractors.base import ExtractionField
+from ml_service.domains.ocr.base import OCRResult
+from ml_service.domains.ocr.pages import TooManyPagesError, UnsupportedDocumentError
+from ml_service.domains.pipeline import ExtractionPipeline, PipelineResult
+from ml_service.settings.config import config
+from ml_service.utils.executors import ExecutorSaturatedError
+
+extract_router = APIRouter(prefix="/extract", tags=["extract"])
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def read_upload(file: UploadFile, max_size: int) -> bytes:
+    """
+    Reads the upload chunk by chunk, rejecting it as soon as it exceeds `max_size`
+    instead of buffering an arbitrarily large body.
+    """
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer.extend(chunk)
+        if len(buffer) > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Upload exceeds {max_size} bytes",
+            )
+    if not buffer:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Empty upload"
+        )
+    return bytes(buffer)
+
+
+def get_pipeline(request: Request) -> ExtractionPipeline:
+    return request.app.state.pipeline
+
+
+@extract_router.post("")
+async def extract(
+    request: Request, response: Response, file: UploadFile
+) -> ExtractResponse:
+    """
+    photo -> OCR -> LLM -> JSON.
+    Per-stage timings are returned in the body and in the `Server-Timing` header.
+    """
+    data = await read_upload(file, config.ocr.max_upload_size)
+    try:
+        result = await get_pipeline(request).run(data)
+    except UnidentifiedImageError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Uploaded file is not a supported image",
+        ) from exc
+
+    response.headers["Server-Timing"] = result.timings.server_timing()
+    return ExtractResponse.from_result(result)
+
+
+@extract_router.post("/pages")
+async def extract_pages(
+    request: Request, response: Response, files: list[UploadFile]
+) -> MultiPageResponse:
+    """
+    Several photos and/or PDFs of one document -> one record.
+    Every page is recognised and extracted separately, the results are
+    returned per page and merged.
+    """
+    pipeline = get_pipeline(request)
+    try:
+        # every upload is at least one page, too many files are rejected unread
+        if len(files) > pipeline.max_pages:
+            raise TooManyPagesError(len(files), pipeline.max_pages)
+        uploads = [
+            await read_upload(file, config.ocr.max_upload_size) for file in files
+        ]
+        result = await pipeline.run_pages(uploads)
+    except TooManyPagesError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+        ) from exc
+    except UnsupportedDocumentError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc)
+        ) from exc
+    except UnidentifiedImageError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Uploaded file is not a supported image or PDF",
+        ) from exc
+
+    response.headers["Server-Timing"] = result.timings.server_timing()
+    return MultiPageResponse.from_result(result)
+
+
+def sse_event(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@extract_router.post("/stream")
+async def extract_stream(request: Request, file: UploadFile) -> StreamingResponse:
+    """
+    photo -> OCR -> LLM -> JSON as server-sent events: `ocr` once the text is
+    recognised, `field` for every extracted field as soon as the model has
+    generated it, `done` with the whole response (as `POST /extract`).
+    """
+    data = await read_upload(file, config.ocr.max_upload_size)
+    pipeline = get_pipeline(request)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for item in pipeline.astream(data):
+                match item:
+                    case OCRResult():
+                        schema = OCRSchema.from_result(item)
+                        yield sse_event("ocr", schema.model_dump_json())
+                    case ExtractionField():
+                        schema = FieldSchema.from_field(item)
+                        yield sse_event("field", schema.model_dump_json())
+                    case PipelineResult():
+                        schema = ExtractResponse.from_result(item)
+                        yield sse_event("done", schema.model_dump_json())
+        except UnidentifiedImageError:
+            yield sse_event(
+                "error", '{"detail": "Uploaded file is not a supported image"}'
+            )
+        except ExecutorSaturatedError:
+            # the response has started, the handler of POST /extract can not answer
+            yield sse_event("error", '{"detail": "Service is overloaded, retry later"}')
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
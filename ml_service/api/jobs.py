@@ -0,0 +1,82 @@
+import asyncio
+import contextlib
+
+from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+
+from ml_service.api.extract import read_upload
+from ml_service.api.schemas import JobSchema
+from ml_service.domains.jobs import Job, JobQueue, JobQueueFull
+from ml_service.settings.config import config
+
+jobs_router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    queue = getattr(request.app.state, "jobs", None)
+    if queue is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Jobs are disabled"
+        )
+    return queue
+
+
+async def get_job(queue: JobQueue, job_id: str) -> Job:
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No such job")
+    return job
+
+
+@jobs_router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(request: Request, file: UploadFile) -> JobSchema:
+    """
+    Queues photo -> OCR -> LLM -> JSON and returns at once with the job id.
+    When the backlog is full the job is rejected with 503 and `Retry-After`.
+    """
+    queue = get_job_queue(request)
+    data = await read_upload(file, config.ocr.max_upload_size)
+    try:
+        job = await queue.submit(data)
+    except JobQueueFull as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue is full",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    return JobSchema.from_job(job)
+
+
+@jobs_router.get("/{job_id}")
+async def read_job(
+    request: Request,
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish"),
+) -> JobSchema:
+    """Long-poll: with `wait` answers once the job is finished or `wait` is over."""
+    queue = get_job_queue(request)
+    job = await get_job(queue, job_id)
+    if wait and not job.status.finished:
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(min(wait, config.jobs.max_wait)):
+                async for job in queue.watch(job_id):
+                    pass
+    return JobSchema.from_job(job)
+
+
+@jobs_router.get("/{job_id}/events")
+async def job_events(request: Request, job_id: str) -> StreamingResponse:
+    """Server-sent events: one `status` event per status change, until the job is finished."""
+    queue = get_job_queue(request)
+    await get_job(queue, job_id)
+
+    async def events():
+        async for job in queue.watch(job_id):
+            data = JobSchema.from_job(job).model_dump_json()
+            yield f"event: status\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
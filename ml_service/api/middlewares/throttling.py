@@ -1,59 +1,67 @@
 """Throttling middleware for the FastAPI application."""
 
-import time
-from collections import defaultdict
+import math
+from collections.abc import Iterable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ml_service.settings.config import config
 from ml_service.settings.metrics import Counters
+from ml_service.utils.rate_limit import create_rate_limiter, request_cost
 
 
-class ThrottlingMiddleware(BaseHTTPMiddleware):
+class ThrottlingMiddleware:
     """
     Middleware to throttle requests based on IP address.
 
-    This middleware limits the number of requests an IP address can make
-    within a specified time window (defaults to 60 seconds).
+    Every IP address gets a token bucket refilled at `rate_limit_per_minute`
+    tokens per minute, see `ml_service.utils.rate_limit`. A request costs
+    one token plus `cost_per_mb` tokens per uploaded megabyte.
+
+    Plain ASGI: allowed requests are passed through untouched (no extra task,
+    no body wrapping), `exempt_paths` (probes, metrics) skip it entirely.
     """
 
-    def __init__(self, app):
-        super().__init__(app)
-        self.requests = defaultdict(list)
-        self.rate_limit = config.throttling.rate_limit_per_minute
-        self.time_window = 60  # in seconds
-
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        """
-        Dispatch method to process incoming requests and apply throttling.
-
-        Args:
-            request: The incoming request.
-            call_next: The next middleware or endpoint to call.
-
-        Returns:
-            The response from the next middleware or endpoint, or a
-            JSONResponse with a 429 status code if the rate limit is exceeded.
-        """
-        client_ip = request.client.host if request.client else "unknown"
-        request_time = time.time()
-
-        # Remove timestamps outside the current time window
-        self.requests[client_ip] = [
-            t for t in self.requests[client_ip] if t > request_time - self.time_window
-        ]
-
-        if len(self.requests[client_ip]) >= self.rate_limit:
+    def __init__(self, app: ASGIApp, exempt_paths: Iterable[str] | None = None):
+        self.app = app
+        self.limiter = create_rate_limiter(config.throttling)
+        self.cost_per_mb = config.throttling.cost_per_mb
+        self.exempt_paths = frozenset(
+            config.throttling.exempt_paths if exempt_paths is None else exempt_paths
+        )
+
+    def _cost(self, scope: Scope) -> float:
+        if not self.cost_per_mb:
+            return 1.0
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                length = int(value) if value.isdigit() else 0
+                return request_cost(length, self.cost_per_mb)
+        return 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        allowed, retry_after = self.limiter.acquire(client_ip, self._cost(scope))
+        if not allowed:
             Counters.REJECTED_REQUESTS.value.inc()
-            return JSONResponse(
+            headers = (
+                {"Retry-After": str(math.ceil(retry_after))}
+                if math.isfinite(retry_after)
+                else None
+            )
+            response = JSONResponse(
                 status_code=429,
                 content={"detail": "Too Many Requests"},
+                headers=headers,
             )
+            await response(scope, receive, send)
+            return
 
-        self.requests[client_ip].append(request_time)
         Counters.SUCCESSFUL_REQUESTS.value.inc()
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 
 from ml_service.api.default import default_router
+from ml_service.api.extract import extract_router
+from ml_service.api.jobs import jobs_router
 
 
 router = APIRouter()
 router.include_router(default_router)
+router.include_router(extract_router)
+router.include_router(jobs_router)
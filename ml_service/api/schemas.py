@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+from ml_service.domains.extractors.base import ExtractionField, ExtractionResult
+from ml_service.domains.jobs import Job, JobStatus
+from ml_service.domains.ocr.base import OCRResult
+from ml_service.domains.pipeline import MultiPageResult, PipelineResult
+
+
+def _error_str(error: str | Exception | None) -> str | None:
+    return str(error) if error else None
+
+
+class FieldSchema(BaseModel):
+    field: str
+    value: Any
+    confidence: float
+    error: str | None = None
+
+    @classmethod
+    def from_field(cls, field: ExtractionField) -> "FieldSchema":
+        return cls(
+            field=field.field,
+            value=field.value,
+            confidence=field.confidence,
+            error=_error_str(field.error),
+        )
+
+
+class OCRSchema(BaseModel):
+    text: str
+    confidence: float
+    engine: str
+    error: str | None = None
+
+    @classmethod
+    def from_result(cls, result: OCRResult) -> "OCRSchema":
+        return cls(
+            text=result.text,
+            confidence=result.confidence,
+            engine=result.engine,
+            error=_error_str(result.error),
+        )
+
+
+class ExtractionSchema(BaseModel):
+    fields: list[FieldSchema]
+    confidence: float
+    source: str
+    error: str | None = None
+
+    @classmethod
+    def from_result(cls, result: ExtractionResult) -> "ExtractionSchema":
+        return cls(
+            fields=[FieldSchema.from_field(f) for f in result.content or []],
+            confidence=result.confidence,
+            source=result.source.name,
+            error=_error_str(result.error),
+        )
+
+
+class ExtractResponse(BaseModel):
+    ocr: OCRSchema
+    extraction: ExtractionSchema
+    timings: dict[str, float]  # seconds per pipeline stage
+
+    @classmethod
+    def from_result(cls, result: PipelineResult) -> "ExtractResponse":
+        return cls(
+            ocr=OCRSchema.from_result(result.ocr),
+            extraction=ExtractionSchema.from_result(result.extraction),
+            timings=result.timings.as_dict(),
+        )
+
+
+class MultiPageResponse(BaseModel):
+    pages: list[ExtractResponse]
+    extraction: ExtractionSchema  # the pages merged into one record
+    timings: dict[str, float]
+
+    @classmethod
+    def from_result(cls, result: MultiPageResult) -> "MultiPageResponse":
+        return cls(
+            pages=[ExtractResponse.from_result(page) for page in result.pages],
+            extraction=ExtractionSchema.from_result(result.extraction),
+            timings=result.timings.as_dict(),
+        )
+
+
+class JobSchema(BaseModel):
+    id: str
+    status: JobStatus
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: ExtractResponse | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_job(cls, job: Job) -> "JobSchema":
+        return cls(
+            id=job.id,
+            status=job.status,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            result=ExtractResponse.model_validate(job.result) if job.result else None,
+            error=job.error,
+        )
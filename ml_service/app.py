@@ -4,6 +4,7 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from ml_service.lifespan import lifespan
 from ml_service.api.middlewares import ThrottlingMiddleware
 from ml_service.api.router import router
+from ml_service.api.errors import add_exception_handlers
 
 
 app = FastAPI(
@@ -19,5 +20,8 @@ Instrumentator().instrument(app).expose(app)
 # middlewares
 app.add_middleware(ThrottlingMiddleware)
 
+# errors
+add_exception_handlers(app)
+
 # routers
 app.include_router(router)
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ml_service.db.models import JobRecord
+from ml_service.domains.jobs import Job, JobStatus, utc_now
+
+
+class JobRepository:
+    """Extraction jobs in `jobs`."""
+
+    def __init__(self, session_factory: async_sessionmaker) -> None:
+        self.session_factory = session_factory
+
+    async def save(self, job: Job) -> None:
+        values = {
+            "id": job.id,
+            "status": job.status.value,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "result": job.result,
+            "error": job.error,
+        }
+        statement = insert(JobRecord).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[JobRecord.id],
+            set_={name: value for name, value in values.items() if name != "id"},
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement)
+            await session.commit()
+
+    async def load(self, job_id: str) -> Job | None:
+        async with self.session_factory() as session:
+            record = await session.scalar(
+                select(JobRecord).where(JobRecord.id == job_id)
+            )
+        if record is None:
+            return None
+        return Job(
+            id=record.id,
+            status=JobStatus(record.status),
+            created_at=record.created_at,
+            started_at=record.started_at,
+            finished_at=record.finished_at,
+            result=record.result,
+            error=record.error,
+        )
+
+    async def fail_stale(self, before: datetime) -> int:
+        """Fails the unfinished jobs started (or queued) before `before`."""
+        statement = (
+            update(JobRecord)
+            .where(
+                JobRecord.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value]),
+                func.coalesce(JobRecord.started_at, JobRecord.created_at) < before,
+            )
+            .values(status=JobStatus.FAILED.value, finished_at=utc_now(), error="Stale")
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(statement)
+            await session.commit()
+        return result.rowcount
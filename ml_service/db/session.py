@@ -11,12 +11,12 @@ def create_async_session(
     """Creates an asynchronous session maker for the PostgreSQL database."""
     if config is None:
         config = PostgresConfig()
-        non_autocommit_engine = create_async_engine(
-            url=config.url,
-            pool_size=config.pool_size,
-            pool_pre_ping=True,
-            echo=echo,
-        )
+    non_autocommit_engine = create_async_engine(
+        url=config.url,
+        pool_size=config.pool_size,
+        pool_pre_ping=True,
+        echo=echo,
+    )
     # The session is not autocommit, so we can use it with SQLAlchemy ORM
     # and manage transactions manually.
     # This is useful for applications that require explicit transaction control.
@@ -0,0 +1,44 @@
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ml_service.db.models import ProviderUsage
+
+
+class UsageRepository:
+    """Daily provider usage counters in `provider_usage`."""
+
+    def __init__(self, session_factory: async_sessionmaker) -> None:
+        self.session_factory = session_factory
+
+    async def add(self, provider: str, counts: dict[date, int]) -> None:
+        """Adds `counts` to the stored daily totals in one upsert."""
+        if not counts:
+            return
+        statement = insert(ProviderUsage).values(
+            [
+                {"provider": provider, "day": day, "requests": requests}
+                for day, requests in counts.items()
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[ProviderUsage.provider, ProviderUsage.day],
+            set_={
+                "requests": ProviderUsage.requests + statement.excluded.requests,
+                "updated_at": func.now(),
+            },
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement)
+            await session.commit()
+
+    async def load(self, provider: str, since: date) -> dict[date, int]:
+        """Daily totals of `provider` from `since` on."""
+        statement = select(ProviderUsage.day, ProviderUsage.requests).where(
+            ProviderUsage.provider == provider, ProviderUsage.day >= since
+        )
+        async with self.session_factory() as session:
+            rows = await session.execute(statement)
+            return {day: requests for day, requests in rows.all()}
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from enum import StrEnum, auto
 from typing import Any
@@ -64,19 +65,41 @@ class BaseMultiFieldExtractor(ABC):
     """
 
     fields: list[str]
+    # bump when the prompt or parsing changes, invalidates cached results
+    prompt_version: str = "1"
 
     @property
     def name(self) -> str:
         return self.__class__.__name__
 
+    @property
+    def model_name(self) -> str:
+        """
+        Identifies the model behind the extractor, part of the cache key.
+        """
+        return f"{self.source.name}:{self.name}"
+
     @property
     @abstractmethod
     def source(self) -> ExtractorSource:
         raise NotImplementedError
 
     @abstractmethod
-    def extract_all(self, text: str) -> ExtractionResult:
+    async def aextract_all(self, text: str) -> ExtractionResult:
         """
-        This method extract all fields from text
+        This method extract all fields from text. Async is the only contract,
+        blocking extractors run on the shared executor (see `FieldToMultiAdapter`).
         """
         raise NotImplementedError
+
+    async def astream_all(
+        self, text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        """
+        Yields every field as soon as it is extracted, then the whole result.
+        Extractors that can not stream yield all fields when they are done.
+        """
+        result = await self.aextract_all(text)
+        for field in result.content or []:
+            yield field
+        yield result
@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+
+from ml_service.domains.extractors.base import (
+    BaseMultiFieldExtractor,
+    ExtractionField,
+    ExtractionResult,
+    ExtractorSource,
+)
+from ml_service.settings.config import config
+from ml_service.settings.metrics import Counters
+from ml_service.utils.singleflight import SingleFlight
+
+
+def normalize_text(text: str) -> str:
+    """OCR output differs in whitespace only between engines and runs."""
+    return " ".join(text.split())
+
+
+@dataclass(frozen=True)
+class ExtractionCacheKey:
+    text: str
+    fields: tuple[str, ...]
+    model: str
+    prompt_version: str
+
+    @classmethod
+    def build(
+        cls, extractor: BaseMultiFieldExtractor, text: str
+    ) -> "ExtractionCacheKey":
+        return cls(
+            text=normalize_text(text),
+            fields=tuple(extractor.fields),
+            model=extractor.model_name,
+            prompt_version=extractor.prompt_version,
+        )
+
+
+class ExtractionCache:
+    """
+    Bounded LRU/TTL cache of extraction results shared by all extractors.
+
+    Concurrent lookups of the same key while it is being computed wait
+    for the in-flight computation instead of calling the model again
+    (see `ml_service.utils.singleflight.SingleFlight`).
+    Only confident, error-free results are stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[ExtractionCacheKey, tuple[ExtractionResult, float]] = (
+            OrderedDict()
+        )
+        self._flights: SingleFlight[ExtractionResult] = SingleFlight("extraction")
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def get(self, key: ExtractionCacheKey) -> ExtractionResult | None:
+        with self._lock:
+            result = self._get(key)
+        counter = (
+            Counters.EXTRACTION_CACHE_HITS
+            if result is not None
+            else Counters.EXTRACTION_CACHE_MISSES
+        )
+        counter.value.inc()
+        return result
+
+    def set(self, key: ExtractionCacheKey, result: ExtractionResult) -> None:
+        with self._lock:
+            self._set(key, result)
+
+    def _get(self, key: ExtractionCacheKey) -> ExtractionResult | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        result, expires_at = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            Counters.EXTRACTION_CACHE_EVICTIONS.value.inc()
+            return None
+        self._data.move_to_end(key)
+        return result
+
+    def _set(self, key: ExtractionCacheKey, result: ExtractionResult) -> None:
+        if result.error or result.confidence <= 0:
+            return
+        self._data[key] = (result, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            Counters.EXTRACTION_CACHE_EVICTIONS.value.inc()
+
+    async def _compute_and_set(
+        self,
+        key: ExtractionCacheKey,
+        compute: Callable[[], Awaitable[ExtractionResult]],
+    ) -> ExtractionResult:
+        result = await compute()
+        self.set(key, result)
+        return result
+
+    async def aget_or_compute(
+        self,
+        key: ExtractionCacheKey,
+        compute: Callable[[], Awaitable[ExtractionResult]],
+    ) -> ExtractionResult:
+        """
+        The cached result or the result of `compute`, concurrent callers
+        of one key share the computation.
+        """
+        result = self.get(key)
+        if result is not None:
+            return result
+        return await self._flights.do(key, lambda: self._compute_and_set(key, compute))
+
+
+class CachedExtractor(BaseMultiFieldExtractor):
+    """
+    Wraps an extractor with the shared extraction cache.
+    """
+
+    def __init__(
+        self, extractor: BaseMultiFieldExtractor, cache: ExtractionCache
+    ) -> None:
+        self.extractor = extractor
+        self.cache = cache
+        self.fields = extractor.fields
+        self.prompt_version = extractor.prompt_version
+
+    @property
+    def name(self) -> str:
+        return self.extractor.name
+
+    @property
+    def source(self) -> ExtractorSource:
+        return self.extractor.source
+
+    @property
+    def model_name(self) -> str:
+        return self.extractor.model_name
+
+    async def aextract_all(self, text: str) -> ExtractionResult:
+        key = ExtractionCacheKey.build(self.extractor, text)
+        return await self.cache.aget_or_compute(
+            key, lambda: self.extractor.aextract_all(text)
+        )
+
+    async def astream_all(
+        self, text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        """Streams from the wrapped extractor on a miss and caches the final result."""
+        key = ExtractionCacheKey.build(self.extractor, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            for field in cached.content or []:
+                yield field
+            yield cached
+            return
+        async for item in self.extractor.astream_all(text):
+            if isinstance(item, ExtractionResult):
+                self.cache.set(key, item)
+            yield item
+
+
+extraction_cache = ExtractionCache(
+    maxsize=config.extractors.cache_size, ttl=config.extractors.cache_ttl
+)
@@ -0,0 +1,51 @@
+import dataclasses
+
+from ml_service.domains.extractors.base import ExtractionField, ExtractionResult
+from ml_service.domains.extractors.strategies import NONE_SOURCE
+
+
+def _merge_field(current: ExtractionField, field: ExtractionField) -> ExtractionField:
+    if isinstance(current.value, list) and isinstance(field.value, list):
+        values = current.value + [v for v in field.value if v not in current.value]
+        return dataclasses.replace(
+            current,
+            value=values,
+            confidence=max(current.confidence, field.confidence),
+        )
+    if field.value and (not current.value or field.confidence > current.confidence):
+        return field
+    return current
+
+
+def merge_pages(results: list[ExtractionResult]) -> ExtractionResult:
+    """
+    Combines the extractions of the pages of one document into one record.
+
+    List values (works, materials) are concatenated in page order without
+    duplicates, for other fields the most confident non-empty value wins,
+    the earlier page on a tie. Failed pages are skipped, the result only
+    fails if every page did.
+    """
+    succeeded = [r for r in results if r.content and not r.error]
+    if not succeeded:
+        errors = [str(r.error) for r in results if r.error]
+        return ExtractionResult(
+            content=None,
+            confidence=0.0,
+            source=NONE_SOURCE,
+            error="; ".join(errors) or "No page was extracted",
+        )
+
+    merged: dict[str, ExtractionField] = {}
+    for result in succeeded:
+        for field in result.content or []:
+            current = merged.get(field.field)
+            merged[field.field] = (
+                field if current is None else _merge_field(current, field)
+            )
+
+    fields = list(merged.values())
+    confidence = sum(f.confidence for f in fields) / len(fields) if fields else 0.0
+    return ExtractionResult(
+        content=fields, confidence=confidence, source=succeeded[0].source
+    )
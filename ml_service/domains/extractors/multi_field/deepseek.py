@@ -1,5 +1,8 @@
+import asyncio
 import json
 import logging
+from collections.abc import AsyncIterator
+from typing import Any
 
 from ml_service.domains.extractors.base import (
     BaseMultiFieldExtractor,
@@ -8,7 +11,14 @@ from ml_service.domains.extractors.base import (
     ExtractorSource,
     ExtractorSourceType,
 )
-from ml_service.domains.llm.base import LLMClient, PromptMessage, PromptRole
+from ml_service.domains.extractors.prompts import (
+    DEFAULT_PROMPT_VERSION,
+    compile_prompt,
+)
+from ml_service.domains.llm.base import LLMClient, LLMResponse
+from ml_service.settings.metrics import Counters
+from ml_service.utils.batching import MicroBatcher
+from ml_service.utils.json_stream import JSONObjectStream
 
 
 class DeepSeekMultiExtractor(BaseMultiFieldExtractor):
@@ -16,9 +26,13 @@ class DeepSeekMultiExtractor(BaseMultiFieldExtractor):
         self,
         llm: LLMClient,
         fields: list[str] | None = None,
+        prompt_version: str = DEFAULT_PROMPT_VERSION,
     ) -> None:
         self.llm = llm
         self.fields = fields or ["date", "mileage", "price", "works", "materials"]
+        # compiled once, the prefix is the same bytes for every request
+        self.prompt = compile_prompt(tuple(self.fields), prompt_version)
+        self.prompt_version = self.prompt.version
 
     @property
     def source(self) -> ExtractorSource:
@@ -27,66 +41,77 @@ class DeepSeekMultiExtractor(BaseMultiFieldExtractor):
             type=ExtractorSourceType.EXTERNAL_API,
         )
 
-    def _build_prompt(self, text: str) -> list[PromptMessage]:
-        fields_str = ", ".join(self.fields)
-        prompt_text = (
-            "Ты помощник, который извлекает структурированные данные"
-            " о техническом обслуживании автомобиля из неструктурированного текста.\n"
-            f"Извлеки следующие поля: {fields_str}.\n"
-            "Формат данных:\n"
-            "- date — дата (например, '2024-03-15')\n"
-            "- mileage — пробег в км (число)\n"
-            "- price — сумма (в рублях)\n"
-            "- works — список выполненных работ\n"
-            "- materials — список использованных материалов\n\n"
-            "Если поле не найдено — укажи пустую строку, null или пустой список.\n"
-            "Ответь ТОЛЬКО в виде JSON:\n"
-            '{"date": ..., "mileage": ..., "price": ..., "works": [...], "materials": [...]}.\n\n'
-            f"Текст:\n{text}"
-        )
-        return [PromptMessage(role=PromptRole.USER, content=prompt_text)]
+    @property
+    def model_name(self) -> str:
+        return f"{self.llm.name}:{getattr(self.llm, 'model', '')}"
 
-    def extract_all(self, text: str) -> ExtractionResult:
-        prompt = self._build_prompt(text)
-        response = self.llm.chat(prompt, json_output=True)
+    async def aextract_all(self, text: str) -> ExtractionResult:
+        prompt = self.prompt.render(text)
+        response = await self.llm.chat(prompt, json_output=True)
 
-        fields: list[ExtractionField] = []
         if response.error or not response.content:
             logging.error(f"[DeepSeekMultiExtractor] error: {response.error}")
-            for field in self.fields:
-                fields.append(self._empty_field(field, response.error))
-            return ExtractionResult(
-                content=fields, confidence=0.0, source=self.source, error=response.error
-            )
+            return self._error_result(response.error)
 
         try:
             parsed = json.loads(response.content)
-            for field in self.fields:
-                value = parsed.get(field, "")
-                conf = 1.0 if value else 0.0
-                fields.append(
-                    ExtractionField(
-                        field=field,
-                        value=value,
-                        confidence=conf,
-                        source=self.source,
-                        error=None,
-                    )
-                )
-            avg_conf = (
-                sum(f.confidence for f in fields) / len(fields) if fields else 0.0
-            )
-            return ExtractionResult(
-                content=fields, confidence=avg_conf, source=self.source, error=None
+            return self._result(
+                [self._field(field, parsed.get(field, "")) for field in self.fields]
             )
 
         except Exception as exc:
             logging.exception("[DeepSeekMultiExtractor] Failed to parse JSON response")
-            for field in self.fields:
-                fields.append(self._empty_field(field, exc))
-            return ExtractionResult(
-                content=fields, confidence=0.0, source=self.source, error=exc
-            )
+            return self._error_result(exc)
+
+    async def astream_all(
+        self, text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        """
+        Parses the streamed completion incrementally, a field is yielded
+        as soon as its value is complete in the JSON object.
+        """
+        prompt = self.prompt.render(text)
+        parser = JSONObjectStream()
+        extracted: dict[str, ExtractionField] = {}
+        try:
+            async for delta in self.llm.chat_stream(prompt, json_output=True):
+                for name, value in parser.feed(delta):
+                    if name in self.fields and name not in extracted:
+                        extracted[name] = field = self._field(name, value)
+                        yield field
+            if not parser.done:
+                raise ValueError("The streamed JSON object is incomplete")
+        except Exception as exc:
+            logging.exception("[DeepSeekMultiExtractor] Streaming extraction failed")
+            yield self._error_result(exc)
+            return
+
+        yield self._result(
+            [extracted.get(field) or self._field(field, "") for field in self.fields]
+        )
+
+    def _field(self, field: str, value: Any) -> ExtractionField:
+        return ExtractionField(
+            field=field,
+            value=value,
+            confidence=1.0 if value else 0.0,
+            source=self.source,
+            error=None,
+        )
+
+    def _result(self, fields: list[ExtractionField]) -> ExtractionResult:
+        avg_conf = sum(f.confidence for f in fields) / len(fields) if fields else 0.0
+        return ExtractionResult(
+            content=fields, confidence=avg_conf, source=self.source, error=None
+        )
+
+    def _error_result(self, error: str | Exception | None) -> ExtractionResult:
+        return ExtractionResult(
+            content=[self._empty_field(field, error) for field in self.fields],
+            confidence=0.0,
+            source=self.source,
+            error=error,
+        )
 
     def _empty_field(
         self, field: str, error: str | Exception | None
@@ -98,3 +123,113 @@ class DeepSeekMultiExtractor(BaseMultiFieldExtractor):
             source=self.source,
             error=error,
         )
+
+
+class BatchedDeepSeekMultiExtractor(DeepSeekMultiExtractor):
+    """
+    DeepSeek behind a micro-batcher: texts of concurrent requests arriving
+    within `batch_window` seconds are sent in one JSON-mode request (up to
+    `max_batch_size` texts), so the instructions are sent and paid for once.
+    Up to `max_concurrency` batch requests are in flight at a time.
+
+    Every text gets an id, the answer is a `results` array mapped back by id.
+    Texts missing from the answer are extracted again, an answer that can
+    not be parsed at all is retried as two halves, down to single texts.
+    """
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        fields: list[str] | None = None,
+        prompt_version: str = DEFAULT_PROMPT_VERSION,
+        max_batch_size: int = 8,
+        batch_window: float = 0.05,
+        max_concurrency: int = 4,
+    ) -> None:
+        super().__init__(llm, fields, prompt_version)
+        self.batcher: MicroBatcher[str, ExtractionResult] = MicroBatcher(
+            "deepseek",
+            self._extract_batch,
+            max_batch_size,
+            batch_window,
+            max_concurrency=max_concurrency,
+        )
+
+    def _report_savings(self, texts: list[str], response: LLMResponse) -> None:
+        """
+        Counts the prompt tokens the batch saved: the instructions would have
+        been sent once per text, the API reports the tokens of the whole prompt
+        only, so their share is estimated by length.
+        """
+        usage = (response.data or {}).get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens")
+        if not prompt_tokens:
+            return
+        length = sum(len(message.content) for message in response.prompt)
+        saved = (
+            (len(texts) - 1) * len(self.prompt.instructions) * prompt_tokens / length
+        )
+        Counters.LLM_BATCH_SAVED_TOKENS.value.labels(self.llm.name).inc(saved)
+
+    def _parse_batch(self, content: str, size: int) -> dict[int, ExtractionResult]:
+        """Results by text index, texts missing from the answer are left out."""
+        results = json.loads(content).get("results")
+        if not isinstance(results, list):
+            raise ValueError("No results array in the batch response")
+        parsed = {}
+        for item in results:
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < size and index not in parsed:
+                parsed[index] = self._result(
+                    [self._field(field, item.get(field, "")) for field in self.fields]
+                )
+        return parsed
+
+    async def _extract_batch(self, texts: list[str]) -> list[ExtractionResult]:
+        if len(texts) == 1:
+            return [await super().aextract_all(texts[0])]
+
+        response = await self.llm.chat(
+            self.prompt.render_batch(texts), json_output=True
+        )
+        if response.error or not response.content:
+            # the provider failed, smaller requests would fail the same way
+            logging.error(f"[{self.name}] batch error: {response.error}")
+            return [self._error_result(response.error) for _ in texts]
+
+        try:
+            parsed = self._parse_batch(response.content, len(texts))
+        except Exception as exc:
+            logging.warning(f"[{self.name}] can not parse the batch response: {exc}")
+            parsed = {}
+        if parsed:
+            self._report_savings(texts, response)
+        if len(parsed) == len(texts):
+            return [parsed[i] for i in range(len(texts))]
+
+        Counters.LLM_BATCH_SPLITS.value.labels(self.llm.name).inc()
+        missing = [i for i in range(len(texts)) if i not in parsed]
+        if parsed:
+            logging.warning(f"[{self.name}] no results for {len(missing)} texts")
+            groups = [missing]
+        else:
+            half = len(missing) // 2
+            groups = [missing[:half], missing[half:]]
+        retried = await asyncio.gather(
+            *(self._extract_batch([texts[i] for i in group]) for group in groups)
+        )
+        for group, results in zip(groups, retried):
+            parsed.update(zip(group, results))
+        return [parsed[i] for i in range(len(texts))]
+
+    async def aextract_all(self, text: str) -> ExtractionResult:
+        try:
+            return await self.batcher.submit(text)
+        except Exception as exc:
+            logging.exception(f"[{self.name}] batched extraction failed")
+            return self._error_result(exc)
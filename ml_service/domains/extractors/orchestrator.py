@@ -1,7 +1,9 @@
 import logging
 import time
+from collections.abc import AsyncIterator
 
 from ml_service.domains.extractors.base import (
+    ExtractionField,
     ExtractionResult,
     ExtractorSource,
     ExtractorSourceType,
@@ -16,7 +18,7 @@ class ExtractorOrchestrator:
     def set_strategy(self, strategy: BaseOrchestratorStrategy) -> None:
         self.strategy = strategy
 
-    def run(self, text: str) -> ExtractionResult:
+    async def arun(self, text: str) -> ExtractionResult:
         if not self.strategy:
             raise ValueError("No strategy set for ExtractorOrchestrator")
 
@@ -24,7 +26,7 @@ class ExtractorOrchestrator:
         start = time.time()
 
         try:
-            result = self.strategy.run(text)
+            result = await self.strategy.arun(text)
             elapsed = time.time() - start
             logging.info(
                 f"[Orchestrator] Strategy {self.strategy.name} completed in {elapsed:.2f}s"
@@ -35,13 +37,36 @@ class ExtractorOrchestrator:
             logging.exception(
                 f"[Orchestrator] Strategy {self.strategy.name} failed with exception: {e}"
             )
-            source = self.strategy._extractors[0].source
-            return ExtractionResult(
-                content=None,
-                confidence=0.0,
-                source=source
-                if source
-                else ExtractorSource("none", ExtractorSourceType.LOCAL),
-                error=e,
-                data=None,
+            return self._error_result(e)
+
+    async def astream(
+        self, text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        """
+        Streaming `arun`: fields as they are extracted, then the final result.
+        """
+        if not self.strategy:
+            raise ValueError("No strategy set for ExtractorOrchestrator")
+
+        logging.info(f"[Orchestrator] Streaming strategy: {self.strategy.name}")
+        try:
+            async for item in self.strategy.astream(text):
+                yield item
+        except Exception as e:
+            logging.exception(
+                f"[Orchestrator] Strategy {self.strategy.name} failed with exception: {e}"
             )
+            yield self._error_result(e)
+
+    def _error_result(self, error: Exception) -> ExtractionResult:
+        extractors = self.strategy._extractors if self.strategy else []
+        source = extractors[0].source if extractors else None
+        return ExtractionResult(
+            content=None,
+            confidence=0.0,
+            source=source
+            if source
+            else ExtractorSource("none", ExtractorSourceType.LOCAL),
+            error=error,
+            data=None,
+        )
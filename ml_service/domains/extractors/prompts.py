@@ -0,0 +1,124 @@
+import dataclasses
+import functools
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ml_service.domains.llm.base import PromptMessage, PromptRole
+
+FIELD_DESCRIPTIONS = {
+    "date": "дата (например, '2024-03-15')",
+    "mileage": "пробег в км (число)",
+    "price": "сумма (в рублях)",
+    "works": "список выполненных работ",
+    "materials": "список использованных материалов",
+}
+LIST_FIELDS = {"works", "materials"}
+
+DEFAULT_PROMPT_VERSION = "2"
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    Extraction prompt for one field set, compiled once.
+
+    `instructions` are the same bytes for every text. With `system_prefix`
+    they are sent as the SYSTEM message, followed by a USER message that ends
+    with the variable text, so the provider can serve the prefix from its
+    context cache. Without it everything is one USER message (version 1).
+    """
+
+    version: str
+    instructions: str
+    output_format: str
+    batch_format: str
+    system_prefix: bool
+
+    def _messages(self, body: str) -> list[PromptMessage]:
+        if not self.system_prefix:
+            return [
+                PromptMessage(role=PromptRole.USER, content=self.instructions + body)
+            ]
+        return [
+            PromptMessage(role=PromptRole.SYSTEM, content=self.instructions),
+            PromptMessage(role=PromptRole.USER, content=body),
+        ]
+
+    def render(self, text: str) -> list[PromptMessage]:
+        return self._messages(f"{self.output_format}Текст:\n{text}")
+
+    def render_batch(self, texts: list[str]) -> list[PromptMessage]:
+        """Several texts with ids, answered as a `results` array."""
+        items = json.dumps(
+            [{"id": str(i), "text": text} for i, text in enumerate(texts)],
+            ensure_ascii=False,
+        )
+        return self._messages(
+            f"Ниже {len(texts)} независимых текстов: JSON-массив с полями id и text.\n"
+            f"{self.batch_format}Тексты:\n{items}"
+        )
+
+
+def _instructions(fields: tuple[str, ...]) -> str:
+    formats = "".join(
+        f"- {field} — {FIELD_DESCRIPTIONS[field]}\n"
+        for field in fields
+        if field in FIELD_DESCRIPTIONS
+    )
+    return (
+        "Ты помощник, который извлекает структурированные данные"
+        " о техническом обслуживании автомобиля из неструктурированного текста.\n"
+        f"Извлеки следующие поля: {', '.join(fields)}.\n"
+        f"Формат данных:\n{formats}\n"
+        "Если поле не найдено — укажи пустую строку, null или пустой список.\n"
+    )
+
+
+def _json_shape(fields: tuple[str, ...]) -> str:
+    values = ", ".join(
+        f'"{field}": [...]' if field in LIST_FIELDS else f'"{field}": ...'
+        for field in fields
+    )
+    return "{" + values + "}"
+
+
+def _v1(fields: tuple[str, ...]) -> PromptTemplate:
+    """The original layout: instructions and text in one USER message."""
+    shape = _json_shape(fields)
+    return PromptTemplate(
+        version="1",
+        instructions=_instructions(fields),
+        output_format=f"Ответь ТОЛЬКО в виде JSON:\n{shape}.\n\n",
+        batch_format=(
+            "Извлеки поля из каждого текста отдельно. Ответь ТОЛЬКО в виде JSON:\n"
+            f'{{"results": [{{"id": ..., {shape[1:-1]}}}, ...]}},'
+            " по одному объекту на каждый id.\n\n"
+        ),
+        system_prefix=False,
+    )
+
+
+def _v2(fields: tuple[str, ...]) -> PromptTemplate:
+    """Instructions as a byte-identical SYSTEM prefix, the text last."""
+    return dataclasses.replace(_v1(fields), version="2", system_prefix=True)
+
+
+PROMPTS: dict[str, Callable[[tuple[str, ...]], PromptTemplate]] = {
+    "1": _v1,
+    "2": _v2,
+}
+
+
+@functools.cache
+def compile_prompt(
+    fields: tuple[str, ...], version: str = DEFAULT_PROMPT_VERSION
+) -> PromptTemplate:
+    """
+    The template of `version` for `fields`. Compiled once per field set,
+    every extractor with the same fields shares the same prefix.
+    """
+    builder = PROMPTS.get(version)
+    if builder is None:
+        raise ValueError(f"Unknown prompt version: {version}")
+    return builder(fields)
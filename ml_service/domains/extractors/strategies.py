@@ -1,10 +1,14 @@
+import asyncio
+import logging
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import AsyncIterator
 
 from ml_service.domains.extractors.adapter import FieldToMultiAdapter
+from ml_service.domains.extractors.cache import CachedExtractor, ExtractionCache
 from ml_service.domains.extractors.base import (
     BaseFieldExtractor,
     BaseMultiFieldExtractor,
+    ExtractionField,
     ExtractionResult,
     ExtractorSource,
     ExtractorSourceType,
@@ -18,10 +22,14 @@ class BaseOrchestratorStrategy(ABC):
         self,
         field_extractors: list[BaseFieldExtractor | BaseMultiFieldExtractor],
         max_workers: int = 1,  # default single-threaded
+        cache: ExtractionCache | None = None,
+        extractor_timeout: float | None = None,
     ) -> None:
         self._raw = field_extractors
+        self.cache = cache
         self._extractors = self._adapt(self._raw)
         self.max_workers = max_workers
+        self.extractor_timeout = extractor_timeout
 
     @property
     def name(self) -> str:
@@ -45,67 +53,197 @@ class BaseOrchestratorStrategy(ABC):
         for group in grouped.values():
             result.append(FieldToMultiAdapter(group))
 
+        if self.cache is not None:
+            result = [CachedExtractor(e, self.cache) for e in result]
+
         return result
 
+    async def _aextract(
+        self, extractor: BaseMultiFieldExtractor, text: str
+    ) -> ExtractionResult:
+        """
+        Runs one extractor under the per-extractor deadline.
+        Timeouts and exceptions become empty results, so the strategy
+        can move on to the next extractor.
+        """
+        try:
+            async with asyncio.timeout(self.extractor_timeout):
+                return await extractor.aextract_all(text)
+        except TimeoutError as exc:
+            logging.warning(
+                f"[{self.name}] {extractor.name} timed out after {self.extractor_timeout}s"
+            )
+            return ExtractionResult([], 0.0, extractor.source, error=exc)
+        except Exception as exc:
+            logging.exception(f"[{self.name}] {extractor.name} failed")
+            return ExtractionResult([], 0.0, extractor.source, error=exc)
+
+    async def _afirst_confident(
+        self, extractors: list[BaseMultiFieldExtractor], text: str
+    ) -> ExtractionResult:
+        for extractor in extractors:
+            result = await self._aextract(extractor, text)
+            if result.confidence > 0:
+                return result
+        return ExtractionResult([], 0.0, NONE_SOURCE)
+
+    async def _astream(
+        self, extractor: BaseMultiFieldExtractor, text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        """
+        Streaming `_aextract`: the deadline covers the whole stream,
+        timeouts and exceptions end it with an empty result.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = (
+            loop.time() + self.extractor_timeout
+            if self.extractor_timeout is not None
+            else None
+        )
+        stream = extractor.astream_all(text)
+        try:
+            while True:
+                async with asyncio.timeout_at(deadline):
+                    item = await anext(stream)
+                yield item
+                if isinstance(item, ExtractionResult):
+                    return
+        except StopAsyncIteration:
+            yield ExtractionResult([], 0.0, extractor.source)
+        except TimeoutError as exc:
+            logging.warning(
+                f"[{self.name}] {extractor.name} timed out after {self.extractor_timeout}s"
+            )
+            yield ExtractionResult([], 0.0, extractor.source, error=exc)
+        except Exception as exc:
+            logging.exception(f"[{self.name}] {extractor.name} failed")
+            yield ExtractionResult([], 0.0, extractor.source, error=exc)
+        finally:
+            await stream.aclose()
+
+    async def _astream_first_confident(
+        self, extractors: list[BaseMultiFieldExtractor], text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        """
+        Streaming `_afirst_confident`. Fields of an extractor that ends up
+        without a confident result are followed by the fields of the next one.
+        """
+        for extractor in extractors:
+            async for item in self._astream(extractor, text):
+                if not isinstance(item, ExtractionResult):
+                    yield item
+                elif item.confidence > 0:
+                    yield item
+                    return
+        yield ExtractionResult([], 0.0, NONE_SOURCE)
+
+    def _by_type(
+        self, source_type: ExtractorSourceType
+    ) -> list[BaseMultiFieldExtractor]:
+        return [e for e in self._extractors if e.source.type == source_type]
+
     @abstractmethod
-    def run(self, text: str) -> ExtractionResult:
+    async def arun(self, text: str) -> ExtractionResult:
         raise NotImplementedError
 
+    async def astream(
+        self, text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        """
+        Fields as soon as they are extracted, then the final result.
+        Strategies merging several extractors yield all fields at the end.
+        """
+        result = await self.arun(text)
+        for field in result.content or []:
+            yield field
+        yield result
+
 
 class LocalOnlyStrategy(BaseOrchestratorStrategy):
-    def run(self, text: str) -> ExtractionResult:
-        for extractor in self._extractors:
-            if extractor.source.type == ExtractorSourceType.LOCAL:
-                result = extractor.extract_all(text)
-                if result.confidence > 0:
-                    return result
-        return ExtractionResult([], 0.0, NONE_SOURCE)
+    async def arun(self, text: str) -> ExtractionResult:
+        return await self._afirst_confident(
+            self._by_type(ExtractorSourceType.LOCAL), text
+        )
+
+    def astream(self, text: str) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        return self._astream_first_confident(
+            self._by_type(ExtractorSourceType.LOCAL), text
+        )
 
 
 class ExternalOnlyStrategy(BaseOrchestratorStrategy):
-    def run(self, text: str) -> ExtractionResult:
-        for extractor in self._extractors:
-            if extractor.source.type == ExtractorSourceType.EXTERNAL_API:
-                result = extractor.extract_all(text)
-                if result.confidence > 0:
-                    return result
-        return ExtractionResult([], 0.0, NONE_SOURCE)
+    async def arun(self, text: str) -> ExtractionResult:
+        return await self._afirst_confident(
+            self._by_type(ExtractorSourceType.EXTERNAL_API), text
+        )
 
+    def astream(self, text: str) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        return self._astream_first_confident(
+            self._by_type(ExtractorSourceType.EXTERNAL_API), text
+        )
 
-class ExternalAsBackupStrategy(BaseOrchestratorStrategy):
-    def run(self, text: str) -> ExtractionResult:
-        local_extractors = [
-            e for e in self._extractors if e.source.type == ExtractorSourceType.LOCAL
-        ]
-        external_extractors = [
-            e
-            for e in self._extractors
-            if e.source.type == ExtractorSourceType.EXTERNAL_API
-        ]
-
-        for extractor in local_extractors:
-            result = extractor.extract_all(text)
-            if result.confidence > 0:
-                return result
 
-        for extractor in external_extractors:
-            result = extractor.extract_all(text)
-            if result.confidence > 0:
-                return result
+class ExternalAsBackupStrategy(BaseOrchestratorStrategy):
+    async def arun(self, text: str) -> ExtractionResult:
+        return await self._afirst_confident(
+            self._by_type(ExtractorSourceType.LOCAL)
+            + self._by_type(ExtractorSourceType.EXTERNAL_API),
+            text,
+        )
 
-        return ExtractionResult([], 0.0, NONE_SOURCE)
+    def astream(self, text: str) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        return self._astream_first_confident(
+            self._by_type(ExtractorSourceType.LOCAL)
+            + self._by_type(ExtractorSourceType.EXTERNAL_API),
+            text,
+        )
 
 
 class AllExtractorsStrategy(BaseOrchestratorStrategy):
-    def run(self, text: str) -> ExtractionResult:
-        if self.max_workers > 1:
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [
-                    executor.submit(e.extract_all, text) for e in self._extractors
-                ]
-                results = [f.result() for f in futures]
-        else:
-            results = [e.extract_all(text) for e in self._extractors]
+    """
+    Runs every extractor and returns the most confident result.
+
+    With `confident_threshold` set, `arun` returns the first result
+    reaching it and cancels the slower extractors.
+    """
+
+    def __init__(
+        self,
+        field_extractors: list[BaseFieldExtractor | BaseMultiFieldExtractor],
+        max_workers: int = 1,  # default single-threaded
+        cache: ExtractionCache | None = None,
+        extractor_timeout: float | None = None,
+        confident_threshold: float | None = None,
+    ) -> None:
+        super().__init__(field_extractors, max_workers, cache, extractor_timeout)
+        self.confident_threshold = confident_threshold
+
+    async def arun(self, text: str) -> ExtractionResult:
+        semaphore = asyncio.Semaphore(max(self.max_workers, 1))
+
+        async def extract(extractor: BaseMultiFieldExtractor) -> ExtractionResult:
+            async with semaphore:
+                return await self._aextract(extractor, text)
+
+        tasks = [asyncio.create_task(extract(e)) for e in self._extractors]
+        if self.confident_threshold is None:
+            return self._merge_best_confidence(list(await asyncio.gather(*tasks)))
+
+        results: list[ExtractionResult] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result.confidence >= self.confident_threshold:
+                    logging.info(
+                        f"[{self.name}] {result.source.name} is confident enough"
+                        f" ({result.confidence:.2f}), cancelling the rest"
+                    )
+                    return result
+                results.append(result)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         return self._merge_best_confidence(results)
 
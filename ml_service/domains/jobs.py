@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum, auto
+from typing import Any, Protocol
+
+from ml_service.settings.metrics import Counters, Gauges
+
+JobProcessor = Callable[[bytes], Awaitable[dict[str, Any]]]
+
+
+class JobStatus(StrEnum):
+    QUEUED = auto()
+    RUNNING = auto()
+    DONE = auto()
+    FAILED = auto()
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.DONE, JobStatus.FAILED)
+
+
+class JobQueueFull(Exception):
+    """The backlog is full, the job was not accepted."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Job queue is full, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def utc_now() -> datetime:
+    return datetime.now(UTC)
+
+
+@dataclass
+class Job:
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=utc_now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    _changed: asyncio.Event = field(
+        default_factory=asyncio.Event, repr=False, compare=False
+    )
+    # saves of one job are written in order
+    _save_lock: asyncio.Lock = field(
+        default_factory=asyncio.Lock, repr=False, compare=False
+    )
+
+    def update(self, status: JobStatus, **changes: Any) -> None:
+        """Sets the status, wakes up everybody waiting for a change."""
+        self.status = status
+        for name, value in changes.items():
+            setattr(self, name, value)
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_changed(self, timeout: float) -> bool:
+        """Waits for the next status change, `False` on timeout."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+
+class JobStore(Protocol):
+    """Persistent job state, see `ml_service.db.jobs.JobRepository`."""
+
+    async def save(self, job: Job) -> None: ...
+
+    async def load(self, job_id: str) -> Job | None: ...
+
+    async def fail_stale(self, before: datetime) -> int: ...
+
+
+class JobQueue:
+    """
+    Bounded queue of extraction jobs served by in-process workers.
+
+    `submit` never blocks: when `max_size` jobs are waiting it raises
+    `JobQueueFull` with an estimate of when a slot frees up. Job state is
+    kept in memory for `ttl` seconds (at most `max_jobs` jobs) and saved
+    to the store, if any, so other workers and restarts can read it. Saves
+    run in the background, an unreachable store never holds up a request
+    or a worker. Unfinished jobs older than `stale_after` seconds are taken
+    for lost with their worker and reported as failed.
+    """
+
+    def __init__(
+        self,
+        process: JobProcessor,
+        workers: int = 2,
+        max_size: int = 32,
+        ttl: float = 60 * 60,
+        max_jobs: int = 4096,
+        store: JobStore | None = None,
+        stale_after: float = 15 * 60,
+    ) -> None:
+        self.process = process
+        self.workers = workers
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.store = store
+        self.stale_after = stale_after
+        self._queue: asyncio.Queue[tuple[Job, bytes]] = asyncio.Queue(max_size)
+        self._jobs: OrderedDict[str, tuple[Job, float]] = OrderedDict()
+        self._tasks: list[asyncio.Task] = []
+        self._saves: set[asyncio.Task] = set()
+        # moving average of the job duration, for Retry-After
+        self._duration = 10.0
+        Gauges.JOBS_QUEUE_DEPTH.value.set_function(self._queue.qsize)
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until a queue slot is likely to be free."""
+        return max(math.ceil(self._duration / max(self.workers, 1)), 1)
+
+    def _remember(self, job: Job) -> None:
+        now = time.monotonic()
+        self._jobs[job.id] = (job, now + self.ttl)
+        self._jobs.move_to_end(job.id)
+        while self._jobs:
+            oldest, (old_job, expires_at) = next(iter(self._jobs.items()))
+            expired = expires_at <= now and old_job.status.finished
+            if len(self._jobs) <= self.max_jobs and not expired:
+                break
+            del self._jobs[oldest]
+
+    async def _save(self, job: Job) -> None:
+        if self.store is None:
+            return
+        try:
+            async with job._save_lock:
+                await self.store.save(job)
+        except Exception as error:
+            logging.warning(f"Can not save job {job.id}: {error}")
+
+    def _persist(self, job: Job) -> None:
+        """Saves the job in the background, in the order of the calls."""
+        if self.store is None:
+            return
+        task = asyncio.create_task(self._save(job), name=f"job-save-{job.id}")
+        self._saves.add(task)
+        task.add_done_callback(self._saves.discard)
+
+    async def submit(self, data: bytes) -> Job:
+        job = Job()
+        try:
+            self._queue.put_nowait((job, data))
+        except asyncio.QueueFull:
+            Counters.JOBS_REJECTED.value.inc()
+            raise JobQueueFull(self.retry_after) from None
+        self._remember(job)
+        self._persist(job)
+        return job
+
+    def _is_stale(self, job: Job) -> bool:
+        if job.status.finished:
+            return False
+        since = job.started_at or job.created_at
+        return utc_now() - since > timedelta(seconds=self.stale_after)
+
+    async def get(self, job_id: str) -> Job | None:
+        """The job from memory or, if it was submitted to another worker, the store."""
+        item = self._jobs.get(job_id)
+        if item is not None:
+            return item[0]
+        if self.store is None:
+            return None
+        try:
+            return await self.store.load(job_id)
+        except Exception as error:
+            logging.warning(f"Can not load job {job_id}: {error}")
+            return None
+
+    async def watch(
+        self, job_id: str, poll_interval: float = 1.0
+    ) -> AsyncIterator[Job]:
+        """
+        Yields the job and then again on every status change, until it is finished.
+        Jobs of other workers are polled from the store every `poll_interval`,
+        a stale one is yielded as failed.
+        """
+        job = await self.get(job_id)
+        last_status = None
+        while job is not None:
+            item = self._jobs.get(job_id)
+            owned = item is not None and item[0] is job
+            if not owned and self._is_stale(job):
+                job.update(JobStatus.FAILED, finished_at=utc_now(), error="Stale")
+            if job.status != last_status:
+                last_status = job.status
+                yield job
+            if job.status.finished:
+                return
+            if owned:
+                await job.wait_changed(poll_interval)
+            else:
+                await asyncio.sleep(poll_interval)
+                job = await self.get(job_id) or job
+
+    async def _work(self) -> None:
+        while True:
+            job, data = await self._queue.get()
+            try:
+                await self._run(job, data)
+            finally:
+                del data
+                self._queue.task_done()
+
+    async def _run(self, job: Job, data: bytes) -> None:
+        start = time.monotonic()
+        job.update(JobStatus.RUNNING, started_at=utc_now())
+        self._persist(job)
+        try:
+            result = await self.process(data)
+        except asyncio.CancelledError:
+            job.update(JobStatus.FAILED, finished_at=utc_now(), error="Cancelled")
+            self._persist(job)
+            raise
+        except Exception as error:
+            logging.exception(f"Job {job.id} failed")
+            job.update(JobStatus.FAILED, finished_at=utc_now(), error=str(error))
+        else:
+            job.update(JobStatus.DONE, finished_at=utc_now(), result=result)
+        self._duration = 0.8 * self._duration + 0.2 * (time.monotonic() - start)
+        Counters.JOBS_FINISHED.value.labels(job.status).inc()
+        self._remember(job)
+        self._persist(job)
+
+    async def _fail_stale(self) -> None:
+        before = utc_now() - timedelta(seconds=self.stale_after)
+        try:
+            failed = await self.store.fail_stale(before)
+        except Exception as error:
+            logging.warning(f"Can not fail stale jobs: {error}")
+            return
+        if failed:
+            logging.warning(f"{failed} stale jobs were marked as failed")
+
+    def start(self) -> None:
+        """Starts the workers, jobs left unfinished by a dead worker are failed."""
+        if self.store is not None:
+            task = asyncio.create_task(self._fail_stale(), name="job-fail-stale")
+            self._saves.add(task)
+            task.add_done_callback(self._saves.discard)
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def aclose(self, timeout: float = 5) -> None:
+        """
+        Stops the workers, jobs still queued are failed. Waits up to `timeout`
+        seconds for the pending saves.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            job, _ = self._queue.get_nowait()
+            job.update(JobStatus.FAILED, finished_at=utc_now(), error="Shutdown")
+            self._persist(job)
+        if self._saves:
+            await asyncio.wait(self._saves, timeout=timeout)
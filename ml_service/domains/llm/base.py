@@ -1,5 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from enum import StrEnum, auto
 from typing import Any
@@ -30,9 +31,22 @@ class LLMResponse:
 
 class LLMClient(ABC):
     @abstractmethod
-    def chat(self, prompt: list[PromptMessage], **kwargs: Any) -> LLMResponse:
+    async def chat(self, prompt: list[PromptMessage], **kwargs: Any) -> LLMResponse:
         raise NotImplementedError
 
+    async def chat_stream(
+        self, prompt: list[PromptMessage], json_output: bool = False, **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Yields the completion piece by piece as it is generated.
+        Clients without streaming yield the whole completion at once.
+        """
+        response = await self.chat(prompt, json_output=json_output, **kwargs)
+        if response.error:
+            raise RuntimeError(f"{self.name} failed: {response.error}")
+        if response.content:
+            yield response.content
+
     @property
     def name(self) -> str:
         return self.__class__.__name__
@@ -1,13 +1,17 @@
 import json
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 
 from ml_service.domains.llm.base import LLMClient, LLMResponse, PromptMessage
-from ml_service.utils.retry import Retry
+from ml_service.settings.metrics import Counters
+from ml_service.utils.circuit_breaker import circuit_breakers
+from ml_service.utils.http import http_clients
+from ml_service.utils.retry import Retry, RetryBudget
 
-retry = Retry(verbose=True)
+retry = Retry(verbose=True, budget=RetryBudget())
 
 
 class DeepSeekClient(LLMClient):
@@ -17,6 +21,7 @@ class DeepSeekClient(LLMClient):
         model: str = "deepseek-chat",
         temperature: float = 0.3,
         timeout: float = 30,
+        client: httpx.AsyncClient | None = None,
     ) -> None:
         self.api_key = api_key
         self.model = model
@@ -24,6 +29,7 @@ class DeepSeekClient(LLMClient):
         self.timeout = httpx.Timeout(timeout)
         self.base_url = "https://api.deepseek.com"
         self.url_path = "chat/completions"
+        self._client = client
 
     @property
     def headers(self) -> dict[str, str]:
@@ -33,17 +39,26 @@ class DeepSeekClient(LLMClient):
         }
 
     @property
-    def _client(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(
-            timeout=self.timeout, headers=self.headers, base_url=self.base_url
-        )
+    def url(self) -> str:
+        return f"{self.base_url}/{self.url_path}"
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Long-lived pooled client, shared by all requests (and retries).
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = http_clients.get("deepseek")
+        return self._client
 
     @retry(
         n_times=5,
         sleep_duration=1,
         increasing=True,
         allowed_exceptions=(httpx.HTTPError,),
+        deadline=40,
     )
+    @circuit_breakers.protect("deepseek")
     async def _do_request(
         self, prompt: list[PromptMessage], **kwargs: Any
     ) -> dict[str, Any] | None:
@@ -54,10 +69,11 @@ class DeepSeekClient(LLMClient):
             "stream": False,
             **kwargs,
         }
-        async with self._client as client:
-            response = await client.post(self.url_path, json=payload)
-            response.raise_for_status()
-            return response.json()
+        response = await self.client.post(
+            self.url, json=payload, headers=self.headers, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def request_with_json_output(
         self, prompt: list[PromptMessage], **kwargs: Any
@@ -67,6 +83,65 @@ class DeepSeekClient(LLMClient):
             prompt=prompt, response_format=response_format, **kwargs
         )
 
+    async def chat_stream(
+        self, prompt: list[PromptMessage], json_output: bool = False, **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Streams the completion: the API sends server-sent events with content
+        deltas, each delta is yielded as soon as it arrives.
+        Not retried, a broken stream can not be resumed.
+        """
+        payload = {
+            "model": kwargs.pop("model", self.model),
+            "temperature": kwargs.pop("temperature", self.temperature),
+            "messages": self._prompt_to_messages(prompt),
+            "stream": True,
+            # the last chunk carries the usage, cache hits included
+            "stream_options": {"include_usage": True},
+            **kwargs,
+        }
+        if json_output:
+            payload["response_format"] = {"type": "json_object"}
+
+        with circuit_breakers.track("deepseek"):
+            async with self.client.stream(
+                "POST",
+                self.url,
+                json=payload,
+                headers=self.headers,
+                timeout=self.timeout,
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue  # keep-alive comments and blank separators
+                    chunk = line.removeprefix("data:").strip()
+                    if chunk == "[DONE]":
+                        break
+                    data = json.loads(chunk)
+                    self._record_usage(data)
+                    choices = data.get("choices") or []
+                    content = (
+                        choices[0].get("delta", {}).get("content") if choices else None
+                    )
+                    if content:
+                        yield content
+
+    def _record_usage(self, data: dict[str, Any] | None) -> None:
+        """
+        Exports the token usage of a completion. DeepSeek serves repeated
+        prompt prefixes from its context cache and reports the split.
+        """
+        usage = (data or {}).get("usage") or {}
+        for cache in ("hit", "miss"):
+            tokens = usage.get(f"prompt_cache_{cache}_tokens")
+            if tokens:
+                Counters.LLM_PROMPT_TOKENS.value.labels(self.name, cache).inc(tokens)
+        if usage.get("completion_tokens"):
+            Counters.LLM_COMPLETION_TOKENS.value.labels(self.name).inc(
+                usage["completion_tokens"]
+            )
+
     def _return_empty(
         self,
         prompt: list[PromptMessage],
@@ -86,12 +161,14 @@ class DeepSeekClient(LLMClient):
     async def chat(
         self, prompt: list[PromptMessage], json_output: bool = False, **kwargs: Any
     ) -> LLMResponse:
+        data = None
         try:
             data = (
                 await self.request_with_json_output(prompt, **kwargs)
                 if json_output
                 else await self._do_request(prompt, **kwargs)
             )
+            self._record_usage(data)
             if not data:
                 error = f"there is no data in response {prompt}"
                 logging.error(error)
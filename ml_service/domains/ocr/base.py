@@ -1,11 +1,17 @@
-import concurrent.futures
+import asyncio
 import logging
 import re
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable
 from typing import Callable, ParamSpec
 
 from PIL import Image
 
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.preprocessing import Preprocessing
+from ml_service.domains.ocr.regions import RegionDetector
+from ml_service.utils.executors import ExecutorSaturatedError, executors
+
 P = ParamSpec("P")
 
 CONFIDENCE_THRESHOLD = 0.6  # Default confidence threshold for OCR results
@@ -60,11 +66,20 @@ class OCRResult:
 
 
 class BaseOCRHandler(ABC):
+    # name of the executor local engines run on, see ml_service.utils.executors
+    executor_name: str = "ocr"
+
     def __init__(
-        self, next_handler: "BaseOCRHandler | None" = None, timeout: float | None = None
+        self,
+        next_handler: "BaseOCRHandler | None" = None,
+        timeout: float | None = None,
+        preprocessing: Preprocessing | None = None,
+        regions: RegionDetector | None = None,
     ) -> None:
         self.next_handler = next_handler
         self.timeout = timeout
+        self.preprocessing = preprocessing
+        self.regions = regions
 
     @property
     def name(self) -> str:
@@ -73,6 +88,42 @@ class BaseOCRHandler(ABC):
         """
         return self.__class__.__name__
 
+    @property
+    def signature(self) -> str:
+        """
+        Describes the handler configuration that affects its output.
+        Override in subclasses with engine settings (languages, modes, ...).
+        """
+        return self.name
+
+    @property
+    def chain(self) -> list["BaseOCRHandler"]:
+        """
+        This handler and every handler after it, in fallback order.
+        """
+        handler: BaseOCRHandler | None = self
+        handlers = []
+        while handler:
+            handlers.append(handler)
+            handler = handler.next_handler
+        return handlers
+
+    @property
+    def chain_signature(self) -> str:
+        """
+        Signature of this handler and every handler after it in the chain,
+        preprocessing and region detection included.
+        """
+        return "->".join(
+            handler.signature
+            + "".join(
+                f"[{option.signature}]"
+                for option in (handler.preprocessing, handler.regions)
+                if option is not None
+            )
+            for handler in self.chain
+        )
+
     def get_empty_result(self, error: str | Exception | None = None) -> OCRResult:
         error = (
             error
@@ -87,28 +138,140 @@ class BaseOCRHandler(ABC):
         self, func: Callable[P, OCRResult], *args: P.args, **kwargs: P.kwargs
     ) -> OCRResult | None:
         """
-        Runs the given function with a timeout using concurrent futures.
-        If the function does not complete within the timeout, it will return None.
-        If an exception occurs, it will be logged and None will be returned.
+        Runs the given function on the shared OCR executor with a timeout.
+        If the function does not complete within the timeout, it will return None
+        right away, the overrunning work is abandoned.
+        If an exception occurs, it will be logged and None will be returned,
+        except `ExecutorSaturatedError`: a full executor is not a handler failure,
+        it is raised so the request is answered with 503.
         """
         if not self.timeout:
             return func(*args, **kwargs)
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(func, *args, **kwargs)
+        try:
+            return executors.get(self.executor_name).run(
+                func, *args, timeout=self.timeout, **kwargs
+            )
+        except TimeoutError:
+            logging.warning(
+                f"OCR {self.name} processing timed out after {self.timeout} seconds."
+            )
+            return None
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            logging.error(f"Error in OCR processing: {e}.")
+            return None
+
+    @property
+    def is_async(self) -> bool:
+        """
+        True for handlers with a coroutine `_process_image` (remote APIs).
+        """
+        return asyncio.iscoroutinefunction(self._process_image)
+
+    def prepare(self, image: ImageEnvelope) -> ImageEnvelope:
+        """
+        Applies the handler preprocessing. CPU-bound, call it off the event loop.
+        Coroutine handlers override it to do the rest of their CPU work
+        (encoding, decoding) up front, it always runs on the executor for them.
+        """
+        if self.preprocessing is None:
+            return image
+        return self.preprocessing.apply(image)
+
+    def _process_image_sync(self, image: ImageEnvelope) -> OCRResult:
+        """
+        Preprocesses the image and calls `_process_image` from synchronous code.
+        Coroutine handlers (remote APIs) use clients bound to the service event
+        loop and are async only: the sync `process` passes the image on to the
+        next handler. Handlers able to run synchronously override this method.
+        """
+        if self.is_async:
+            return self.get_empty_result(
+                error=f"OCR {self.name} is async only, use aprocess"
+            )
+        image = self.prepare(image)
+        if self.regions is not None:
+            return self._process_regions(image)
+        return self._process_image(image)
+
+    def _process_regions(self, image: ImageEnvelope) -> OCRResult:
+        """
+        Recognises only the detected text blocks, in parallel on the
+        `ocr-regions` executor, and joins them in reading order.
+        Pages without a block structure are recognised whole.
+        """
+        boxes = self.regions.detect(image) if self.regions else []
+        if not boxes:
+            return self._process_image(image)
+
+        crops = [ImageEnvelope(image=image.image.crop(box)) for box in boxes]
+        if len(crops) == 1:
+            return self._process_image(crops[0])
+
+        executor = executors.get("ocr-regions")
+        futures = []
+        for crop in crops:
             try:
-                result = future.result(timeout=self.timeout)
-                return result
-            except concurrent.futures.TimeoutError:
-                logging.warning(
-                    f"OCR {self.name} processing timed out after {self.timeout} seconds."
-                )
-                return None
-            except Exception as e:
-                logging.error(f"Error in OCR processing: {e}.")
-                return None
+                futures.append(executor.submit(self._process_image, crop))
+            except ExecutorSaturatedError:
+                futures.append(None)  # recognised on this thread instead
+
+        results = [
+            future.result() if future else self._process_image(crop)
+            for future, crop in zip(futures, crops)
+        ]
+        logging.debug(f"OCR {self.name} recognised {len(crops)} regions")
+        return self._merge_region_results(results)
 
-    def should_skip(self, image: Image.Image) -> bool:
+    def _merge_region_results(self, results: list[OCRResult]) -> OCRResult:
+        """
+        Joins region texts, the confidence is weighted by text length.
+        Regions without text (false detections) are ignored.
+        """
+        recognised = [r for r in results if r.text and not r.error]
+        if not recognised:
+            errors = [r.error for r in results if r.error]
+            return self.get_empty_result(
+                error=errors[0] if errors else "No text found in the detected regions"
+            )
+
+        length = sum(len(r.text) for r in recognised)
+        return OCRResult(
+            text=" ".join(r.text for r in recognised),
+            confidence=sum(r.confidence * len(r.text) for r in recognised) / length,
+            engine=self.name,
+        )
+
+    async def arun_with_timeout(self, image: ImageEnvelope) -> OCRResult | None:
+        """
+        Runs `_process_image` under an asyncio deadline.
+        Local engines are offloaded to the shared executor (preprocessing included),
+        remote engines are awaited directly after `prepare` on the executor.
+        On timeout the awaiting is cancelled and None is returned, so a stalled
+        handler never holds the request past its deadline.
+        `ExecutorSaturatedError` is raised, like in `run_with_timeout`.
+        """
+        try:
+            async with asyncio.timeout(self.timeout):
+                executor = executors.get(self.executor_name)
+                if not self.is_async:
+                    return await executor.arun(self._process_image_sync, image)
+                image = await executor.arun(self.prepare, image)
+                return await self._process_image(image)
+        except TimeoutError:
+            logging.warning(
+                f"OCR {self.name} processing timed out after {self.timeout} seconds."
+            )
+            return None
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            logging.error(f"Error in OCR processing: {e}.")
+            return None
+
+    def should_skip(self, image: ImageEnvelope) -> bool:
         """
         Override this method in subclasses to implement specific skipping criteria.
         False by default.
@@ -126,14 +289,17 @@ class BaseOCRHandler(ABC):
         return result.confidence >= CONFIDENCE_THRESHOLD
 
     @abstractmethod
-    def _process_image(self, image: Image.Image) -> OCRResult:
+    def _process_image(self, image: ImageEnvelope) -> OCRResult | Awaitable[OCRResult]:
         """
         Abstract method to process the image and return an OCRResult.
-        Subclasses must implement this method.
+        The envelope gives access to the decoded image, its NumPy view
+        and encodings, each computed at most once per request.
+        Subclasses must implement this method, either as a regular method
+        (local engines) or as a coroutine (remote APIs).
         """
         pass
 
-    def process(self, image: Image.Image) -> OCRResult:
+    def process(self, image: Image.Image | ImageEnvelope) -> OCRResult:
         """
         Processes the image using the OCR handler.
         If the image should be skipped, it will pass the image to the next handler if available.
@@ -141,6 +307,7 @@ class BaseOCRHandler(ABC):
         If the result is rejected, it will pass the image to the next handler if available.
         If no next handler is available, it will return an empty OCRResult.
         """
+        image = ImageEnvelope.wrap(image)
         if self.should_skip(image):
             logging.warning(f"OCR {self.name} skipping image.")
             if self.next_handler:
@@ -154,7 +321,7 @@ class BaseOCRHandler(ABC):
                 )
                 return OCRResult(text="", confidence=0.0, engine=self.name)
 
-        result = self.run_with_timeout(self._process_image, image)
+        result = self.run_with_timeout(self._process_image_sync, image)
         if result and self.can_accept(result):
             logging.debug(f"OCR {self.name} accepted result: {result}")
             return result
@@ -173,7 +340,65 @@ class BaseOCRHandler(ABC):
                 error=Exception("No next handler available."),
             )
 
-    def estimate_basic_confidence(self, text: str, image: Image.Image) -> float:
+    async def aprocess(self, image: Image.Image | ImageEnvelope) -> OCRResult:
+        """
+        Async version of `process`, the chain is walked without blocking the event loop.
+        """
+        image = ImageEnvelope.wrap(image)
+        if self.should_skip(image):
+            logging.warning(f"OCR {self.name} skipping image.")
+            if self.next_handler:
+                logging.info(
+                    f"OCR {self.name} passing image to next handler: {self.next_handler.name}"
+                )
+                return await self.next_handler.aprocess(image)
+            else:
+                logging.error(
+                    f"OCR {self.name} has no next handler to pass the image to."
+                )
+                return OCRResult(text="", confidence=0.0, engine=self.name)
+
+        result = await self.arun_with_timeout(image)
+        if result and self.can_accept(result):
+            logging.debug(f"OCR {self.name} accepted result: {result}")
+            return result
+        elif self.next_handler:
+            logging.warning(f"OCR {self.name} rejected result: {result}")
+            logging.info(
+                f"OCR {self.name} passing result to next handler: {self.next_handler.name}"
+            )
+            return await self.next_handler.aprocess(image)
+        else:
+            logging.error(f"OCR {self.name} has no next handler to pass the result to.")
+            return OCRResult(
+                text="",
+                confidence=0.0,
+                engine=self.name,
+                error=Exception("No next handler available."),
+            )
+
+    async def aprocess_once(
+        self, image: Image.Image | ImageEnvelope
+    ) -> OCRResult | None:
+        """
+        Runs only this handler, without falling back to the next one.
+        Returns None if the image is skipped or the result is rejected.
+        """
+        image = ImageEnvelope.wrap(image)
+        if self.should_skip(image):
+            logging.warning(f"OCR {self.name} skipping image.")
+            return None
+
+        result = await self.arun_with_timeout(image)
+        if result and self.can_accept(result):
+            logging.debug(f"OCR {self.name} accepted result: {result}")
+            return result
+        logging.warning(f"OCR {self.name} rejected result: {result}")
+        return None
+
+    def estimate_basic_confidence(
+        self, text: str, image: Image.Image | ImageEnvelope
+    ) -> float:
         """
         Estimates the basic confidence of the OCR result based on the length of the text.
         This is a placeholder method and can be overridden in subclasses for more complex logic.
@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+
+import orjson
+
+from ml_service.domains.ocr.base import BaseOCRHandler, OCRResult
+from ml_service.domains.ocr.hedged import HedgedOCRChain
+from ml_service.settings.config import OCRConfig
+from ml_service.settings.metrics import Counters
+from ml_service.utils.executors import executors
+
+# bump to invalidate every cached result after changing OCR post-processing
+CACHE_VERSION = "1"
+
+
+def make_cache_key(data_hash: str, chain: BaseOCRHandler | HedgedOCRChain) -> str:
+    """
+    The key is the hash of the uploaded bytes plus the chain configuration,
+    so changing handlers or their settings never serves stale text.
+    """
+    chain_hash = hashlib.sha256(chain.chain_signature.encode()).hexdigest()[:16]
+    return f"{CACHE_VERSION}:{chain_hash}:{data_hash}"
+
+
+def _dump(result: OCRResult) -> bytes:
+    return orjson.dumps(
+        {
+            "text": result.text,
+            "confidence": result.confidence,
+            "engine": result.engine,
+            "created": time.time(),
+        }
+    )
+
+
+def _load(raw: bytes) -> tuple[OCRResult, float]:
+    data = orjson.loads(raw)
+    result = OCRResult(
+        text=data["text"], confidence=data["confidence"], engine=data["engine"]
+    )
+    return result, data["created"]
+
+
+class CacheTier(ABC):
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> OCRResult | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, result: OCRResult) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheTier(CacheTier):
+    """In-process LRU with a TTL."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[OCRResult, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> OCRResult | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            result, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                Counters.OCR_CACHE_EVICTIONS.value.labels(self.name).inc()
+                return None
+            self._data.move_to_end(key)
+            return result
+
+    async def set(self, key: str, result: OCRResult) -> None:
+        with self._lock:
+            self._data[key] = (result, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                Counters.OCR_CACHE_EVICTIONS.value.labels(self.name).inc()
+
+
+class DiskCacheTier(CacheTier):
+    """
+    Persistent tier, one small JSON file per key.
+    Survives restarts and is shared by every worker on the host.
+    File I/O runs on the default executor.
+    """
+
+    name = "disk"
+
+    def __init__(self, directory: str | Path, ttl: float, max_entries: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key.replace(':', '_')}.json"
+
+    def _read(self, key: str) -> OCRResult | None:
+        path = self._path(key)
+        try:
+            result, created = _load(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            logging.warning(f"OCR cache: dropping unreadable entry {path}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if created + self.ttl < time.time():
+            path.unlink(missing_ok=True)
+            Counters.OCR_CACHE_EVICTIONS.value.labels(self.name).inc()
+            return None
+        return result
+
+    def _write(self, key: str, result: OCRResult) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(_dump(result))
+        tmp.replace(path)
+
+        # trimming scans the directory, so do it once in a while only
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._trim()
+
+    def _trim(self) -> None:
+        entries = list(self.directory.glob("*.json"))
+        overflow = len(entries) - self.max_entries
+        if overflow <= 0:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for path in entries[:overflow]:
+            path.unlink(missing_ok=True)
+        Counters.OCR_CACHE_EVICTIONS.value.labels(self.name).inc(overflow)
+
+    async def get(self, key: str) -> OCRResult | None:
+        return await executors.get().arun(self._read, key)
+
+    async def set(self, key: str, result: OCRResult) -> None:
+        await executors.get().arun(self._write, key, result)
+
+
+class OCRCache:
+    """
+    Multi-tier OCR result cache, checked in front of the handler chain.
+    Tiers are ordered fastest first, a hit in a slower tier is promoted
+    into the faster ones.
+    """
+
+    def __init__(self, tiers: list[CacheTier]) -> None:
+        self.tiers = tiers
+
+    @classmethod
+    def from_config(cls, config: OCRConfig) -> "OCRCache | None":
+        if not config.cache_enabled:
+            return None
+        tiers: list[CacheTier] = [MemoryCacheTier(config.cache_size, config.cache_ttl)]
+        if config.cache_dir:
+            tiers.append(
+                DiskCacheTier(
+                    config.cache_dir, config.cache_ttl, config.cache_dir_max_entries
+                )
+            )
+        return cls(tiers)
+
+    async def get(self, key: str) -> OCRResult | None:
+        for i, tier in enumerate(self.tiers):
+            try:
+                result = await tier.get(key)
+            except Exception:
+                logging.exception(f"OCR cache: {tier.name} tier lookup failed")
+                continue
+            if result is not None:
+                Counters.OCR_CACHE_HITS.value.labels(tier.name).inc()
+                for faster in self.tiers[:i]:
+                    await faster.set(key, result)
+                return result
+        Counters.OCR_CACHE_MISSES.value.inc()
+        return None
+
+    async def set(self, key: str, result: OCRResult) -> None:
+        """Only accepted results are cached, failures are retried next time."""
+        if result.error or not result.text:
+            return
+        for tier in self.tiers:
+            try:
+                await tier.set(key, result)
+            except Exception:
+                logging.exception(f"OCR cache: {tier.name} tier write failed")
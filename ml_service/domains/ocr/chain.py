@@ -1,6 +1,7 @@
 from typing import Any
 
-from autocare.ml.ocr.base import BaseOCRHandler
+from ml_service.domains.ocr.base import BaseOCRHandler
+from ml_service.domains.ocr.hedged import HedgedOCRChain
 
 
 class OCRChainFactory:
@@ -26,3 +27,10 @@ class OCRChainFactory:
         if chain is None:
             raise ValueError("No handlers have been added to the chain.")
         return chain
+
+    def create_hedged_chain(
+        self, delay: float | None = None, max_parallel: int = 2
+    ) -> HedgedOCRChain:
+        return HedgedOCRChain(
+            self.create_chain(), delay=delay, max_parallel=max_parallel
+        )
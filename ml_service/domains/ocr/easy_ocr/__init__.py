@@ -1,64 +1,176 @@
 import logging
-from io import BytesIO
+from typing import TYPE_CHECKING, Any
 
-import easyocr
-from PIL import Image
+import numpy as np
 
 from ml_service.domains.ocr.base import BaseOCRHandler, OCRResult
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.preprocessing import Preprocessing
+from ml_service.domains.ocr.regions import RegionDetector
+from ml_service.utils.batching import MicroBatcher
+from ml_service.utils.executors import ExecutorSaturatedError, executors
+
+if TYPE_CHECKING:
+    import easyocr
+
+    from ml_service.domains.ocr.model_host import RemoteReader
 
 EASYOCR_ITEM_LENGTH = 3
+DEFAULT_LANGUAGES = ["ru", "en"]
 
 
 class EasyOCRHandler(BaseOCRHandler):
     def __init__(
         self,
         use_gpu: bool = False,
-        languages: list[str] = ["ru", "en"],
+        languages: list[str] = DEFAULT_LANGUAGES,
         next_handler: BaseOCRHandler | None = None,
         timeout: float | None = None,
+        preprocessing: Preprocessing | None = None,
+        regions: RegionDetector | None = None,
+        reader: "easyocr.Reader | RemoteReader | None" = None,
     ) -> None:
-        super().__init__(next_handler=next_handler, timeout=timeout)
+        super().__init__(
+            next_handler=next_handler,
+            timeout=timeout,
+            preprocessing=preprocessing,
+            regions=regions,
+        )
         self.languages = languages
-        self.reader = easyocr.Reader(languages, gpu=use_gpu)
+        if reader is None:
+            # torch is only imported by processes that actually hold the model
+            import easyocr
 
-    def _process_image(self, image: Image.Image) -> OCRResult:
-        try:
-            with BytesIO() as buffer:
-                image.save(buffer, format="PNG")
-                buffer.seek(0)
-                results = self.reader.readtext(
-                    buffer.getvalue(), detail=1, paragraph=False
-                )
-
-            if not results or not isinstance(results, list):
-                error_msg = "No text detected or invalid result format from EasyOCR."
-                logging.error(error_msg)
-                return self.get_empty_result(error=error_msg)
-
-            text_parts = []
-            confidences = []
-
-            for item in results:
-                if not isinstance(item, list | tuple):
-                    continue
-                if (
-                    len(item) >= EASYOCR_ITEM_LENGTH
-                    and isinstance(item[1], str)
-                    and isinstance(item[2], float)
-                ):
-                    text_parts.append(item[1])
-                    confidences.append(item[2])
-
-            if not text_parts:
-                error_msg = "No valid text blocks found in EasyOCR result."
-                logging.warning(error_msg)
-                return self.get_empty_result(error=error_msg)
-
-            text = " ".join(text_parts).replace("\r", "").replace("\n", "").strip()
-            confidence = sum(confidences) / len(confidences)
-
-            return OCRResult(text=text, confidence=confidence, engine=self.name)
+            reader = easyocr.Reader(languages, gpu=use_gpu)
+        self.reader = reader
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}:{'+'.join(self.languages)}"
 
+    def _process_image(self, image: ImageEnvelope) -> OCRResult:
+        try:
+            # the decoded pixels go straight to the model, no PNG round trip
+            results = self.reader.readtext(image.array, detail=1, paragraph=False)
+            return self._parse_results(results)
         except Exception as error:
             logging.error(f"Error processing image with EasyOCR: {error}")
             return self.get_empty_result(error=error)
+
+    def _parse_results(self, results: Any) -> OCRResult:
+        if not results or not isinstance(results, list):
+            error_msg = "No text detected or invalid result format from EasyOCR."
+            logging.error(error_msg)
+            return self.get_empty_result(error=error_msg)
+
+        text_parts = []
+        confidences = []
+
+        for item in results:
+            if not isinstance(item, list | tuple):
+                continue
+            if (
+                len(item) >= EASYOCR_ITEM_LENGTH
+                and isinstance(item[1], str)
+                and isinstance(item[2], float)
+            ):
+                text_parts.append(item[1])
+                confidences.append(item[2])
+
+        if not text_parts:
+            error_msg = "No valid text blocks found in EasyOCR result."
+            logging.warning(error_msg)
+            return self.get_empty_result(error=error_msg)
+
+        text = " ".join(text_parts).replace("\r", "").replace("\n", "").strip()
+        confidence = sum(confidences) / len(confidences)
+
+        return OCRResult(text=text, confidence=confidence, engine=self.name)
+
+
+def pad_to_common_size(arrays: list[np.ndarray]) -> list[np.ndarray]:
+    """
+    Batched detection needs equally sized inputs. Images are padded
+    with white at the bottom/right instead of resized, so text is not
+    distorted and box coordinates stay valid for the original image.
+    """
+    if any(array.ndim == 3 for array in arrays):
+        arrays = [
+            np.repeat(array[..., None], 3, axis=2) if array.ndim == 2 else array
+            for array in arrays
+        ]
+    height = max(array.shape[0] for array in arrays)
+    width = max(array.shape[1] for array in arrays)
+
+    padded = []
+    for array in arrays:
+        if array.shape[:2] == (height, width):
+            padded.append(array)
+            continue
+        canvas = np.full((height, width, *array.shape[2:]), 255, dtype=array.dtype)
+        canvas[: array.shape[0], : array.shape[1]] = array
+        padded.append(canvas)
+    return padded
+
+
+class BatchedEasyOCRHandler(EasyOCRHandler):
+    """
+    EasyOCR behind a micro-batcher: images of concurrent requests arriving
+    within `batch_window` seconds are recognised by one `readtext_batched`
+    call (up to `max_batch_size` images), which keeps the model busy
+    with full batches under load.
+    """
+
+    def __init__(
+        self,
+        use_gpu: bool = False,
+        languages: list[str] = DEFAULT_LANGUAGES,
+        next_handler: BaseOCRHandler | None = None,
+        timeout: float | None = None,
+        preprocessing: Preprocessing | None = None,
+        reader: "easyocr.Reader | RemoteReader | None" = None,
+        max_batch_size: int = 8,
+        batch_window: float = 0.01,
+    ) -> None:
+        super().__init__(
+            use_gpu=use_gpu,
+            languages=languages,
+            next_handler=next_handler,
+            timeout=timeout,
+            preprocessing=preprocessing,
+            reader=reader,
+        )
+        self.batcher: MicroBatcher[ImageEnvelope, Any] = MicroBatcher(
+            "easyocr", self._recognize_batch, max_batch_size, batch_window
+        )
+
+    def _readtext_batched(self, images: list[ImageEnvelope]) -> list:
+        # the NumPy views are built here, on the executor, never on the event loop
+        arrays = [image.array for image in images]
+        if len(arrays) == 1:
+            return [self.reader.readtext(arrays[0], detail=1, paragraph=False)]
+        return self.reader.readtext_batched(
+            pad_to_common_size(arrays),
+            batch_size=len(arrays),
+            detail=1,
+            paragraph=False,
+        )
+
+    async def _recognize_batch(self, images: list[ImageEnvelope]) -> list:
+        return await executors.get(self.executor_name).arun(
+            self._readtext_batched, images
+        )
+
+    def _process_image_sync(self, image: ImageEnvelope) -> OCRResult:
+        # synchronous callers have nothing to batch with
+        return EasyOCRHandler._process_image(self, self.prepare(image))
+
+    async def _process_image(self, image: ImageEnvelope) -> OCRResult:
+        try:
+            results = await self.batcher.submit(image)
+            return self._parse_results(results)
+        except ExecutorSaturatedError:
+            raise
+        except Exception as error:
+            logging.error(f"Error processing image with batched EasyOCR: {error}")
+            return self.get_empty_result(error=error)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+
+from PIL import Image
+
+from ml_service.domains.ocr.base import BaseOCRHandler, OCRResult
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.utils.executors import ExecutorSaturatedError
+
+
+class HedgedOCRChain:
+    """
+    Runs the handlers of a chain speculatively instead of strictly one by one.
+
+    Handlers are started in the usual fallback order. The next one is started
+    when a running handler gives up (skipped or rejected result) or, with
+    `delay` set, when no handler has answered for `delay` seconds. At most
+    `max_parallel` handlers run at once. The first result that passes
+    `can_accept` wins, the remaining handlers are cancelled.
+
+    `delay=0` runs `max_parallel` handlers at once, `delay=None` disables
+    time-based hedging, `max_parallel=1` is the plain sequential chain.
+    """
+
+    def __init__(
+        self,
+        chain: BaseOCRHandler,
+        delay: float | None = None,
+        max_parallel: int = 2,
+    ) -> None:
+        self.handlers = chain.chain
+        self.delay = delay
+        self.max_parallel = max(max_parallel, 1)
+        self._chain = chain
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__
+
+    @property
+    def chain_signature(self) -> str:
+        # same handlers accept the same results, so cached results are shared
+        return self._chain.chain_signature
+
+    def _empty_result(self) -> OCRResult:
+        return OCRResult(
+            text="",
+            confidence=0.0,
+            engine=self.name,
+            error=Exception("No handler accepted the image."),
+        )
+
+    async def aprocess(self, image: Image.Image | ImageEnvelope) -> OCRResult:
+        image = ImageEnvelope.wrap(image)
+        handlers = iter(self.handlers)
+        running: dict[asyncio.Task, BaseOCRHandler] = {}
+
+        def start_next() -> bool:
+            handler = next(handlers, None)
+            if handler is None:
+                return False
+            logging.info(f"OCR {self.name} starting {handler.name}")
+            running[asyncio.create_task(handler.aprocess_once(image))] = handler
+            return True
+
+        start_next()
+        exhausted = False
+        try:
+            while running:
+                can_hedge = not exhausted and len(running) < self.max_parallel
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self.delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logging.info(f"OCR {self.name} hedging after {self.delay}s")
+                    exhausted = not start_next()
+                    continue
+
+                for task in done:
+                    handler = running.pop(task)
+                    try:
+                        result = task.result()
+                    except ExecutorSaturatedError:
+                        raise
+                    except Exception as e:
+                        logging.error(f"OCR {self.name} {handler.name} failed: {e}")
+                        result = None
+                    if result is not None:
+                        logging.debug(f"OCR {self.name} {handler.name} won the race")
+                        return result
+                    if not exhausted:
+                        exhausted = not start_next()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        logging.error(f"OCR {self.name} no handler accepted the image.")
+        return self._empty_result()
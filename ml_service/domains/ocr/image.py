@@ -0,0 +1,136 @@
+import hashlib
+import threading
+from collections.abc import Callable, Hashable
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# formats external APIs accept as is, no need to re-encode the upload
+UPLOADABLE_FORMATS = {"JPEG", "PNG", "GIF", "BMP", "TIFF"}
+# in-memory (e.g. preprocessed) photos are uploaded as JPEG, PNG is far larger
+JPEG_MODES = {"L", "RGB"}
+
+
+class ImageEnvelope:
+    """
+    One photo passed through the whole OCR chain.
+
+    Carries the original upload bytes and lazily computes (at most once)
+    everything handlers need: the decoded PIL image, a NumPy view for
+    local engines, encodings per format, the content hash
+    and derived variants (preprocessed images).
+    Thread-safe, handlers may run on different executor threads.
+    """
+
+    def __init__(self, data: bytes | None = None, image: Image.Image | None = None):
+        if data is None and image is None:
+            raise ValueError("ImageEnvelope needs either bytes or an image")
+        self.data = data
+        self._image = image
+        self._array: np.ndarray | None = None
+        self._encoded: dict[str, bytes] = {}
+        self._hash: str | None = None
+        self._derived: dict[Hashable, ImageEnvelope] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def wrap(cls, image: "Image.Image | ImageEnvelope") -> "ImageEnvelope":
+        return image if isinstance(image, ImageEnvelope) else cls(image=image)
+
+    def decode(self) -> Image.Image:
+        """
+        Decodes the upload, raises `PIL.UnidentifiedImageError` for non-images.
+        """
+        if self._image is None:
+            with self._lock:
+                if self._image is None:
+                    image = Image.open(BytesIO(self.data))  # type: ignore[arg-type]
+                    image.load()
+                    self._image = image
+        return self._image
+
+    @property
+    def image(self) -> Image.Image:
+        return self.decode()
+
+    @property
+    def format(self) -> str | None:
+        """Format of the original upload (`JPEG`, `PNG`, ...)."""
+        return self.image.format if self.data is not None else None
+
+    @property
+    def width(self) -> int:
+        return self.image.width
+
+    @property
+    def height(self) -> int:
+        return self.image.height
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        Read-only RGB (or grayscale) NumPy view of the image, shared by local engines.
+        """
+        if self._array is None:
+            with self._lock:
+                if self._array is None:
+                    image = self.image
+                    if image.mode not in ("RGB", "L"):
+                        image = image.convert("RGB")
+                    array = np.asarray(image)
+                    array.flags.writeable = False
+                    self._array = array
+        return self._array
+
+    def encoded(self, format: str = "PNG") -> bytes:
+        """
+        The image encoded in `format`. The original bytes are returned
+        when the upload already is in that format.
+        """
+        format = format.upper()
+        if self.data is not None and self.format == format:
+            return self.data
+
+        encoded = self._encoded.get(format)
+        if encoded is None:
+            with self._lock:
+                encoded = self._encoded.get(format)
+                if encoded is None:
+                    with BytesIO() as buffer:
+                        self.image.save(buffer, format=format)
+                        encoded = self._encoded[format] = buffer.getvalue()
+        return encoded
+
+    def uploadable(self) -> tuple[bytes, str]:
+        """
+        Bytes and format to send to an external API,
+        the original upload if possible, JPEG or PNG otherwise.
+        """
+        if self.data is not None and self.format in UPLOADABLE_FORMATS:
+            return self.data, self.format  # type: ignore[return-value]
+        format = "JPEG" if self.image.mode in JPEG_MODES else "PNG"
+        return self.encoded(format), format
+
+    def derive(
+        self, key: Hashable, build: Callable[[], "ImageEnvelope"]
+    ) -> "ImageEnvelope":
+        """
+        A variant of this image built by `build`, computed once per `key`
+        (e.g. per preprocessing preset) and shared by every handler.
+        """
+        derived = self._derived.get(key)
+        if derived is None:
+            with self._lock:
+                derived = self._derived.get(key)
+                if derived is None:
+                    derived = self._derived[key] = build()
+        return derived
+
+    @property
+    def content_hash(self) -> str:
+        """sha256 of the original upload (of the PNG encoding for in-memory images)."""
+        if self._hash is None:
+            data = self.data if self.data is not None else self.encoded("PNG")
+            self._hash = hashlib.sha256(data).hexdigest()
+        return self._hash
@@ -0,0 +1,290 @@
+"""
+Shared OCR model host.
+
+Uvicorn starts its workers with `spawn`, so models loaded in the parent are
+not shared copy-on-write: every worker would hold its own torch weights.
+Instead one inference process loads `OCR_MODEL_HOST_REPLICAS` copies of each
+model and the HTTP workers submit images to it, every call runs on a free
+copy. Pixels are handed over through `multiprocessing.shared_memory`, only
+their name, shape and the (small) recognition results travel over the
+manager connection.
+
+The host is started by `main.py` (`OCR_MODEL_HOST=true`) or runs standalone:
+
+    python -m ml_service.domains.ocr.model_host
+"""
+
+import contextlib
+import logging
+import os
+import queue
+import secrets
+import threading
+from collections.abc import Iterator
+from multiprocessing import get_context
+from multiprocessing.managers import BaseManager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+
+from ml_service.settings.config import OCRConfig, config
+
+AUTHKEY_ENV = "OCR_MODEL_HOST_AUTHKEY"
+
+READER_METHODS = {"readtext", "readtext_batched"}
+
+# (name, shape, dtype) of an image placed in shared memory
+SharedImage = tuple[str, tuple[int, ...], str]
+ReaderKey = tuple[tuple[str, ...], bool]
+
+
+class ModelHostError(RuntimeError):
+    """Raised in the HTTP worker when the host fails to run a model."""
+
+
+class _ReaderPool:
+    """
+    Up to `size` replicas of one reader. A reader is not thread-safe, so a
+    call takes a free replica for itself; replicas are loaded on demand
+    and calls wait only when all of them are busy.
+    """
+
+    def __init__(self, key: ReaderKey, size: int) -> None:
+        self.key = key
+        self.size = max(size, 1)
+        self._free: queue.Queue[Any] = queue.Queue()
+        self._loaded = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        import easyocr
+
+        languages, gpu = self.key
+        logging.info(
+            f"Model host: loading EasyOCR {languages} (gpu={gpu}),"
+            f" replica {self._loaded}/{self.size}"
+        )
+        return easyocr.Reader(list(languages), gpu=gpu)
+
+    def _grow(self) -> bool:
+        """Loads one more replica into the free queue, `False` at `size`."""
+        with self._lock:
+            if self._loaded >= self.size:
+                return False
+            self._loaded += 1
+        try:
+            self._free.put(self._load())
+        except BaseException:
+            with self._lock:
+                self._loaded -= 1
+            raise
+        return True
+
+    def preload(self) -> None:
+        while self._grow():
+            pass
+
+    @contextlib.contextmanager
+    def acquire(self) -> Iterator[Any]:
+        try:
+            reader = self._free.get_nowait()
+        except queue.Empty:
+            self._grow()
+            reader = self._free.get()
+        try:
+            yield reader
+        finally:
+            self._free.put(reader)
+
+
+class _ModelHost:
+    """
+    Lives in the host process, one pool of `replicas` readers per
+    (languages, gpu) shared by every worker. The manager serves every
+    connection on its own thread, so up to `replicas` calls run at once.
+    """
+
+    def __init__(self, replicas: int = 1) -> None:
+        self.replicas = replicas
+        self._pools: dict[ReaderKey, _ReaderPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, key: ReaderKey) -> _ReaderPool:
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = _ReaderPool(key, self.replicas)
+            return self._pools[key]
+
+    def preload(self, languages: list[str], gpu: bool) -> None:
+        self._pool((tuple(languages), gpu)).preload()
+
+    def run(
+        self,
+        languages: list[str],
+        gpu: bool,
+        method: str,
+        images: list[SharedImage],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """
+        Calls `Reader.<method>` (`readtext` or `readtext_batched`) on images
+        attached from shared memory. Errors are re-raised as plain messages,
+        a traceback would keep the shared buffers alive.
+        """
+        if method not in READER_METHODS:
+            raise ModelHostError(f"Unsupported reader method: {method}")
+        pool = self._pool((tuple(languages), gpu))
+        blocks = [SharedMemory(name=name, track=False) for name, _, _ in images]
+        arrays: list[np.ndarray] = []
+        error = None
+        try:
+            arrays = [
+                np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                for block, (_, shape, dtype) in zip(blocks, images)
+            ]
+            with pool.acquire() as reader:
+                if method == "readtext":
+                    return getattr(reader, method)(arrays[0], **kwargs)
+                return getattr(reader, method)(arrays, **kwargs)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        finally:
+            arrays.clear()
+            for block in blocks:
+                block.close()
+        raise ModelHostError(error)
+
+
+_host: _ModelHost | None = None
+
+
+def _get_host() -> _ModelHost:
+    global _host
+    if _host is None:
+        _host = _ModelHost(replicas=config.ocr.model_host_replicas)
+    return _host
+
+
+class ModelHostServer(BaseManager):
+    pass
+
+
+class ModelHostClient(BaseManager):
+    pass
+
+
+ModelHostServer.register("host", callable=_get_host)
+ModelHostClient.register("host")
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """`host:port` for TCP, anything else is a unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return address
+
+
+def get_authkey(settings: OCRConfig) -> bytes:
+    key = settings.model_host_authkey.get_secret_value() or os.environ.get(
+        AUTHKEY_ENV, ""
+    )
+    return key.encode()
+
+
+def _preload(settings: OCRConfig) -> None:
+    from ml_service.domains.ocr.easy_ocr import DEFAULT_LANGUAGES
+
+    if "easyocr" in settings.handlers:
+        _get_host().preload(DEFAULT_LANGUAGES, settings.easyocr_use_gpu)
+
+
+def start_model_host(settings: OCRConfig) -> ModelHostServer:
+    """
+    Starts the host in a child process, before the HTTP workers.
+    Without a configured authkey a random one is generated and passed
+    to the workers through the environment.
+    """
+    if not get_authkey(settings):
+        os.environ[AUTHKEY_ENV] = secrets.token_hex(16)
+
+    address = parse_address(settings.model_host_address)
+    if isinstance(address, str) and os.path.exists(address):
+        os.unlink(address)  # stale socket of a previous run
+
+    server = ModelHostServer(
+        address=address, authkey=get_authkey(settings), ctx=get_context("spawn")
+    )
+    server.start(initializer=_preload, initargs=(settings,))
+    logging.info(f"OCR model host is listening on {settings.model_host_address}")
+    return server
+
+
+class RemoteReader:
+    """
+    Drop-in replacement of `easyocr.Reader` running on the model host.
+    Safe to use from several threads, every thread gets its own connection.
+    """
+
+    def __init__(
+        self,
+        languages: list[str],
+        gpu: bool = False,
+        address: str = config.ocr.model_host_address,
+        authkey: bytes | None = None,
+    ) -> None:
+        self.languages = list(languages)
+        self.gpu = gpu
+        self.address = parse_address(address)
+        self.authkey = authkey if authkey is not None else get_authkey(config.ocr)
+        self._local = threading.local()
+
+    def _host(self) -> Any:
+        host = getattr(self._local, "host", None)
+        if host is None:
+            client = ModelHostClient(address=self.address, authkey=self.authkey)
+            client.connect()
+            host = self._local.host = client.host()  # type: ignore[attr-defined]
+        return host
+
+    def _run(self, method: str, images: list[np.ndarray], **kwargs: Any) -> Any:
+        blocks: list[SharedMemory] = []
+        try:
+            shared: list[SharedImage] = []
+            for image in images:
+                image = np.ascontiguousarray(image)
+                block = SharedMemory(create=True, size=max(image.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(image.shape, dtype=image.dtype, buffer=block.buf)[...] = (
+                    image
+                )
+                shared.append((block.name, image.shape, image.dtype.str))
+            try:
+                return self._host().run(
+                    self.languages, self.gpu, method, shared, kwargs
+                )
+            except (ConnectionError, EOFError, OSError):
+                self._local.host = None  # reconnect on the next call
+                raise
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def readtext(self, image: np.ndarray, **kwargs: Any) -> list:
+        return self._run("readtext", [image], **kwargs)
+
+    def readtext_batched(self, images: list[np.ndarray], **kwargs: Any) -> list:
+        return self._run("readtext_batched", images, **kwargs)
+
+
+if __name__ == "__main__":
+    if not get_authkey(config.ocr):
+        raise SystemExit(f"{AUTHKEY_ENV} is required to run the model host standalone")
+    server = ModelHostServer(
+        address=parse_address(config.ocr.model_host_address),
+        authkey=get_authkey(config.ocr),
+    )
+    _preload(config.ocr)
+    server.get_server().serve_forever()
@@ -1,15 +1,18 @@
-import io
 import logging
 from enum import IntEnum
 from typing import Any
 
 import httpx
-from PIL import Image
 
 from ml_service.domains.ocr.base import BaseOCRHandler, OCRResult
-from ml_service.utils.retry import Retry
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.preprocessing import Preprocessing
+from ml_service.utils.circuit_breaker import circuit_breakers
+from ml_service.utils.http import http_clients
+from ml_service.utils.quota import QuotaTracker
+from ml_service.utils.retry import Retry, RetryBudget
 
-retry = Retry()
+retry = Retry(budget=RetryBudget())
 
 
 # TODO(vadim): Add support for both ocr.space api engines in the chain
@@ -40,35 +43,58 @@ class OCRSpaceAPIHandler(BaseOCRHandler):
         api_key: str,
         next_handler: BaseOCRHandler | None = None,
         timeout: float | None = None,
+        preprocessing: Preprocessing | None = None,
+        client: httpx.AsyncClient | None = None,
+        quota: QuotaTracker | None = None,
     ) -> None:
-        super().__init__(next_handler=next_handler, timeout=timeout)
+        super().__init__(
+            next_handler=next_handler, timeout=timeout, preprocessing=preprocessing
+        )
         self.url = "https://api.ocr.space/parse/image"
         self.api_key = api_key
-        self.limit_per_month = 25000
         self.max_size = 1 * 1024 * 1024
         self.httpx_timeout = httpx.Timeout(timeout) if timeout else None
+        self._client = client
+        self.quota = quota
 
-    # TODO(vadim): Implement request per month limit checking using sqlite or cache or similar
-    def should_skip(self, image: Image.Image) -> bool:
+    def should_skip(self, image: ImageEnvelope) -> bool:
+        """
+        Determines if the image should be skipped based on the quota and the
+        provider health. Once the monthly or rolling budget is used up or the
+        circuit breaker is open the handler is skipped without a request.
+        The upload size is checked after `prepare`, see `_process_image`.
         """
-        Determines if the image should be skipped based on its size.
-        If the image is larger than 1 MB, it will be skipped.
+        if self.quota is not None and self.quota.exhausted:
+            logging.debug("OCR_SPACE API quota is exhausted, skipping")
+            return True
+        if circuit_breakers.is_open("ocr_space"):
+            logging.debug("OCR_SPACE API circuit is open, skipping")
+            return True
+        return False
+
+    def is_too_large(self, image: ImageEnvelope) -> bool:
+        """Larger than 1 MB, cheap once `prepare` encoded the image."""
+        data, _ = image.uploadable()
+        return len(data) > self.max_size
+
+    def prepare(self, image: ImageEnvelope) -> ImageEnvelope:
         """
-        with io.BytesIO() as buffer:
-            image.save(buffer, format="PNG")
-            size = buffer.tell()
-            return size > self.max_size
+        Encodes the (preprocessed) image for upload while still on the executor,
+        so the size check and the request do not encode on the event loop.
+        The original upload is sent as is when possible, usually nothing is encoded.
+        """
+        image = super().prepare(image)
+        image.uploadable()
+        return image
 
     @property
-    def _client(self) -> httpx.AsyncClient:
+    def client(self) -> httpx.AsyncClient:
         """
-        Returns an HTTP client for making requests to the OCR_SPACE API.
+        Returns the long-lived pooled HTTP client for the OCR_SPACE API.
         """
-        return (
-            httpx.AsyncClient(timeout=self.httpx_timeout)
-            if self.timeout
-            else httpx.AsyncClient()
-        )
+        if self._client is None or self._client.is_closed:
+            self._client = http_clients.get("ocr_space")
+        return self._client
 
     @retry(
         n_times=4,
@@ -78,39 +104,46 @@ class OCRSpaceAPIHandler(BaseOCRHandler):
             httpx.RequestError,
             httpx.HTTPError,
         ),
+        deadline=10,
     )
-    async def _do_request(self, image: Image.Image) -> Any:
+    @circuit_breakers.protect("ocr_space")
+    async def _do_request(self, image: ImageEnvelope) -> Any:
         """
         Sends the image to the OCR_SPACE API and returns the OCR result.
         """
-
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-
+        data, format = image.uploadable()
+        filetype = format.lower()
         files = {
-            "file": ("image.png", buffer, "image/png"),
+            "file": (f"image.{filetype}", data, f"image/{filetype}"),
         }
         payload = {
             "apikey": self.api_key,
             "language": "rus",
-            "filetype": "png",
+            "filetype": filetype,
         }
 
-        async with self._client as client:
-            response = await client.post(self.url, data=payload, files=files)
-            logging.debug(f"OCR_SPACE API response status: {response.status_code}.")
-            buffer.close()
-            response.raise_for_status()
-            return response.json()
+        if self.quota is not None:
+            # every attempt counts against the quota, retries included
+            self.quota.record()
+        response = await self.client.post(
+            self.url, data=payload, files=files, timeout=self.httpx_timeout
+        )
+        logging.debug(f"OCR_SPACE API response status: {response.status_code}.")
+        response.raise_for_status()
+        return response.json()
 
-    async def _process_image(self, image: Image.Image) -> OCRResult:
+    async def _process_image(self, image: ImageEnvelope) -> OCRResult:
+        if self.is_too_large(image):
+            return self.get_empty_result(error="Image is too large for OCR_SPACE API")
         try:
             data = await self._do_request(image)
             logging.debug(f"OCR_SPACE API response: {data}")
 
             exit_code = OCRExitCode(data.get("OCRExitCode", 4))
-            if exit_code != OCRExitCode.PARSED_SUCCESSFULLY:
+            if exit_code not in (
+                OCRExitCode.PARSED_SUCCESSFULLY,
+                OCRExitCode.PARSED_PARTIALLY,
+            ):
                 error_message = data.get("ErrorMessage", "Unknown error") + data.get(
                     "ErrorDetails", ""
                 )
@@ -120,7 +153,13 @@ class OCRSpaceAPIHandler(BaseOCRHandler):
                 return self.get_empty_result(error=error_message)
 
             parsed_results = data.get("ParsedResults", [])
-            if not parsed_results:
+            # with PARSED_PARTIALLY only some pages have text, keep those
+            parsed_pages = [
+                page
+                for page in parsed_results
+                if page.get("FileParseExitCode", 1) == OCRExitCode.PARSED_SUCCESSFULLY
+            ]
+            if not parsed_pages:
                 error_message = data.get(
                     "ErrorMessage", "No parsed results returned by OCR_SPACE API"
                 )
@@ -128,16 +167,27 @@ class OCRSpaceAPIHandler(BaseOCRHandler):
                     f"OCR_SPACE API returned no parsed results: {error_message}"
                 )
                 return self.get_empty_result(error=error_message)
+            if len(parsed_pages) < len(parsed_results):
+                failed = [
+                    page.get("ErrorMessage") or "unknown error"
+                    for page in parsed_results
+                    if page not in parsed_pages
+                ]
+                logging.warning(
+                    f"OCR_SPACE API parsed {len(parsed_pages)}/{len(parsed_results)}"
+                    f" pages, failed: {failed}"
+                )
 
-            parsed_result = parsed_results[0]
-            text: str = parsed_result.get("ParsedText", "")
+            text = " ".join(page.get("ParsedText", "") for page in parsed_pages)
             if not text.strip():
                 error_message = "Empty parsed text returned by OCR_SPACE API"
                 logging.error(error_message)
                 return self.get_empty_result(error=error_message)
             text = text.replace("\r", "").replace("\n", "").strip()
 
+            # a partial parse is less trustworthy, the chain may try another engine
             confidence = self.estimate_basic_confidence(text, image)
+            confidence *= len(parsed_pages) / max(len(parsed_results), 1)
             return OCRResult(text=text, confidence=confidence, engine=self.name)
 
         except httpx.HTTPError as error:
@@ -0,0 +1,74 @@
+from io import BytesIO
+
+PDF_MAGIC = b"%PDF-"
+
+
+class UnsupportedDocumentError(ValueError):
+    """The upload can not be split into pages (no PDF support installed)."""
+
+
+class TooManyPagesError(ValueError):
+    def __init__(self, pages: int, max_pages: int) -> None:
+        super().__init__(f"Document has {pages} pages, at most {max_pages} are allowed")
+        self.pages = pages
+        self.max_pages = max_pages
+
+
+def is_pdf(data: bytes) -> bool:
+    return data[:1024].lstrip().startswith(PDF_MAGIC)
+
+
+def render_pdf(data: bytes, max_pages: int, scale: float = 2.0) -> list[bytes]:
+    """
+    Renders every page of a PDF to a grayscale JPEG with `pypdfium2`
+    (an optional dependency, `pip install autocare-ml-service[pdf]`).
+    `scale` is relative to 72 dpi. Blocking, run it on an executor.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError as exc:
+        raise UnsupportedDocumentError(
+            "PDF uploads need the optional pypdfium2 package"
+        ) from exc
+
+    try:
+        pdf = pdfium.PdfDocument(data)
+    except pdfium.PdfiumError as exc:
+        raise UnsupportedDocumentError(f"Can not open the PDF: {exc}") from exc
+    try:
+        if len(pdf) > max_pages:
+            raise TooManyPagesError(len(pdf), max_pages)
+        pages = []
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                image = page.render(scale=scale, grayscale=True).to_pil()
+            finally:
+                page.close()
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=90)
+            pages.append(buffer.getvalue())
+        return pages
+    finally:
+        pdf.close()
+
+
+def split_pages(
+    uploads: list[bytes], max_pages: int, scale: float = 2.0
+) -> list[bytes]:
+    """
+    Pages of a document uploaded as photos (one page each) and/or PDFs,
+    in upload order. Photos are passed as is, they are decoded by the OCR chain.
+    """
+    pages: list[bytes] = []
+    for data in uploads:
+        if is_pdf(data):
+            try:
+                pages.extend(render_pdf(data, max_pages - len(pages), scale))
+            except TooManyPagesError as exc:
+                raise TooManyPagesError(len(pages) + exc.pages, max_pages) from None
+        else:
+            pages.append(data)
+        if len(pages) > max_pages:
+            raise TooManyPagesError(len(pages), max_pages)
+    return pages
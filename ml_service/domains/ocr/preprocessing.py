@@ -0,0 +1,195 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from ml_service.domains.ocr.image import ImageEnvelope
+
+EXIF_ORIENTATION = 0x0112
+
+# text height and skew are estimated on a reduced copy, full resolution adds nothing
+ANALYSIS_SIDE = 1600
+SKEW_SAMPLE_POINTS = 50_000
+SKEW_STEP = 0.25  # degrees
+MIN_SKEW = 0.5  # smaller angles are not worth resampling the image
+MAX_UPSCALE = 2.0
+MIN_RESIZE_DELTA = 0.05
+MIN_LINE_HEIGHT = 3  # px at analysis scale, shorter runs are noise
+INK_ROW_FRACTION = 0.01
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """
+    Otsu's threshold of a uint8 grayscale image, computed from its histogram.
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 127
+
+    levels = np.arange(256)
+    omega = np.cumsum(hist) / total
+    mu = np.cumsum(hist * levels) / total
+    mu_total = mu[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu_total * omega - mu) ** 2 / (omega * (1.0 - omega))
+    return int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+
+
+def reduced_gray(image: Image.Image) -> tuple[Image.Image, int]:
+    """Grayscale copy reduced by an integer factor for analysis."""
+    factor = max(math.ceil(max(image.size) / ANALYSIS_SIDE), 1)
+    gray = image if image.mode == "L" else image.convert("L")
+    return (gray.reduce(factor) if factor > 1 else gray), factor
+
+
+def ink_mask(gray: np.ndarray) -> np.ndarray:
+    return gray < otsu_threshold(gray)
+
+
+def estimate_text_height(ink: np.ndarray) -> float | None:
+    """
+    Median height of text lines, from runs of rows containing ink
+    (horizontal projection profile). None if no lines are found.
+    """
+    rows = ink.mean(axis=1) > INK_ROW_FRACTION
+    edges = np.diff(np.concatenate(([0], rows.astype(np.int8), [0])))
+    heights = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    heights = heights[heights >= MIN_LINE_HEIGHT]
+    return float(np.median(heights)) if heights.size else None
+
+
+def estimate_skew(ink: np.ndarray, max_angle: float) -> float:
+    """
+    Skew angle (degrees) maximising the sharpness of the horizontal
+    projection profile. Ink pixels are sheared instead of rotating
+    the whole image for every candidate angle.
+    """
+    ys, xs = np.nonzero(ink)
+    if ys.size == 0:
+        return 0.0
+    if ys.size > SKEW_SAMPLE_POINTS:
+        picked = np.random.default_rng(0).choice(
+            ys.size, SKEW_SAMPLE_POINTS, replace=False
+        )
+        ys, xs = ys[picked], xs[picked]
+
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64)
+    angles = np.arange(-max_angle, max_angle + SKEW_STEP / 2, SKEW_STEP)
+    scores = np.empty_like(angles)
+    for i, angle in enumerate(angles):
+        rows = np.rint(ys - xs * math.tan(math.radians(angle))).astype(np.int64)
+        profile = np.bincount(rows - rows.min())
+        scores[i] = np.square(np.diff(profile)).sum()
+    return float(angles[int(np.argmax(scores))])
+
+
+@dataclass(frozen=True)
+class Preprocessing:
+    """
+    Image preprocessing applied before an OCR engine.
+
+    - `exif_transpose`: apply the EXIF orientation of phone photos.
+    - `grayscale`: drop colour, engines do not use it.
+    - `text_height`: scale so text lines are about that many pixels high
+      (downscaling 12MP photos is where most of the time is saved).
+    - `max_side`: hard limit for the longer side after scaling.
+    - `deskew`: straighten text rotated by up to `max_skew` degrees.
+    - `binarize`: Otsu black and white.
+    """
+
+    exif_transpose: bool = True
+    grayscale: bool = True
+    text_height: int | None = None
+    max_side: int | None = None
+    deskew: bool = False
+    max_skew: float = 10.0
+    binarize: bool = False
+
+    @property
+    def signature(self) -> str:
+        return (
+            f"exif={int(self.exif_transpose)},gray={int(self.grayscale)},"
+            f"text={self.text_height},side={self.max_side},"
+            f"deskew={self.max_skew if self.deskew else 0},bin={int(self.binarize)}"
+        )
+
+    def _analyse(self, image: Image.Image) -> tuple[float, float]:
+        """
+        Scale factor and skew angle, estimated on a reduced grayscale copy.
+        Text height is measured after straightening, skewed lines look taller.
+        """
+        scale, angle = 1.0, 0.0
+        if self.text_height or self.deskew:
+            reduced, factor = reduced_gray(image)
+            ink = ink_mask(np.asarray(reduced))
+            if self.deskew:
+                angle = estimate_skew(ink, self.max_skew)
+                if abs(angle) < MIN_SKEW:
+                    angle = 0.0
+                elif self.text_height:
+                    reduced = reduced.rotate(angle, expand=True, fillcolor=255)
+                    ink = ink_mask(np.asarray(reduced))
+            if self.text_height:
+                height = estimate_text_height(ink)
+                if height:
+                    scale = min(self.text_height / (height * factor), MAX_UPSCALE)
+
+        if self.max_side:
+            scale = min(scale, self.max_side / max(image.size))
+        return scale, angle
+
+    def __call__(self, image: Image.Image) -> Image.Image:
+        """
+        Returns the processed image, or the same object if nothing had to change.
+        """
+        if self.exif_transpose and image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+            image = ImageOps.exif_transpose(image)
+        if self.grayscale and image.mode != "L":
+            image = image.convert("L")
+
+        scale, angle = self._analyse(image)
+        if abs(scale - 1.0) > MIN_RESIZE_DELTA:
+            size = (
+                max(round(image.width * scale), 1),
+                max(round(image.height * scale), 1),
+            )
+            image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        if angle:
+            fill = 255 if image.mode == "L" else (255,) * len(image.getbands())
+            image = image.rotate(
+                angle, resample=Image.Resampling.BICUBIC, expand=True, fillcolor=fill
+            )
+
+        if self.binarize:
+            gray = image if image.mode == "L" else image.convert("L")
+            threshold = otsu_threshold(np.asarray(gray))
+            image = gray.point([0] * (threshold + 1) + [255] * (255 - threshold))
+
+        return image
+
+    def apply(self, envelope: ImageEnvelope) -> ImageEnvelope:
+        """
+        The preprocessed variant of the envelope, computed once per preset
+        and shared by every handler using the same preset.
+        """
+
+        def build() -> ImageEnvelope:
+            image = self(envelope.image)
+            return envelope if image is envelope.image else ImageEnvelope(image=image)
+
+        return envelope.derive(self, build)
+
+
+# per engine defaults, see benchmarks/ocr_preprocessing.py
+PRESETS: dict[str, Preprocessing] = {
+    # LSTM models work best with ~30px lines, the engine binarizes by itself
+    "tesseract": Preprocessing(text_height=36, max_side=3500, deskew=True),
+    # CRAFT detection time grows with pixel count and tolerates slight skew
+    "easyocr": Preprocessing(max_side=1600),
+    # keeps large photos under the 1MB upload limit instead of skipping them
+    "ocr_space": Preprocessing(grayscale=False, max_side=2000),
+}
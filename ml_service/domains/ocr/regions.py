@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.preprocessing import (
+    estimate_text_height,
+    ink_mask,
+    reduced_gray,
+)
+
+# (left, top, right, bottom) in pixels of the full image
+Box = tuple[int, int, int, int]
+
+NOISE_PIXELS = 2  # rows/columns with fewer ink pixels count as blank
+MIN_BOX_SIDE = 4  # px at analysis scale
+MAX_DEPTH = 32
+DEFAULT_LINE_HEIGHT = 12.0  # px at analysis scale, when no lines are found
+
+
+def _segments(has_ink: np.ndarray, min_gap: int) -> list[tuple[int, int]]:
+    """Runs of ink in a projection profile, merged across gaps shorter than `min_gap`."""
+    edges = np.diff(np.concatenate(([0], has_ink.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not starts.size:
+        return []
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] >= min_gap)
+    first = np.concatenate(([0], breaks + 1))
+    last = np.concatenate((breaks, [starts.size - 1]))
+    return list(zip(starts[first].tolist(), ends[last].tolist()))
+
+
+def xy_cut(
+    ink: np.ndarray,
+    min_gap_y: int,
+    min_gap_x: int,
+    top: int = 0,
+    left: int = 0,
+    depth: int = 0,
+) -> list[Box]:
+    """
+    Recursive XY-cut: splits the page at blank horizontal bands, then each
+    band at blank vertical gaps, and so on. Boxes come out in reading order
+    (top to bottom, left to right within a band).
+    """
+    rows = _segments(ink.sum(axis=1) > NOISE_PIXELS, min_gap_y)
+    if not rows:
+        return []
+    if len(rows) > 1 and depth < MAX_DEPTH:
+        return [
+            box
+            for y0, y1 in rows
+            for box in xy_cut(
+                ink[y0:y1], min_gap_y, min_gap_x, top + y0, left, depth + 1
+            )
+        ]
+
+    y0, y1 = rows[0]
+    ink, top = ink[y0:y1], top + y0
+    cols = _segments(ink.sum(axis=0) > NOISE_PIXELS, min_gap_x)
+    if not cols:
+        return []
+    if len(cols) > 1 and depth < MAX_DEPTH:
+        return [
+            box
+            for x0, x1 in cols
+            for box in xy_cut(
+                ink[:, x0:x1], min_gap_y, min_gap_x, top, left + x0, depth + 1
+            )
+        ]
+
+    x0, x1 = cols[0]
+    return [(left + x0, top, left + x1, top + ink.shape[0])]
+
+
+@dataclass(frozen=True)
+class RegionDetector:
+    """
+    Cheap text block detector for mostly blank pages.
+
+    Gaps are measured in text line heights: blocks are split at blank
+    bands at least `min_gap_y` lines high and at blank columns at least
+    `min_gap_x` lines wide. Boxes are padded by `margin` lines.
+    More than `max_regions` blocks means the page is not block-structured,
+    no regions are returned then and the whole image is recognised.
+    """
+
+    min_gap_y: float = 1.5
+    min_gap_x: float = 2.5
+    margin: float = 0.5
+    max_regions: int = 32
+
+    @property
+    def signature(self) -> str:
+        return (
+            f"regions=y{self.min_gap_y},x{self.min_gap_x},"
+            f"m{self.margin},n{self.max_regions}"
+        )
+
+    def detect(self, image: ImageEnvelope) -> list[Box]:
+        """Text blocks of the image in reading order."""
+        reduced, factor = reduced_gray(image.image)
+        ink = ink_mask(np.asarray(reduced))
+        line = estimate_text_height(ink) or DEFAULT_LINE_HEIGHT
+
+        boxes = xy_cut(
+            ink,
+            max(round(self.min_gap_y * line), 1),
+            max(round(self.min_gap_x * line), 1),
+        )
+        boxes = [
+            box
+            for box in boxes
+            if box[2] - box[0] >= MIN_BOX_SIDE and box[3] - box[1] >= MIN_BOX_SIDE
+        ]
+        if len(boxes) > self.max_regions:
+            return []
+
+        margin = round(self.margin * line)
+        return [
+            (
+                max((left - margin) * factor, 0),
+                max((top - margin) * factor, 0),
+                min((right + margin) * factor, image.width),
+                min((bottom + margin) * factor, image.height),
+            )
+            for left, top, right, bottom in boxes
+        ]
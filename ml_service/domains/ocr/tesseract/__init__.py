@@ -1,33 +1,82 @@
 import logging
 
 import pytesseract
-from PIL import Image
 from pytesseract import Output
 
 from ml_service.domains.ocr.base import BaseOCRHandler, OCRResult
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.preprocessing import Preprocessing
+from ml_service.domains.ocr.regions import RegionDetector
+from ml_service.domains.ocr.tesseract import capi
 
 
 class TesseractOCRHandler(BaseOCRHandler):
+    """
+    Tesseract OCR.
+
+    The `capi` backend keeps an initialized engine per executor thread
+    and passes pixel buffers to libtesseract directly. The `subprocess`
+    backend (pytesseract) starts the `tesseract` binary for every image,
+    `auto` uses the C API when libtesseract is installed.
+    `psm` / `oem` are the page segmentation and engine modes of the CLI.
+    """
+
     def __init__(
         self,
         lang: str = "rus+eng",
         next_handler: BaseOCRHandler | None = None,
         timeout: float | None = None,
+        preprocessing: Preprocessing | None = None,
+        regions: RegionDetector | None = None,
+        psm: int = 3,
+        oem: int = 3,
+        backend: str = "auto",
     ) -> None:
-        super().__init__(next_handler=next_handler, timeout=timeout)
+        super().__init__(
+            next_handler=next_handler,
+            timeout=timeout,
+            preprocessing=preprocessing,
+            regions=regions,
+        )
         self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        match backend:
+            case "auto":
+                self.backend = "capi" if capi.is_available() else "subprocess"
+            case "capi" | "subprocess":
+                self.backend = backend
+            case _:
+                raise ValueError(f"Unknown tesseract backend: {backend}")
+        logging.info(f"Tesseract backend: {self.backend}")
 
-    def _process_image(self, image: Image.Image) -> OCRResult:
-        try:
-            data = pytesseract.image_to_data(
-                image, lang=self.lang, output_type=Output.DICT
-            )
+    @property
+    def signature(self) -> str:
+        return f"{self.name}:{self.lang}:psm{self.psm}:oem{self.oem}"
+
+    def _recognize(self, image: ImageEnvelope) -> tuple[list[str], list[float]]:
+        """Words and their confidences (0..100)."""
+        if self.backend == "capi":
+            engine = capi.thread_engine(self.lang, self.psm, self.oem)
+            text, confidences = engine.recognize(image.array)
+            return text.split(), [float(conf) for conf in confidences]
 
-            texts = data.get("text", [])
-            confs = data.get("conf", [])
+        data = pytesseract.image_to_data(
+            image.image,
+            lang=self.lang,
+            config=f"--psm {self.psm} --oem {self.oem}",
+            output_type=Output.DICT,
+        )
+        texts = data.get("text", [])
+        confs = data.get("conf", [])
+        return (
+            [text for text in texts if text.strip()],
+            [float(conf) for conf in confs if float(conf) >= 0],
+        )
 
-            valid_confidences = [float(conf) for conf in confs if conf != "-1"]
-            text_fragments = [text for text in texts if text.strip()]
+    def _process_image(self, image: ImageEnvelope) -> OCRResult:
+        try:
+            text_fragments, valid_confidences = self._recognize(image)
 
             if not text_fragments:
                 error_msg = "Tesseract returned no valid text."
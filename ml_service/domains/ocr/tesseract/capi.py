@@ -0,0 +1,192 @@
+"""
+Minimal ctypes binding of the libtesseract C API (`tesseract/capi.h`).
+
+An initialized engine keeps the traineddata in memory, so recognising
+an image is just `SetImage` + `Recognize` on a raw pixel buffer: no temp
+files, no `tesseract` process and no model reload per call.
+Engines are not thread-safe, use one per thread (see `thread_engine`).
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import threading
+from functools import cache
+
+import numpy as np
+
+LIBRARY_NAMES = ("tesseract", "libtesseract.so.5", "libtesseract.so.4")
+
+
+class TesseractNotAvailable(OSError):
+    """libtesseract can not be loaded or initialized."""
+
+
+@cache
+def load_library() -> ctypes.CDLL:
+    for name in LIBRARY_NAMES:
+        path = ctypes.util.find_library(name) if "." not in name else name
+        if not path:
+            continue
+        try:
+            lib = ctypes.CDLL(path)
+        except OSError:
+            continue
+        _declare(lib)
+        logging.info(f"Loaded libtesseract {lib.TessVersion().decode()} from {path}")
+        return lib
+    raise TesseractNotAvailable("libtesseract is not installed")
+
+
+def _declare(lib: ctypes.CDLL) -> None:
+    handle = ctypes.c_void_p
+    lib.TessVersion.restype = ctypes.c_char_p
+    lib.TessBaseAPICreate.restype = handle
+    lib.TessBaseAPIInit2.argtypes = [
+        handle,
+        ctypes.c_char_p,
+        ctypes.c_char_p,
+        ctypes.c_int,
+    ]
+    lib.TessBaseAPIInit2.restype = ctypes.c_int
+    lib.TessBaseAPISetPageSegMode.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPISetVariable.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetVariable.restype = ctypes.c_int
+    lib.TessBaseAPISetImage.argtypes = [
+        handle,
+        ctypes.c_void_p,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+    ]
+    lib.TessBaseAPISetSourceResolution.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPIRecognize.argtypes = [handle, ctypes.c_void_p]
+    lib.TessBaseAPIRecognize.restype = ctypes.c_int
+    lib.TessBaseAPIGetUTF8Text.argtypes = [handle]
+    lib.TessBaseAPIGetUTF8Text.restype = ctypes.POINTER(ctypes.c_char)
+    lib.TessBaseAPIAllWordConfidences.argtypes = [handle]
+    lib.TessBaseAPIAllWordConfidences.restype = ctypes.POINTER(ctypes.c_int)
+    lib.TessDeleteText.argtypes = [ctypes.POINTER(ctypes.c_char)]
+    lib.TessDeleteIntArray.argtypes = [ctypes.POINTER(ctypes.c_int)]
+    lib.TessBaseAPIClear.argtypes = [handle]
+    lib.TessBaseAPIEnd.argtypes = [handle]
+    lib.TessBaseAPIDelete.argtypes = [handle]
+
+
+def is_available() -> bool:
+    try:
+        load_library()
+    except TesseractNotAvailable:
+        return False
+    return True
+
+
+class TesseractEngine:
+    """
+    One initialized `TessBaseAPI`.
+
+    `psm` is the page segmentation mode (3 - automatic, 6 - single block, ...),
+    `oem` the engine mode (1 - LSTM only, 3 - default), as in the CLI.
+    """
+
+    def __init__(
+        self,
+        lang: str = "rus+eng",
+        psm: int = 3,
+        oem: int = 3,
+        datapath: str | None = None,
+        source_resolution: int = 300,
+    ) -> None:
+        self._lib = load_library()
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.source_resolution = source_resolution
+        self._handle = self._lib.TessBaseAPICreate()
+        if self._lib.TessBaseAPIInit2(
+            self._handle,
+            datapath.encode() if datapath else None,
+            lang.encode(),
+            oem,
+        ):
+            self.close()
+            raise TesseractNotAvailable(f"Can not initialize tesseract for {lang}")
+        self._lib.TessBaseAPISetPageSegMode(self._handle, psm)
+
+    def set_variable(self, name: str, value: str) -> None:
+        if not self._lib.TessBaseAPISetVariable(
+            self._handle, name.encode(), value.encode()
+        ):
+            raise ValueError(f"Unknown tesseract variable: {name}")
+
+    def recognize(self, image: np.ndarray) -> tuple[str, list[int]]:
+        """
+        Recognises a uint8 grayscale or RGB(A) array.
+        Returns the UTF-8 text and the confidence (0..100) of every word.
+        """
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+
+        lib, handle = self._lib, self._handle
+        lib.TessBaseAPISetImage(
+            handle,
+            image.ctypes.data,
+            width,
+            height,
+            bytes_per_pixel,
+            width * bytes_per_pixel,
+        )
+        lib.TessBaseAPISetSourceResolution(handle, self.source_resolution)
+        try:
+            if lib.TessBaseAPIRecognize(handle, None) != 0:
+                raise RuntimeError("Tesseract failed to recognize the image")
+
+            text_ptr = lib.TessBaseAPIGetUTF8Text(handle)
+            try:
+                text = ctypes.string_at(text_ptr).decode("utf-8", "replace")
+            finally:
+                lib.TessDeleteText(text_ptr)
+
+            confidences: list[int] = []
+            conf_ptr = lib.TessBaseAPIAllWordConfidences(handle)
+            if conf_ptr:
+                try:
+                    i = 0
+                    while conf_ptr[i] != -1:
+                        confidences.append(conf_ptr[i])
+                        i += 1
+                finally:
+                    lib.TessDeleteIntArray(conf_ptr)
+            return text, confidences
+        finally:
+            # drops the reference to the buffer and the page results
+            lib.TessBaseAPIClear(handle)
+
+    def close(self) -> None:
+        if getattr(self, "_handle", None):
+            self._lib.TessBaseAPIEnd(self._handle)
+            self._lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+
+    def __del__(self) -> None:
+        self.close()
+
+
+_engines = threading.local()
+
+
+def thread_engine(lang: str, psm: int, oem: int) -> TesseractEngine:
+    """
+    The engine of the calling thread for these settings, created on first use.
+    Initialization loads the traineddata, so it happens once per executor thread.
+    """
+    if not hasattr(_engines, "engines"):
+        _engines.engines = {}
+    engines: dict[tuple[str, int, int], TesseractEngine] = _engines.engines
+    key = (lang, psm, oem)
+    engine = engines.get(key)
+    if engine is None:
+        engine = engines[key] = TesseractEngine(lang, psm, oem)
+    return engine
@@ -0,0 +1,347 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from ml_service.domains.extractors.base import (
+    BaseMultiFieldExtractor,
+    ExtractionField,
+    ExtractionResult,
+)
+from ml_service.domains.extractors.cache import extraction_cache
+from ml_service.domains.extractors.merge import merge_pages
+from ml_service.domains.extractors.orchestrator import ExtractorOrchestrator
+from ml_service.domains.extractors.strategies import (
+    NONE_SOURCE,
+    AllExtractorsStrategy,
+    BaseOrchestratorStrategy,
+    ExternalAsBackupStrategy,
+    ExternalOnlyStrategy,
+    LocalOnlyStrategy,
+)
+from ml_service.domains.ocr.base import BaseOCRHandler, OCRResult
+from ml_service.domains.ocr.cache import OCRCache, make_cache_key
+from ml_service.domains.ocr.chain import OCRChainFactory
+from ml_service.domains.ocr.hedged import HedgedOCRChain
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.ocr.pages import TooManyPagesError, split_pages
+from ml_service.domains.ocr.preprocessing import PRESETS
+from ml_service.domains.ocr.regions import RegionDetector
+from ml_service.settings.config import BaseConfig
+from ml_service.utils.executors import executors
+from ml_service.utils.quota import quotas
+from ml_service.utils.singleflight import SingleFlight
+from ml_service.utils.timer import StageTimings
+
+STRATEGIES: dict[str, type[BaseOrchestratorStrategy]] = {
+    "local_only": LocalOnlyStrategy,
+    "external_only": ExternalOnlyStrategy,
+    "external_as_backup": ExternalAsBackupStrategy,
+    "all": AllExtractorsStrategy,
+}
+
+
+def _load_ocr_handler(
+    name: str, config: BaseConfig
+) -> tuple[type[BaseOCRHandler], dict[str, Any]]:
+    """
+    Imports OCR handlers lazily, so engines that are not configured
+    (and their heavy dependencies) are never loaded.
+    """
+    kwargs: dict[str, Any] = {}
+    if config.ocr.preprocess:
+        kwargs["preprocessing"] = PRESETS.get(name)
+    # region mode is for local engines recognising on the executor
+    regions = RegionDetector() if config.ocr.regions else None
+
+    match name:
+        case "tesseract":
+            from ml_service.domains.ocr.tesseract import TesseractOCRHandler
+
+            return TesseractOCRHandler, {
+                **kwargs,
+                "regions": regions,
+                "backend": config.ocr.tesseract_backend,
+                "psm": config.ocr.tesseract_psm,
+                "oem": config.ocr.tesseract_oem,
+            }
+        case "easyocr":
+            from ml_service.domains.ocr.easy_ocr import (
+                DEFAULT_LANGUAGES,
+                BatchedEasyOCRHandler,
+                EasyOCRHandler,
+            )
+
+            kwargs["use_gpu"] = config.ocr.easyocr_use_gpu
+            if config.ocr.model_host:
+                from ml_service.domains.ocr.model_host import RemoteReader
+
+                kwargs["reader"] = RemoteReader(
+                    DEFAULT_LANGUAGES, gpu=config.ocr.easyocr_use_gpu
+                )
+            if config.ocr.easyocr_batching:
+                kwargs["max_batch_size"] = config.ocr.batch_max_size
+                kwargs["batch_window"] = config.ocr.batch_window
+                return BatchedEasyOCRHandler, kwargs
+            return EasyOCRHandler, {**kwargs, "regions": regions}
+        case "ocr_space":
+            from ml_service.domains.ocr.ocr_space import OCRSpaceAPIHandler
+
+            quota = quotas.get(
+                "ocr_space",
+                monthly_limit=config.ocr.ocr_space_monthly_limit or None,
+                rolling_limit=config.ocr.ocr_space_rolling_limit or None,
+                rolling_days=config.ocr.ocr_space_rolling_days,
+            )
+            return OCRSpaceAPIHandler, {
+                **kwargs,
+                "api_key": config.ocr.ocr_space_api_key.get_secret_value(),
+                "quota": quota,
+            }
+        case _:
+            raise ValueError(f"Unknown OCR handler: {name}")
+
+
+def _create_extractors(config: BaseConfig) -> list[BaseMultiFieldExtractor]:
+    from ml_service.domains.extractors.multi_field.deepseek import (
+        BatchedDeepSeekMultiExtractor,
+        DeepSeekMultiExtractor,
+    )
+    from ml_service.domains.llm.deepseek import DeepSeekClient
+
+    if not config.deepseek.api_key.get_secret_value():
+        logging.warning("DEEPSEEK_API_KEY is not set, extraction requests will fail")
+
+    llm = DeepSeekClient(
+        api_key=config.deepseek.api_key.get_secret_value(),
+        model=config.deepseek.model,
+        temperature=config.deepseek.temperature,
+        timeout=config.deepseek.timeout,
+    )
+    # prompts are compiled here, once at startup
+    prompt_version = config.deepseek.prompt_version
+    if config.deepseek.batching:
+        return [
+            BatchedDeepSeekMultiExtractor(
+                llm,
+                prompt_version=prompt_version,
+                max_batch_size=config.deepseek.batch_max_size,
+                batch_window=config.deepseek.batch_window,
+                max_concurrency=config.deepseek.batch_concurrency,
+            )
+        ]
+    return [DeepSeekMultiExtractor(llm, prompt_version=prompt_version)]
+
+
+@dataclass
+class PipelineResult:
+    ocr: OCRResult
+    extraction: ExtractionResult
+    timings: StageTimings
+
+
+@dataclass
+class MultiPageResult:
+    pages: list[PipelineResult]
+    extraction: ExtractionResult  # the pages merged into one record
+    timings: StageTimings
+
+
+class ExtractionPipeline:
+    """
+    photo -> OCR -> text -> LLM -> JSON
+
+    Every blocking step runs on an executor (or is awaited, for remote engines and LLMs)
+    so the event loop keeps serving other requests while a photo is being processed.
+    """
+
+    def __init__(
+        self,
+        ocr_chain: BaseOCRHandler | HedgedOCRChain,
+        orchestrator: ExtractorOrchestrator,
+        ocr_cache: OCRCache | None = None,
+        page_concurrency: int = 2,
+        max_pages: int = 30,
+        pdf_scale: float = 2.0,
+    ) -> None:
+        self.ocr_chain = ocr_chain
+        self.orchestrator = orchestrator
+        self.ocr_cache = ocr_cache
+        self.page_concurrency = page_concurrency
+        self.max_pages = max_pages
+        self.pdf_scale = pdf_scale
+        # identical photos processed at the same time are recognised once,
+        # identical texts share one extraction in the extraction cache
+        self.ocr_flights: SingleFlight[OCRResult] = SingleFlight("ocr")
+
+    @classmethod
+    def from_config(cls, config: BaseConfig) -> "ExtractionPipeline":
+        factory = OCRChainFactory(default_timeout=config.ocr.timeout)
+        for name in config.ocr.handlers:
+            handler_class, kwargs = _load_ocr_handler(name, config)
+            factory.add_ocr(handler_class, **kwargs)
+
+        strategy_class = STRATEGIES.get(config.extractors.strategy)
+        if strategy_class is None:
+            raise ValueError(
+                f"Unknown extractor strategy: {config.extractors.strategy}"
+            )
+        kwargs: dict[str, Any] = {}
+        if strategy_class is AllExtractorsStrategy:
+            kwargs["confident_threshold"] = config.extractors.confident_threshold
+        strategy = strategy_class(
+            _create_extractors(config),
+            max_workers=config.extractors.max_workers,
+            cache=extraction_cache if config.extractors.cache_enabled else None,
+            extractor_timeout=config.extractors.timeout,
+            **kwargs,
+        )
+        match config.ocr.chain_mode:
+            case "sequential":
+                ocr_chain = factory.create_chain()
+            case "hedged":
+                ocr_chain = factory.create_hedged_chain(
+                    delay=config.ocr.hedge_delay,
+                    max_parallel=config.ocr.hedge_max_parallel,
+                )
+            case _:
+                raise ValueError(f"Unknown OCR chain mode: {config.ocr.chain_mode}")
+
+        return cls(
+            ocr_chain,
+            ExtractorOrchestrator(strategy),
+            OCRCache.from_config(config.ocr),
+            page_concurrency=config.ocr.page_concurrency,
+            max_pages=config.ocr.max_pages,
+            pdf_scale=config.ocr.pdf_scale,
+        )
+
+    async def ocr(self, data: bytes, timings: StageTimings) -> OCRResult:
+        """
+        Resends of the same photo are served from the cache
+        without decoding the image or running any OCR engine.
+        Concurrent requests with the same photo share one recognition.
+        """
+        envelope = ImageEnvelope(data)
+        with timings.stage("ocr_cache"):
+            # one sha256 pass, cheaper inline than a trip through the executor
+            cache_key = make_cache_key(envelope.content_hash, self.ocr_chain)
+            if self.ocr_cache:
+                cached = await self.ocr_cache.get(cache_key)
+                if cached:
+                    return cached
+
+        return await self.ocr_flights.do(
+            cache_key, lambda: self._recognize(envelope, cache_key, timings)
+        )
+
+    async def _recognize(
+        self, envelope: ImageEnvelope, cache_key: str, timings: StageTimings
+    ) -> OCRResult:
+        with timings.stage("decode"):
+            await executors.get().arun(envelope.decode)
+
+        with timings.stage("ocr"):
+            result = await self.ocr_chain.aprocess(envelope)
+
+        if self.ocr_cache:
+            await self.ocr_cache.set(cache_key, result)
+        return result
+
+    async def extract(self, text: str) -> ExtractionResult:
+        return await self.orchestrator.arun(text)
+
+    async def astream(
+        self, data: bytes
+    ) -> AsyncIterator[OCRResult | ExtractionField | PipelineResult]:
+        """
+        Streaming `run`: the OCR result, every field as soon as the extractor
+        has it, then the whole result. Streams are not shared between requests.
+        """
+        timings = StageTimings()
+
+        ocr_result = await self.ocr(data, timings)
+        yield ocr_result
+        if not ocr_result.text:
+            yield PipelineResult(
+                ocr_result,
+                ExtractionResult(
+                    content=None,
+                    confidence=0.0,
+                    source=NONE_SOURCE,
+                    error=ocr_result.error or "OCR returned no text",
+                ),
+                timings,
+            )
+            return
+
+        # a stream may end without a result (e.g. every extractor failed)
+        extraction = ExtractionResult(
+            content=None,
+            confidence=0.0,
+            source=NONE_SOURCE,
+            error="No extraction result",
+        )
+        with timings.stage("extract"):
+            async for item in self.orchestrator.astream(ocr_result.text):
+                if isinstance(item, ExtractionResult):
+                    extraction = item
+                else:
+                    yield item
+        yield PipelineResult(ocr_result, extraction, timings)
+
+    async def run(
+        self, data: bytes, ocr_slots: asyncio.Semaphore | None = None
+    ) -> PipelineResult:
+        """`ocr_slots` bounds the OCR of pages recognised together, see `run_pages`."""
+        timings = StageTimings()
+
+        async with ocr_slots or contextlib.nullcontext():
+            ocr_result = await self.ocr(data, timings)
+        if not ocr_result.text:
+            logging.warning(f"[Pipeline] OCR returned no text: {ocr_result.error}")
+            extraction = ExtractionResult(
+                content=None,
+                confidence=0.0,
+                source=NONE_SOURCE,
+                error=ocr_result.error or "OCR returned no text",
+            )
+            return PipelineResult(ocr_result, extraction, timings)
+
+        with timings.stage("extract"):
+            extraction = await self.extract(ocr_result.text)
+
+        return PipelineResult(ocr_result, extraction, timings)
+
+    async def run_pages(self, uploads: list[bytes]) -> MultiPageResult:
+        """
+        Photos and/or PDFs of one document -> one record.
+
+        At most `page_concurrency` pages are recognised at a time, and every
+        page goes on to extraction as soon as its text is ready, so the OCR
+        of the next pages overlaps the LLM calls of the previous ones.
+        Raises `TooManyPagesError` beyond `max_pages`.
+        """
+        if len(uploads) > self.max_pages:
+            raise TooManyPagesError(len(uploads), self.max_pages)
+        timings = StageTimings()
+        with timings.stage("split"):
+            pages = await executors.get().arun(
+                split_pages, uploads, self.max_pages, self.pdf_scale
+            )
+
+        ocr_slots = asyncio.Semaphore(max(self.page_concurrency, 1))
+        tasks = [asyncio.create_task(self.run(page, ocr_slots)) for page in pages]
+        try:
+            with timings.stage("pages"):
+                results = list(await asyncio.gather(*tasks))
+        finally:
+            # one page failing (not an image) fails the document
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        extraction = merge_pages([result.extraction for result in results])
+        return MultiPageResult(results, extraction, timings)
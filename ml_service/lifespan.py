@@ -1,9 +1,61 @@
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
+from typing import Any
 
 from fastapi import FastAPI
 
+from ml_service.api.schemas import ExtractResponse
+from ml_service.domains.jobs import JobQueue
+from ml_service.domains.pipeline import ExtractionPipeline
+from ml_service.settings.config import config
+from ml_service.settings.logger import logger
+from ml_service.utils.executors import executors
+from ml_service.utils.http import http_clients
+from ml_service.utils.quota import quotas
+
+
+def create_job_queue(pipeline: ExtractionPipeline) -> JobQueue:
+    async def process(data: bytes) -> dict[str, Any]:
+        result = await pipeline.run(data)
+        return ExtractResponse.from_result(result).model_dump(mode="json")
+
+    store = None
+    if config.jobs.persist:
+        from ml_service.db.jobs import JobRepository
+        from ml_service.db.session import session_factory
+
+        store = JobRepository(session_factory)
+    return JobQueue(
+        process,
+        workers=config.jobs.workers,
+        max_size=config.jobs.queue_size,
+        ttl=config.jobs.ttl,
+        store=store,
+        stale_after=config.jobs.stale_after,
+    )
+
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncIterator:
+async def lifespan(app: FastAPI) -> AsyncIterator:
+    # connection pools for external providers live as long as the worker
+    http_clients.get("deepseek")
+    http_clients.get("ocr_space")
+    # OCR models are loaded once per worker, before the first request
+    app.state.pipeline = ExtractionPipeline.from_config(config)
+    logger.info(f"Extraction pipeline is ready, OCR handlers: {config.ocr.handlers}")
+    if config.quota.persist:
+        from ml_service.db.session import session_factory
+        from ml_service.db.usage import UsageRepository
+
+        await quotas.start(
+            UsageRepository(session_factory), interval=config.quota.flush_interval
+        )
+    if config.jobs.enabled:
+        app.state.jobs = create_job_queue(app.state.pipeline)
+        app.state.jobs.start()
     yield
+    if config.jobs.enabled:
+        await app.state.jobs.aclose()
+    await quotas.aclose()
+    await http_clients.aclose()
+    executors.shutdown()
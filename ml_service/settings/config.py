@@ -1,3 +1,5 @@
+import os
+
 from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -46,6 +48,213 @@ class ThrottlingConfig(Settings):
     model_config = SettingsConfigDict(env_prefix="THROTTLING_")
 
     rate_limit_per_minute: int = Field(alias="RATE_LIMIT_PER_MINUTE", default=60)
+    # bucket size, defaults to the per minute limit
+    burst: int | None = Field(alias="THROTTLING_BURST", default=None)
+    # "local" (per worker) or "shared" (one limit for all workers of the host)
+    backend: str = Field(alias="THROTTLING_BACKEND", default="shared")
+    # tracked clients, idle and least recently seen ones are forgotten
+    max_keys: int = Field(alias="THROTTLING_MAX_KEYS", default=65536)
+    # extra tokens per uploaded megabyte, 0 to count requests only
+    cost_per_mb: float = Field(alias="THROTTLING_COST_PER_MB", default=0.0)
+    shared_name: str = Field(
+        alias="THROTTLING_SHARED_NAME", default="ml-service-throttling"
+    )
+    # never throttled: probes and the metrics endpoint
+    exempt_paths: list[str] = Field(
+        alias="THROTTLING_EXEMPT_PATHS",
+        default=["/healthcheck", "/ready", "/startup", "/metrics"],
+    )
+
+
+class OCRConfig(Settings):
+    """Configuration for the OCR handler chain."""
+
+    model_config = SettingsConfigDict(env_prefix="OCR_")
+
+    # handlers in fallback order, see ml_service.domains.pipeline._load_ocr_handler
+    handlers: list[str] = Field(alias="OCR_HANDLERS", default=["tesseract", "easyocr"])
+    timeout: float | None = Field(alias="OCR_TIMEOUT", default=30)
+    ocr_space_api_key: SecretStr = Field(
+        alias="OCR_SPACE_API_KEY", default=SecretStr("")
+    )
+    # OCR.space budgets, see ml_service.utils.quota; 0 disables a budget
+    ocr_space_monthly_limit: int = Field(alias="OCR_SPACE_MONTHLY_LIMIT", default=25000)
+    # requests per last OCR_SPACE_ROLLING_DAYS days (UTC, including today)
+    ocr_space_rolling_limit: int = Field(alias="OCR_SPACE_ROLLING_LIMIT", default=0)
+    ocr_space_rolling_days: int = Field(alias="OCR_SPACE_ROLLING_DAYS", default=1)
+    # "auto", "capi" (in-process libtesseract) or "subprocess" (pytesseract)
+    tesseract_backend: str = Field(alias="OCR_TESSERACT_BACKEND", default="auto")
+    tesseract_psm: int = Field(alias="OCR_TESSERACT_PSM", default=3)
+    tesseract_oem: int = Field(alias="OCR_TESSERACT_OEM", default=3)
+    easyocr_use_gpu: bool = Field(alias="OCR_EASYOCR_USE_GPU", default=False)
+    max_upload_size: int = Field(alias="OCR_MAX_UPLOAD_SIZE", default=20 * 1024 * 1024)
+    # "sequential" fallback or "hedged", see ml_service.domains.ocr.hedged
+    chain_mode: str = Field(alias="OCR_CHAIN_MODE", default="sequential")
+    # start the next handler if the running ones are silent for that long
+    hedge_delay: float | None = Field(alias="OCR_HEDGE_DELAY", default=2.0)
+    hedge_max_parallel: int = Field(alias="OCR_HEDGE_MAX_PARALLEL", default=2)
+    # micro-batching of concurrent EasyOCR requests, see ml_service.utils.batching
+    easyocr_batching: bool = Field(alias="OCR_EASYOCR_BATCHING", default=False)
+    batch_max_size: int = Field(alias="OCR_BATCH_MAX_SIZE", default=8)
+    # how long the first image of a batch waits for more, seconds
+    batch_window: float = Field(alias="OCR_BATCH_WINDOW", default=0.01)
+    # one process holding the models for all workers, see ml_service.domains.ocr.model_host
+    model_host: bool = Field(alias="OCR_MODEL_HOST", default=False)
+    # unix socket path or host:port
+    model_host_address: str = Field(
+        alias="OCR_MODEL_HOST_ADDRESS", default="/tmp/ml-service-ocr-host.sock"
+    )
+    # readers per model in the host, calls beyond that wait for a free one;
+    # every replica holds its own weights
+    model_host_replicas: int = Field(alias="OCR_MODEL_HOST_REPLICAS", default=2)
+    # generated at startup when empty, required for a standalone host
+    model_host_authkey: SecretStr = Field(
+        alias="OCR_MODEL_HOST_AUTHKEY", default=SecretStr("")
+    )
+    # recognise detected text blocks in parallel, see ml_service.domains.ocr.regions
+    regions: bool = Field(alias="OCR_REGIONS", default=False)
+    # per engine presets, see ml_service.domains.ocr.preprocessing.PRESETS
+    preprocess: bool = Field(alias="OCR_PREPROCESS", default=True)
+    # content-addressed result cache, see ml_service.domains.ocr.cache
+    cache_enabled: bool = Field(alias="OCR_CACHE_ENABLED", default=True)
+    cache_size: int = Field(alias="OCR_CACHE_SIZE", default=1024)
+    cache_ttl: float = Field(alias="OCR_CACHE_TTL", default=24 * 60 * 60)
+    # persistent tier, disabled when empty
+    cache_dir: str = Field(alias="OCR_CACHE_DIR", default="")
+    cache_dir_max_entries: int = Field(alias="OCR_CACHE_DIR_MAX_ENTRIES", default=10000)
+    # multi-page documents, see ml_service.domains.pipeline.ExtractionPipeline.run_pages
+    page_concurrency: int = Field(alias="OCR_PAGE_CONCURRENCY", default=2)
+    max_pages: int = Field(alias="OCR_MAX_PAGES", default=30)
+    # PDF pages are rendered at 72 dpi * OCR_PDF_SCALE, needs pypdfium2
+    pdf_scale: float = Field(alias="OCR_PDF_SCALE", default=2.0)
+
+
+class DeepSeekConfig(Settings):
+    """Configuration for the DeepSeek LLM client."""
+
+    model_config = SettingsConfigDict(env_prefix="DEEPSEEK_")
+
+    api_key: SecretStr = Field(alias="DEEPSEEK_API_KEY", default=SecretStr(""))
+    model: str = Field(alias="DEEPSEEK_MODEL", default="deepseek-chat")
+    temperature: float = Field(alias="DEEPSEEK_TEMPERATURE", default=0.3)
+    timeout: float = Field(alias="DEEPSEEK_TIMEOUT", default=30)
+    # one of ml_service.domains.extractors.prompts.PROMPTS
+    prompt_version: str = Field(alias="DEEPSEEK_PROMPT_VERSION", default="2")
+    # texts of concurrent requests in one completion, see
+    # ml_service.domains.extractors.multi_field.deepseek.BatchedDeepSeekMultiExtractor
+    batching: bool = Field(alias="DEEPSEEK_BATCHING", default=False)
+    batch_max_size: int = Field(alias="DEEPSEEK_BATCH_MAX_SIZE", default=8)
+    # how long the first text of a batch waits for more, seconds
+    batch_window: float = Field(alias="DEEPSEEK_BATCH_WINDOW", default=0.05)
+    # batch requests in flight at a time
+    batch_concurrency: int = Field(alias="DEEPSEEK_BATCH_CONCURRENCY", default=4)
+
+
+class ExtractorsConfig(Settings):
+    """Configuration for the extractor orchestrator."""
+
+    model_config = SettingsConfigDict(env_prefix="EXTRACTORS_")
+
+    # one of ml_service.domains.pipeline.STRATEGIES
+    strategy: str = Field(alias="EXTRACTORS_STRATEGY", default="external_only")
+    # how many extractors AllExtractorsStrategy runs concurrently
+    max_workers: int = Field(alias="EXTRACTORS_MAX_WORKERS", default=4)
+    # per-extractor deadline
+    timeout: float | None = Field(alias="EXTRACTORS_TIMEOUT", default=60)
+    # AllExtractorsStrategy: the first result this confident wins, the rest are cancelled
+    confident_threshold: float | None = Field(
+        alias="EXTRACTORS_CONFIDENT_THRESHOLD", default=None
+    )
+    # shared result cache, see ml_service.domains.extractors.cache
+    cache_enabled: bool = Field(alias="EXTRACTORS_CACHE_ENABLED", default=True)
+    cache_size: int = Field(alias="EXTRACTORS_CACHE_SIZE", default=2048)
+    cache_ttl: float = Field(alias="EXTRACTORS_CACHE_TTL", default=24 * 60 * 60)
+
+
+class ExecutorsConfig(Settings):
+    """Configuration for the process-wide executor registry."""
+
+    model_config = SettingsConfigDict(env_prefix="EXECUTOR_")
+
+    # thread pool for GIL-releasing engines (tesseract subprocess, torch)
+    ocr_workers: int = Field(alias="EXECUTOR_OCR_WORKERS", default=os.cpu_count() or 1)
+    ocr_queue_size: int = Field(alias="EXECUTOR_OCR_QUEUE_SIZE", default=64)
+    # threads recognising text regions of one image in parallel
+    region_workers: int = Field(
+        alias="EXECUTOR_REGION_WORKERS", default=os.cpu_count() or 1
+    )
+    region_queue_size: int = Field(alias="EXECUTOR_REGION_QUEUE_SIZE", default=256)
+    # thread pool for short CPU work (image decoding, sync extractors)
+    default_workers: int = Field(alias="EXECUTOR_DEFAULT_WORKERS", default=4)
+    default_queue_size: int = Field(alias="EXECUTOR_DEFAULT_QUEUE_SIZE", default=128)
+
+
+class HTTPConfig(Settings):
+    """Configuration for the pooled HTTP clients of external providers."""
+
+    model_config = SettingsConfigDict(env_prefix="HTTP_")
+
+    max_connections: int = Field(alias="HTTP_MAX_CONNECTIONS", default=100)
+    max_keepalive_connections: int = Field(
+        alias="HTTP_MAX_KEEPALIVE_CONNECTIONS", default=20
+    )
+    keepalive_expiry: float = Field(alias="HTTP_KEEPALIVE_EXPIRY", default=30)
+    connect_timeout: float = Field(alias="HTTP_CONNECT_TIMEOUT", default=5)
+    # requires the `h2` package, falls back to HTTP/1.1 without it
+    http2: bool = Field(alias="HTTP_HTTP2", default=False)
+
+
+class CircuitBreakerConfig(Settings):
+    """Configuration for the circuit breakers of external providers."""
+
+    model_config = SettingsConfigDict(env_prefix="CIRCUIT_")
+
+    enabled: bool = Field(alias="CIRCUIT_ENABLED", default=True)
+    # share of failed calls among the last CIRCUIT_WINDOW_SIZE that opens the circuit
+    failure_rate: float = Field(alias="CIRCUIT_FAILURE_RATE", default=0.5)
+    # calls slower than that count as slow, disabled when empty;
+    # set it above the p99 latency of the slowest provider (DeepSeek takes 10-40s)
+    slow_call_duration: float | None = Field(
+        alias="CIRCUIT_SLOW_CALL_DURATION", default=None
+    )
+    slow_call_rate: float = Field(alias="CIRCUIT_SLOW_CALL_RATE", default=0.8)
+    window_size: int = Field(alias="CIRCUIT_WINDOW_SIZE", default=20)
+    # no decision before that many calls
+    min_calls: int = Field(alias="CIRCUIT_MIN_CALLS", default=5)
+    # seconds an open circuit rejects calls before a trial call
+    open_duration: float = Field(alias="CIRCUIT_OPEN_DURATION", default=30)
+    half_open_calls: int = Field(alias="CIRCUIT_HALF_OPEN_CALLS", default=1)
+
+
+class JobsConfig(Settings):
+    """Configuration for the asynchronous job queue."""
+
+    model_config = SettingsConfigDict(env_prefix="JOBS_")
+
+    enabled: bool = Field(alias="JOBS_ENABLED", default=True)
+    # job workers per uvicorn worker
+    workers: int = Field(alias="JOBS_WORKERS", default=2)
+    # waiting jobs, POST /jobs answers 503 beyond that
+    queue_size: int = Field(alias="JOBS_QUEUE_SIZE", default=32)
+    # how long finished jobs are kept in memory, seconds
+    ttl: float = Field(alias="JOBS_TTL", default=60 * 60)
+    # longest long-poll of GET /jobs/{id}, seconds
+    max_wait: float = Field(alias="JOBS_MAX_WAIT", default=30)
+    # keep jobs in the database (readable from every worker)
+    persist: bool = Field(alias="JOBS_PERSIST", default=True)
+    # unfinished jobs older than that are taken for lost with their worker, seconds
+    stale_after: float = Field(alias="JOBS_STALE_AFTER", default=15 * 60)
+
+
+class QuotaConfig(Settings):
+    """Configuration for the usage accounting of external providers."""
+
+    model_config = SettingsConfigDict(env_prefix="QUOTA_")
+
+    # keep the usage in the database (shared by workers, survives restarts)
+    persist: bool = Field(alias="QUOTA_PERSIST", default=True)
+    # how often increments are written and the totals reloaded, seconds
+    flush_interval: float = Field(alias="QUOTA_FLUSH_INTERVAL", default=10)
 
 
 class AppConfig(Settings):
@@ -78,6 +287,14 @@ class BaseConfig(Settings):
     log: LoggingConfig = LoggingConfig()
     throttling: ThrottlingConfig = ThrottlingConfig()
     database: PostgresConfig = PostgresConfig()
+    ocr: OCRConfig = OCRConfig()
+    deepseek: DeepSeekConfig = DeepSeekConfig()
+    extractors: ExtractorsConfig = ExtractorsConfig()
+    executors: ExecutorsConfig = ExecutorsConfig()
+    http: HTTPConfig = HTTPConfig()
+    quota: QuotaConfig = QuotaConfig()
+    circuit_breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    jobs: JobsConfig = JobsConfig()
 
     @property
     def reload(self) -> bool:
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 
 class Counters(Enum):
@@ -12,3 +12,138 @@ class Counters(Enum):
     )
     TIMEOUTS = Counter("timeouts", "Number of timeouts")
     EXCEPTIONS = Counter("exceptions", "Number of exceptions")
+    EXECUTOR_REJECTED = Counter(
+        "executor_rejected",
+        "Number of tasks rejected because the executor queue is full",
+        ["executor"],
+    )
+    EXECUTOR_TIMEOUTS = Counter(
+        "executor_timeouts",
+        "Number of executor tasks abandoned or killed after their deadline",
+        ["executor"],
+    )
+    OCR_CACHE_HITS = Counter(
+        "ocr_cache_hits", "Number of OCR results served from the cache", ["tier"]
+    )
+    OCR_CACHE_MISSES = Counter(
+        "ocr_cache_misses", "Number of OCR cache lookups missing every tier"
+    )
+    OCR_CACHE_EVICTIONS = Counter(
+        "ocr_cache_evictions", "Number of OCR results evicted from the cache", ["tier"]
+    )
+    EXTRACTION_CACHE_HITS = Counter(
+        "extraction_cache_hits", "Number of extraction results served from the cache"
+    )
+    EXTRACTION_CACHE_MISSES = Counter(
+        "extraction_cache_misses", "Number of extraction cache misses"
+    )
+    EXTRACTION_CACHE_EVICTIONS = Counter(
+        "extraction_cache_evictions", "Number of extraction results evicted"
+    )
+    CIRCUIT_TRANSITIONS = Counter(
+        "circuit_transitions",
+        "Number of circuit breaker state changes by the new state",
+        ["circuit", "state"],
+    )
+    CIRCUIT_REJECTED = Counter(
+        "circuit_rejected",
+        "Number of calls rejected by an open circuit breaker",
+        ["circuit"],
+    )
+    RETRY_ATTEMPTS = Counter(
+        "retry_attempts",
+        "Number of retries of a failed call",
+        ["function"],
+    )
+    RETRY_EXHAUSTED = Counter(
+        "retry_exhausted",
+        "Number of calls failed without a further retry, by reason",
+        ["function", "reason"],
+    )
+    SINGLEFLIGHT_CALLS = Counter(
+        "singleflight_calls",
+        "Number of calls computing a key (leader) or awaiting an identical "
+        "in-flight computation (follower)",
+        ["flight", "role"],
+    )
+    JOBS_REJECTED = Counter(
+        "jobs_rejected", "Number of jobs rejected because the job queue is full"
+    )
+    JOBS_FINISHED = Counter(
+        "jobs_finished", "Number of finished jobs by status", ["status"]
+    )
+    LLM_PROMPT_TOKENS = Counter(
+        "llm_prompt_tokens",
+        "Prompt tokens sent to an LLM, by whether the provider served them "
+        "from its context cache (hit) or not (miss)",
+        ["llm", "cache"],
+    )
+    LLM_COMPLETION_TOKENS = Counter(
+        "llm_completion_tokens", "Completion tokens generated by an LLM", ["llm"]
+    )
+    LLM_BATCH_SAVED_TOKENS = Counter(
+        "llm_batch_saved_tokens",
+        "Estimated prompt tokens saved by sending texts to an LLM in batches",
+        ["llm"],
+    )
+    LLM_BATCH_SPLITS = Counter(
+        "llm_batch_splits",
+        "Number of LLM batches whose answer missed some texts and was retried",
+        ["llm"],
+    )
+
+
+class Gauges(Enum):
+    EXECUTOR_IN_FLIGHT = Gauge(
+        "executor_in_flight",
+        "Number of tasks submitted to an executor and not finished yet",
+        ["executor"],
+    )
+    EXECUTOR_QUEUE_DEPTH = Gauge(
+        "executor_queue_depth",
+        "Number of tasks waiting for a free executor worker",
+        ["executor"],
+    )
+    EXECUTOR_SATURATION = Gauge(
+        "executor_saturation",
+        "Share of the executor capacity (workers + queue) in use, 0..1",
+        ["executor"],
+    )
+    HTTP_POOL_CONNECTIONS = Gauge(
+        "http_pool_connections",
+        "Number of connections in an HTTP client pool by state",
+        ["client", "state"],
+    )
+    HTTP_POOL_PENDING_REQUESTS = Gauge(
+        "http_pool_pending_requests",
+        "Number of requests waiting for a connection in an HTTP client pool",
+        ["client"],
+    )
+    QUOTA_REMAINING = Gauge(
+        "quota_remaining",
+        "Requests left in the budget of an external provider",
+        ["provider", "window"],
+    )
+    CIRCUIT_STATE = Gauge(
+        "circuit_state",
+        "Circuit breaker state: 0 - closed, 1 - half-open, 2 - open",
+        ["circuit"],
+    )
+    JOBS_QUEUE_DEPTH = Gauge(
+        "jobs_queue_depth", "Number of jobs waiting for a job worker"
+    )
+
+
+class Histograms(Enum):
+    BATCH_SIZE = Histogram(
+        "batch_size",
+        "Number of items per micro-batch",
+        ["batcher"],
+        buckets=(1, 2, 4, 8, 16, 32, 64),
+    )
+    BATCH_QUEUE_WAIT = Histogram(
+        "batch_queue_wait_seconds",
+        "Time an item waited in the micro-batcher before its batch started",
+        ["batcher"],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    )
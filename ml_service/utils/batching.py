@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from ml_service.settings.metrics import Histograms
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Groups concurrent requests into batches for models with a batched path.
+
+    The first item starts a collection window of `max_wait` seconds, the batch
+    is sent when the window closes or `max_batch_size` items are collected.
+    At most `max_concurrency` batches run at a time, items arriving while
+    they do wait for the next one, so under load batches fill up without any
+    extra delay. Compute-bound models keep the default of 1, remote APIs
+    allow several requests in flight. `process_batch` gets the items in
+    submission order and returns one result per item. A batch whose callers
+    all gave up is cancelled.
+
+    Bound to the event loop of its first `submit`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[list[T]], Awaitable[list[R]]],
+        max_batch_size: int = 8,
+        max_wait: float = 0.01,
+        max_concurrency: int = 1,
+    ) -> None:
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait, 0.0)
+        self.max_concurrency = max(max_concurrency, 1)
+        self._queue: asyncio.Queue[tuple[T, asyncio.Future[R], float]] | None = None
+        self._worker: asyncio.Task | None = None
+        self._batches: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_started(self) -> asyncio.Queue[tuple[T, asyncio.Future[R], float]]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None and not self._loop.is_closed():
+                raise RuntimeError(
+                    f"MicroBatcher {self.name} is bound to another event loop"
+                )
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run(), name=f"batcher-{self.name}")
+        assert self._queue is not None
+        return self._queue
+
+    async def submit(self, item: T) -> R:
+        queue = self._ensure_started()
+        future: asyncio.Future[R] = asyncio.get_running_loop().create_future()
+        queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(
+        self, queue: asyncio.Queue[tuple[T, asyncio.Future[R], float]]
+    ) -> list[tuple[T, asyncio.Future[R], float]]:
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except TimeoutError:
+                break
+        # callers that gave up (cancelled, timed out) are not worth computing
+        return [entry for entry in batch if not entry[1].done()]
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        slots = asyncio.Semaphore(self.max_concurrency)
+        while True:
+            await slots.acquire()
+            try:
+                batch = await self._collect(queue)
+            except BaseException:
+                slots.release()
+                raise
+            if not batch:
+                slots.release()
+                continue
+
+            task = asyncio.create_task(self._process(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+            task.add_done_callback(lambda _: slots.release())
+            futures = [future for _, future, _ in batch]
+
+            def cancel_if_abandoned(_: asyncio.Future, task=task, futures=futures):
+                if not task.done() and all(f.cancelled() for f in futures):
+                    task.cancel()
+
+            for future in futures:
+                future.add_done_callback(cancel_if_abandoned)
+
+    async def _process(self, batch: list[tuple[T, asyncio.Future[R], float]]) -> None:
+        started = time.perf_counter()
+        Histograms.BATCH_SIZE.value.labels(self.name).observe(len(batch))
+        for _, _, submitted in batch:
+            Histograms.BATCH_QUEUE_WAIT.value.labels(self.name).observe(
+                started - submitted
+            )
+
+        try:
+            results = await self.process_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"MicroBatcher {self.name}: got {len(results)} results"
+                    f" for {len(batch)} items"
+                )
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as exc:
+            logging.error(f"MicroBatcher {self.name}: batch failed: {exc}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Stops the worker and the running batches, pending callers are cancelled."""
+        tasks = list(self._batches)
+        if self._worker is not None:
+            tasks.append(self._worker)
+            self._worker = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                future.cancel()
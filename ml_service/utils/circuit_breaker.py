@@ -0,0 +1,226 @@
+import contextlib
+import enum
+import functools
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Iterator, ParamSpec, TypeVar
+
+import httpx
+
+from ml_service.settings.config import CircuitBreakerConfig, config
+from ml_service.settings.metrics import Counters, Gauges
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class CircuitState(enum.IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitOpenError(Exception):
+    """The provider is failing, the call was rejected without being made."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit {name} is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    Whether an error says something about the provider health.
+    Client errors (bad request, auth) do not, 429 and 5xx do.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, Exception)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for calls to one external provider.
+
+    CLOSED: calls go through, outcomes of the last `window_size` calls are kept.
+    Once at least `min_calls` are recorded and the share of failures reaches
+    `failure_rate` or the share of calls slower than `slow_call_duration`
+    reaches `slow_call_rate`, the circuit opens.
+    OPEN: calls fail with `CircuitOpenError` immediately for `open_duration`.
+    HALF_OPEN: up to `half_open_calls` trial calls are let through, a success
+    closes the circuit, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_duration: float | None = None,
+        slow_call_rate: float = 1.0,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_duration: float = 30,
+        half_open_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = is_provider_failure,
+    ) -> None:
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.is_failure = is_failure
+        # (failed, slow) of the recent calls
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        Gauges.CIRCUIT_STATE.value.labels(name).set(CircuitState.CLOSED)
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_duration
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are rejected right now."""
+        state = self.state
+        return state == CircuitState.OPEN or (
+            state == CircuitState.HALF_OPEN and self._trials >= self.half_open_calls
+        )
+
+    def _transition(self, state: CircuitState) -> None:
+        previous, self._state = self._state, state
+        self._trials = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        if state == CircuitState.CLOSED:
+            self._outcomes.clear()
+        Gauges.CIRCUIT_STATE.value.labels(self.name).set(state)
+        Counters.CIRCUIT_TRANSITIONS.value.labels(self.name, state.name.lower()).inc()
+        logging.warning(f"Circuit {self.name}: {previous.name} -> {state.name}")
+
+    def before_call(self) -> None:
+        """Raises `CircuitOpenError` if the call must not be made."""
+        if self.is_open:
+            Counters.CIRCUIT_REJECTED.value.labels(self.name).inc()
+            retry_after = max(
+                self._opened_at + self.open_duration - time.monotonic(), 0
+            )
+            raise CircuitOpenError(self.name, retry_after)
+        if self._state == CircuitState.HALF_OPEN:
+            self._trials += 1
+
+    def record(self, failed: bool, duration: float) -> None:
+        slow = (
+            self.slow_call_duration is not None and duration >= self.slow_call_duration
+        )
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(
+                CircuitState.OPEN if failed or slow else CircuitState.CLOSED
+            )
+            return
+        if self._state == CircuitState.OPEN:
+            return  # a call started before the circuit opened
+
+        self._outcomes.append((failed, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(failed for failed, _ in self._outcomes)
+        slow_calls = sum(slow for _, slow in self._outcomes)
+        if (
+            failures / calls >= self.failure_rate
+            or slow_calls / calls >= self.slow_call_rate
+        ):
+            self._transition(CircuitState.OPEN)
+
+    @contextlib.contextmanager
+    def track(self) -> Iterator[None]:
+        """Records the outcome and duration of the call made inside the block."""
+        self.before_call()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as error:
+            self.record(self.is_failure(error), time.monotonic() - start)
+            raise
+        except BaseException:
+            # cancelled by the caller, says nothing about the provider
+            if self._state == CircuitState.HALF_OPEN:
+                self._trials -= 1
+            raise
+        self.record(False, time.monotonic() - start)
+
+    async def call(
+        self, func: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        with self.track():
+            return await func(*args, **kwargs)
+
+
+class CircuitBreakers:
+    """
+    Registry of circuit breakers, one per provider, so every handler and
+    client talking to the provider in this worker shares its state.
+    """
+
+    def __init__(self, settings: CircuitBreakerConfig) -> None:
+        self.settings = settings
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(
+                name,
+                failure_rate=self.settings.failure_rate,
+                slow_call_duration=self.settings.slow_call_duration,
+                slow_call_rate=self.settings.slow_call_rate,
+                window_size=self.settings.window_size,
+                min_calls=self.settings.min_calls,
+                open_duration=self.settings.open_duration,
+                half_open_calls=self.settings.half_open_calls,
+            )
+        return breaker
+
+    def track(self, name: str) -> contextlib.AbstractContextManager[None]:
+        """`CircuitBreaker.track` of `name`, for calls that are not a single coroutine."""
+        if not self.settings.enabled:
+            return contextlib.nullcontext()
+        return self.get(name).track()
+
+    def is_open(self, name: str) -> bool:
+        return self.settings.enabled and self.get(name).is_open
+
+    def protect(
+        self, name: str
+    ) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+        """
+        Decorator running a coroutine function through the `name` breaker.
+        Put it under `@retry`: every attempt is recorded, and an open
+        circuit ends the retries at once.
+        """
+
+        def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+            @functools.wraps(func)
+            async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+                if not self.settings.enabled:
+                    return await func(*args, **kwargs)
+                return await self.get(name).call(func, *args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+circuit_breakers = CircuitBreakers(config.circuit_breaker)
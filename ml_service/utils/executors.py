@@ -0,0 +1,200 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from collections.abc import Callable
+from typing import Any, ParamSpec, TypeVar
+
+from ml_service.settings.config import ExecutorsConfig, config
+from ml_service.settings.metrics import Counters, Gauges
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a task is submitted to an executor whose queue is full."""
+
+
+class BoundedExecutor:
+    """
+    A thread pool with a bounded backlog.
+
+    `concurrent.futures` executors have an unbounded work queue, so under load
+    they silently pile up work that will finish long after its caller gave up.
+    Here at most `max_workers + max_queue` tasks can be in flight, anything
+    beyond that is rejected with `ExecutorSaturatedError`.
+
+    Deadlines are enforced without waiting for the work itself: tasks that
+    overrun are abandoned (the worker finishes them in the background,
+    but nobody waits).
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.max_workers = max(max_workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"executor-{self.name}"
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._in_flight - self.max_workers, 0)
+
+    def _report(self) -> None:
+        Gauges.EXECUTOR_IN_FLIGHT.value.labels(self.name).set(self._in_flight)
+        Gauges.EXECUTOR_QUEUE_DEPTH.value.labels(self.name).set(self.queue_depth)
+        Gauges.EXECUTOR_SATURATION.value.labels(self.name).set(
+            self._in_flight / self.capacity
+        )
+
+    def _release(self, _: concurrent.futures.Future | None = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._report()
+
+    def submit(
+        self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> concurrent.futures.Future[T]:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                Counters.EXECUTOR_REJECTED.value.labels(self.name).inc()
+                raise ExecutorSaturatedError(
+                    f"Executor {self.name} is saturated ({self._in_flight} tasks in flight)"
+                )
+            self._in_flight += 1
+            self._report()
+
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _abandon(self, future: concurrent.futures.Future, timed_out: bool) -> None:
+        if timed_out:
+            Counters.EXECUTOR_TIMEOUTS.value.labels(self.name).inc()
+        if not future.cancel():  # already started
+            logging.warning(f"Executor {self.name}: abandoning a running task")
+
+    def run(
+        self,
+        func: Callable[P, T],
+        *args: P.args,
+        timeout: float | None = None,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        Runs `func` on the executor and blocks the caller for at most `timeout` seconds.
+        Raises TimeoutError when the deadline is exceeded.
+        """
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            self._abandon(future, timed_out=True)
+            raise
+
+    async def arun(
+        self,
+        func: Callable[P, T],
+        *args: P.args,
+        timeout: float | None = None,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        Async version of `run`. Cancelling the awaiting coroutine
+        cancels (or abandons) the task as well.
+        """
+        future = self.submit(func, *args, **kwargs)
+        try:
+            async with asyncio.timeout(timeout):
+                return await asyncio.wrap_future(future)
+        except TimeoutError:
+            self._abandon(future, timed_out=True)
+            raise
+        except asyncio.CancelledError:
+            if not future.done():
+                self._abandon(future, timed_out=False)
+            raise
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class ExecutorRegistry:
+    """
+    Process-wide registry of named executors.
+
+    - `ocr`: threads for GIL-releasing engines (tesseract subprocess, torch).
+    - `ocr-regions`: threads recognising text regions of one image in parallel,
+      separate from `ocr` whose tasks wait for them.
+    - `default`: threads for short blocking work (decoding, sync extractors).
+    """
+
+    def __init__(self, settings: ExecutorsConfig) -> None:
+        self.settings = settings
+        self._executors: dict[str, BoundedExecutor] = {}
+        self._lock = threading.RLock()
+
+    def _create(self, name: str) -> BoundedExecutor:
+        match name:
+            case "ocr":
+                return BoundedExecutor(
+                    name,
+                    self.settings.ocr_workers,
+                    self.settings.ocr_queue_size,
+                )
+            case "ocr-regions":
+                return BoundedExecutor(
+                    name,
+                    self.settings.region_workers,
+                    self.settings.region_queue_size,
+                )
+            case _:
+                return BoundedExecutor(
+                    name,
+                    self.settings.default_workers,
+                    self.settings.default_queue_size,
+                )
+
+    def get(self, name: str = "default") -> BoundedExecutor:
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    executor = self._executors[name] = self._create(name)
+        return executor
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "in_flight": executor.in_flight,
+                "queue_depth": executor.queue_depth,
+                "capacity": executor.capacity,
+            }
+            for name, executor in self._executors.items()
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            for executor in set(self._executors.values()):
+                executor.shutdown(wait=wait)
+            self._executors.clear()
+
+
+executors = ExecutorRegistry(config.executors)
@@ -0,0 +1,106 @@
+import importlib.util
+import logging
+import threading
+from typing import Any
+
+import httpx
+
+from ml_service.settings.config import HTTPConfig, config
+from ml_service.settings.metrics import Gauges
+
+
+class HTTPClients:
+    """
+    Registry of long-lived `httpx.AsyncClient`s, one per external provider.
+
+    Clients keep their connection pools (and TLS sessions) between requests,
+    so LLM and OCR calls, including retries, reuse warm connections.
+    They are created in the lifespan and closed on shutdown.
+    """
+
+    def __init__(self, settings: HTTPConfig) -> None:
+        self.settings = settings
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def http2(self) -> bool:
+        if self.settings.http2 and importlib.util.find_spec("h2") is None:
+            logging.warning("HTTP_HTTP2 is enabled but `h2` is not installed")
+            return False
+        return self.settings.http2
+
+    def _create(self, name: str, **kwargs: Any) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.settings.max_connections,
+            max_keepalive_connections=self.settings.max_keepalive_connections,
+            keepalive_expiry=self.settings.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(None, connect=self.settings.connect_timeout)
+        http2 = self.http2
+        client = httpx.AsyncClient(
+            limits=limits, timeout=timeout, http2=http2, **kwargs
+        )
+        self._register_metrics(name, client)
+        logging.info(f"HTTP client {name} created (http2={http2})")
+        return client
+
+    def _register_metrics(self, name: str, client: httpx.AsyncClient) -> None:
+        Gauges.HTTP_POOL_CONNECTIONS.value.labels(name, "active").set_function(
+            lambda: self.pool_stats(client)["active"]
+        )
+        Gauges.HTTP_POOL_CONNECTIONS.value.labels(name, "idle").set_function(
+            lambda: self.pool_stats(client)["idle"]
+        )
+        Gauges.HTTP_POOL_PENDING_REQUESTS.value.labels(name).set_function(
+            lambda: self.pool_stats(client)["pending"]
+        )
+
+    def get(self, name: str, **kwargs: Any) -> httpx.AsyncClient:
+        """
+        Returns the client registered under `name`, creating it on first use.
+        `kwargs` are passed to `httpx.AsyncClient` only when the client is created.
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None or client.is_closed:
+                    client = self._clients[name] = self._create(name, **kwargs)
+        return client
+
+    @staticmethod
+    def pool_stats(client: httpx.AsyncClient) -> dict[str, int]:
+        """
+        Connection counts of the client's httpcore pool. httpx has no public
+        pool API, so this reads httpcore internals (covered by tests/test_http.py)
+        and reports zeros if they change instead of failing the metrics scrape.
+        """
+        transport = getattr(client, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        if pool is None:
+            return {"active": 0, "idle": 0, "pending": 0}
+        try:
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for c in connections if c.is_idle())
+            pending = sum(
+                1
+                for r in getattr(pool, "_requests", [])
+                if getattr(r, "connection", None) is None
+            )
+        except Exception:
+            logging.exception("Can not read the HTTP connection pool stats")
+            return {"active": 0, "idle": 0, "pending": 0}
+        return {"active": len(connections) - idle, "idle": idle, "pending": pending}
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {name: self.pool_stats(c) for name, c in self._clients.items()}
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+http_clients = HTTPClients(config.http)
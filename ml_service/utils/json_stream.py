@@ -0,0 +1,112 @@
+import json
+from typing import Any
+
+WHITESPACE = " \t\r\n"
+
+
+class JSONObjectStream:
+    """
+    Incremental parser of one JSON object arriving in pieces (LLM output).
+
+    `feed` returns the top-level `(key, value)` pairs completed by the new
+    piece, so a field can be used before the rest of the object is generated.
+    Strings, arrays and objects are complete at their closing character,
+    numbers and literals at the following `,` or `}`. Anything before the
+    opening `{` (a markdown fence, for instance) is skipped.
+    """
+
+    def __init__(self) -> None:
+        self.result: dict[str, Any] = {}
+        self._stage = "start"
+        self._token: list[str] = []
+        self._key = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._stage == "done"
+
+    def _complete(self) -> tuple[str, Any]:
+        raw = "".join(self._token).strip()
+        self._token = []
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON value of {self._key!r}: {raw!r}") from exc
+        self.result[self._key] = value
+        return self._key, value
+
+    def _string_char(self, char: str) -> bool:
+        """Tracks escapes inside a string, `True` when it closes."""
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            return True
+        return False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        completed = []
+        for char in chunk:
+            match self._stage:
+                case "start":
+                    if char == "{":
+                        self._stage = "key"
+                case "key":
+                    if char == '"':
+                        self._stage = "key_string"
+                        self._in_string = True
+                        self._token = ['"']
+                    elif char == "}":
+                        self._stage = "done"
+                    elif char not in WHITESPACE + ",":
+                        raise ValueError(f"Unexpected {char!r} before a key")
+                case "key_string":
+                    self._token.append(char)
+                    if self._string_char(char):
+                        self._key = json.loads("".join(self._token))
+                        self._token = []
+                        self._stage = "colon"
+                case "colon":
+                    if char == ":":
+                        self._stage = "value"
+                    elif char not in WHITESPACE:
+                        raise ValueError(f"Unexpected {char!r} after key {self._key!r}")
+                case "value":
+                    if self._in_string:
+                        self._token.append(char)
+                        if self._string_char(char) and self._depth == 0:
+                            completed.append(self._complete())
+                            self._stage = "after_value"
+                    elif char == '"':
+                        self._token.append(char)
+                        self._in_string = True
+                    elif char in "[{":
+                        self._token.append(char)
+                        self._depth += 1
+                    elif char in "]}" and self._depth:
+                        self._token.append(char)
+                        self._depth -= 1
+                        if self._depth == 0:
+                            completed.append(self._complete())
+                            self._stage = "after_value"
+                    elif char in ",}" and self._depth == 0:
+                        # end of a number or a literal
+                        completed.append(self._complete())
+                        self._stage = "key" if char == "," else "done"
+                    else:
+                        self._token.append(char)
+                case "after_value":
+                    if char == ",":
+                        self._stage = "key"
+                    elif char == "}":
+                        self._stage = "done"
+                    elif char not in WHITESPACE:
+                        raise ValueError(f"Unexpected {char!r} after {self._key!r}")
+                case "done":
+                    break
+        return completed
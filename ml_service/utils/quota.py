@@ -0,0 +1,199 @@
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Protocol
+
+from ml_service.settings.metrics import Gauges
+
+
+class UsageStore(Protocol):
+    """Persistent daily usage counters, see `ml_service.db.usage.UsageRepository`."""
+
+    async def add(self, provider: str, counts: dict[date, int]) -> None: ...
+
+    async def load(self, provider: str, since: date) -> dict[date, int]: ...
+
+
+def utc_today() -> date:
+    return datetime.now(UTC).date()
+
+
+class QuotaTracker:
+    """
+    Request budget of an external provider.
+
+    Usage is counted per UTC day: `monthly_limit` covers the calendar month,
+    `rolling_limit` the last `rolling_days` days including today. `None`
+    disables a budget.
+
+    `record` and `exhausted` only touch memory. Increments are collected and
+    written to the store by `flush`, `refresh` reloads the totals of all
+    workers; both run periodically off the request path (see `QuotaRegistry`).
+    Without a store the tracker counts the usage of this worker only.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        monthly_limit: int | None = None,
+        rolling_limit: int | None = None,
+        rolling_days: int = 1,
+    ) -> None:
+        self.provider = provider
+        self.monthly_limit = monthly_limit
+        self.rolling_limit = rolling_limit
+        self.rolling_days = rolling_days
+        self.store: UsageStore | None = None
+        # stored totals plus local increments
+        self._days: defaultdict[date, int] = defaultdict(int)
+        # local increments not written to the store yet
+        self._pending: defaultdict[date, int] = defaultdict(int)
+        self._today = utc_today()
+        self._used_month = 0
+        self._used_rolling = 0
+        self._exhausted = False
+        self._recount()
+
+    @property
+    def window_start(self) -> date:
+        """The first day counted by any of the budgets."""
+        return min(
+            self._today.replace(day=1),
+            self._today - timedelta(days=self.rolling_days - 1),
+        )
+
+    def _recount(self) -> None:
+        month_start = self._today.replace(day=1)
+        rolling_start = self._today - timedelta(days=self.rolling_days - 1)
+        window_start = self.window_start
+        for day in [day for day in self._days if day < window_start]:
+            del self._days[day]
+        self._used_month = sum(
+            count for day, count in self._days.items() if day >= month_start
+        )
+        self._used_rolling = sum(
+            count for day, count in self._days.items() if day >= rolling_start
+        )
+        self._update()
+
+    def _update(self) -> None:
+        remaining = self.remaining
+        self._exhausted = any(value <= 0 for value in remaining.values())
+        for window, value in remaining.items():
+            Gauges.QUOTA_REMAINING.value.labels(self.provider, window).set(value)
+
+    def _roll(self) -> None:
+        today = utc_today()
+        if today != self._today:
+            self._today = today
+            self._recount()
+
+    @property
+    def remaining(self) -> dict[str, int]:
+        """Requests left per budget: "month" and "rolling"."""
+        remaining = {}
+        if self.monthly_limit is not None:
+            remaining["month"] = max(self.monthly_limit - self._used_month, 0)
+        if self.rolling_limit is not None:
+            remaining["rolling"] = max(self.rolling_limit - self._used_rolling, 0)
+        return remaining
+
+    @property
+    def exhausted(self) -> bool:
+        self._roll()
+        return self._exhausted
+
+    def record(self, count: int = 1) -> None:
+        """Counts `count` requests sent to the provider."""
+        self._roll()
+        self._days[self._today] += count
+        self._pending[self._today] += count
+        self._used_month += count
+        self._used_rolling += count
+        self._update()
+
+    async def flush(self) -> None:
+        """Writes the collected increments to the store."""
+        if self.store is None or not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(int)
+        try:
+            await self.store.add(self.provider, dict(pending))
+        except BaseException as error:
+            # kept for the next flush, the usage must not be lost
+            for day, count in pending.items():
+                self._pending[day] += count
+            if not isinstance(error, Exception):
+                raise
+            logging.warning(f"Can not save {self.provider} usage: {error}")
+
+    async def refresh(self) -> None:
+        """Reloads the usage of all workers from the store."""
+        if self.store is None:
+            return
+        self._roll()
+        try:
+            stored = await self.store.load(self.provider, self.window_start)
+        except Exception as error:
+            logging.warning(f"Can not load {self.provider} usage: {error}")
+            return
+        days: defaultdict[date, int] = defaultdict(int, stored)
+        for day, count in self._pending.items():
+            days[day] += count
+        self._days = days
+        self._recount()
+
+
+class QuotaRegistry:
+    """
+    Quota trackers of the external providers, one per provider.
+
+    `start` attaches the store and runs the flush/refresh loop in the
+    background, `aclose` stops it and writes the remaining increments.
+    """
+
+    def __init__(self) -> None:
+        self._trackers: dict[str, QuotaTracker] = {}
+        self._task: asyncio.Task | None = None
+
+    def get(self, provider: str, **kwargs: Any) -> QuotaTracker:
+        """
+        Returns the tracker of `provider`, creating it on first use.
+        `kwargs` are passed to `QuotaTracker` only when it is created.
+        """
+        tracker = self._trackers.get(provider)
+        if tracker is None:
+            tracker = self._trackers[provider] = QuotaTracker(provider, **kwargs)
+        return tracker
+
+    async def start(
+        self, store: UsageStore, interval: float, timeout: float = 5
+    ) -> None:
+        for tracker in self._trackers.values():
+            tracker.store = store
+            # the stored usage is loaded before the first request, but never
+            # holds the startup for longer than `timeout`
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(tracker.refresh(), timeout)
+        self._task = asyncio.create_task(self._run(interval), name="quota-flush")
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            for tracker in list(self._trackers.values()):
+                await tracker.flush()
+                await tracker.refresh()
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for tracker in self._trackers.values():
+            await tracker.flush()
+
+
+quotas = QuotaRegistry()
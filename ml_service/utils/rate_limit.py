@@ -0,0 +1,196 @@
+import fcntl
+import hashlib
+import math
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from ml_service.settings.config import ThrottlingConfig
+
+SLOT = np.dtype([("key", np.uint64), ("tokens", np.float64), ("updated", np.float64)])
+PROBES = 8  # slots checked per key in the shared table
+
+
+class RateLimiter(ABC):
+    """
+    Token bucket per key: `capacity` tokens, refilled at `rate` tokens
+    per second. A request takes `cost` tokens or is rejected.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        # a bucket untouched for that long is full again, forgetting it is free
+        self.idle_ttl = capacity / rate if rate > 0 else math.inf
+
+    def _take(
+        self, tokens: float, updated: float, now: float, cost: float
+    ) -> tuple[float, bool, float]:
+        """New token count, whether the request is allowed and the seconds to wait."""
+        # a request larger than the bucket waits for a full bucket
+        cost = min(cost, self.capacity)
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens >= cost:
+            return tokens - cost, True, 0.0
+        wait = (cost - tokens) / self.rate if self.rate > 0 else math.inf
+        return tokens, False, wait
+
+    @abstractmethod
+    def acquire(self, key: str, cost: float = 1.0) -> tuple[bool, float]:
+        """Returns whether the request is allowed and, if not, when to retry."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return 0
+
+
+class LocalRateLimiter(RateLimiter):
+    """
+    In-process buckets in an LRU. At most `max_keys` keys are tracked,
+    idle keys (full buckets) are dropped, so memory stays bounded.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int) -> None:
+        super().__init__(rate, capacity)
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str, cost: float = 1.0) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens, allowed, wait = self._take(tokens, updated, now, cost)
+            self._buckets[key] = (tokens, now)
+
+            while self._buckets:
+                oldest, (_, last) = next(iter(self._buckets.items()))
+                if len(self._buckets) <= self.max_keys and now - last < self.idle_ttl:
+                    break
+                del self._buckets[oldest]
+        return allowed, wait
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    Buckets in a fixed-size hash table in shared memory, so every worker
+    process on the host enforces one limit. A key probes `PROBES` adjacent
+    slots, guarded by an `fcntl` byte-range lock over exactly that window.
+    Idle or the least recently used slots are reused, the table never grows.
+    `time.monotonic` is system-wide on Linux, timestamps are comparable
+    across processes.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int, name: str) -> None:
+        super().__init__(rate, capacity)
+        self.name = name
+        self.slots = max(max_keys, PROBES)
+        size = self.slots * SLOT.itemsize
+        # not tracked: the first worker exiting must not remove the table of the others
+        try:
+            self._shm = SharedMemory(name=name, create=True, size=size, track=False)
+        except FileExistsError:
+            self._shm = SharedMemory(name=name, track=False)
+            if self._shm.size < size:
+                raise ValueError(
+                    f"Shared rate limiter {name} is too small, remove /dev/shm/{name}"
+                )
+        self._table = np.ndarray((self.slots,), dtype=SLOT, buffer=self._shm.buf)
+        self._lock_fd = os.open(
+            os.path.join(tempfile.gettempdir(), f"{name}.lock"),
+            os.O_RDWR | os.O_CREAT,
+            0o600,
+        )
+        # fcntl locks are per process, threads of a worker need their own lock
+        self._thread_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._table["key"]))
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest) | 1  # 0 marks an empty slot
+
+    def _find(self, key_hash: int, start: int, now: float) -> int:
+        table = self._table
+        victim, victim_updated = start, math.inf
+        for slot in range(start, start + PROBES):
+            current = int(table["key"][slot])
+            if current == key_hash:
+                return slot
+            updated = float(table["updated"][slot])
+            if current == 0 or now - updated >= self.idle_ttl:
+                updated = -math.inf  # free or a full bucket, reuse first
+            if updated < victim_updated:
+                victim, victim_updated = slot, updated
+        table["key"][victim] = key_hash
+        table["tokens"][victim] = self.capacity
+        table["updated"][victim] = now
+        return victim
+
+    def acquire(self, key: str, cost: float = 1.0) -> tuple[bool, float]:
+        key_hash = self._hash(key)
+        start = key_hash % (self.slots - PROBES + 1)
+        with self._thread_lock:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, PROBES, start)
+            try:
+                now = time.monotonic()
+                slot = self._find(key_hash, start, now)
+                tokens, allowed, wait = self._take(
+                    float(self._table["tokens"][slot]),
+                    float(self._table["updated"][slot]),
+                    now,
+                    cost,
+                )
+                self._table["tokens"][slot] = tokens
+                self._table["updated"][slot] = now
+            finally:
+                fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, PROBES, start)
+        return allowed, wait
+
+
+def request_cost(content_length: int, cost_per_mb: float) -> float:
+    """One token per request plus `cost_per_mb` tokens per uploaded megabyte."""
+    return 1.0 + cost_per_mb * content_length / (1024 * 1024)
+
+
+def create_rate_limiter(settings: ThrottlingConfig) -> RateLimiter:
+    rate = settings.rate_limit_per_minute / 60
+    capacity = settings.burst or settings.rate_limit_per_minute
+    match settings.backend:
+        case "local":
+            return LocalRateLimiter(rate, capacity, settings.max_keys)
+        case "shared":
+            return SharedRateLimiter(
+                rate, capacity, settings.max_keys, settings.shared_name
+            )
+        case _:
+            raise ValueError(f"Unknown throttling backend: {settings.backend}")
+
+
+def remove_shared_state(settings: ThrottlingConfig) -> None:
+    try:
+        SharedMemory(name=settings.shared_name, track=False).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def init_shared_state(settings: ThrottlingConfig) -> None:
+    """
+    Replaces the shared table of a previous run with an empty one.
+    Called by the parent process, so workers only attach to it.
+    """
+    if settings.backend != "shared":
+        return
+    remove_shared_state(settings)
+    create_rate_limiter(settings)
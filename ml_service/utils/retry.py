@@ -1,11 +1,13 @@
 # mypy: ignore-errors
 # ruff: noqa: C901
 import asyncio
+import email.utils
 import functools
 import logging
 import random
-import sys
+import threading
 import time
+from dataclasses import dataclass
 from typing import (
     Any,
     Callable,
@@ -15,21 +17,203 @@ from typing import (
     overload,
 )
 
+from ml_service.settings.metrics import Counters
+
 P = ParamSpec("P")
 T = TypeVar("T")
 AnyFunc = Callable[..., Any]
 
+# statuses worth another attempt: timeouts, throttling, server errors
+RETRYABLE_STATUSES = frozenset({408, 425, 429})
+
+
+def response_of(exc: BaseException) -> Any | None:
+    """The HTTP response attached to an exception (`httpx.HTTPStatusError`), if any."""
+    try:
+        return getattr(exc, "response", None)
+    except RuntimeError:  # httpx raises when the error has no response
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Client errors are not retried (the same request fails the same way),
+    except for timeouts and 429.
+    """
+    response = response_of(exc)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        return True
+    return status >= 500 or status in RETRYABLE_STATUSES
+
+
+def retry_after_hint(exc: BaseException) -> float | None:
+    """Seconds from the `Retry-After` header of the response, if the server sent one."""
+    response = response_of(exc)
+    headers = getattr(response, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(moment.timestamp() - time.time(), 0.0)
+
+
+class RetryBudget:
+    """
+    Caps retries as a fraction of the traffic.
+
+    Every first attempt deposits `ratio` tokens, every retry withdraws one,
+    and `min_per_second` tokens are added per second so rare calls can
+    still be retried. The balance is capped at `capacity`. When a provider
+    fails for everyone, retries stop at about `ratio` of the calls instead
+    of multiplying the load by the number of attempts.
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_per_second: float = 1.0, capacity: float = 10
+    ) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self._balance = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed, self._updated = now - self._updated, now
+        self._balance = min(
+            self.capacity, self._balance + elapsed * self.min_per_second
+        )
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._balance = min(self.capacity, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Takes a token for a retry, `False` if the budget is spent."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Settings of one decorated function, see `Retry.__call__`."""
+
+    name: str
+    n_times: int
+    sleep_duration: float
+    increasing: bool
+    verbose: bool
+    deadline: float | None
+    max_sleep: float
+    retry_on: Callable[[BaseException], bool]
+    budget: RetryBudget | None
+
+    def start(self) -> "RetryState":
+        if self.budget is not None:
+            self.budget.deposit()
+        return RetryState(self)
+
+
+class RetryState:
+    """Attempts of one call: the previous sleep, the start time."""
+
+    __slots__ = ("policy", "attempt", "started", "previous_sleep")
+
+    def __init__(self, policy: RetryPolicy) -> None:
+        self.policy = policy
+        self.attempt = 0
+        self.started = time.monotonic()
+        self.previous_sleep = policy.sleep_duration
+
+    def _backoff(self) -> float:
+        policy = self.policy
+        if not policy.increasing:
+            return policy.sleep_duration
+        # decorrelated jitter: random between the base and 3x the previous sleep
+        sleep = min(
+            policy.max_sleep,
+            random.uniform(policy.sleep_duration, self.previous_sleep * 3),
+        )
+        self.previous_sleep = sleep
+        return sleep
+
+    @property
+    def time_left(self) -> float | None:
+        """Seconds until the deadline, `None` without one."""
+        if self.policy.deadline is None:
+            return None
+        return max(self.policy.deadline - (time.monotonic() - self.started), 0.0)
+
+    def give_up(self, reason: str) -> None:
+        Counters.RETRY_EXHAUSTED.value.labels(self.policy.name, reason).inc()
+
+    def next_sleep(self, exc: BaseException) -> float | None:
+        """Seconds to wait before the next attempt, `None` to give up and re-raise."""
+        policy = self.policy
+        self.attempt += 1
+        if not policy.retry_on(exc):
+            self.give_up("not_retryable")
+            return None
+        if self.attempt >= policy.n_times:
+            self.give_up("attempts")
+            return None
+
+        sleep = self._backoff()
+        hint = retry_after_hint(exc)
+        if hint is not None:
+            # the server knows better when it is ready again, without a
+            # deadline to give up at an absurd hint is capped by `max_sleep`
+            if policy.deadline is None:
+                hint = min(hint, policy.max_sleep)
+            sleep = max(sleep, hint)
+        if policy.deadline is not None:
+            elapsed = time.monotonic() - self.started
+            if elapsed + sleep >= policy.deadline:
+                self.give_up("deadline")
+                return None
+        if policy.budget is not None and not policy.budget.withdraw():
+            self.give_up("budget")
+            return None
+
+        Counters.RETRY_ATTEMPTS.value.labels(policy.name).inc()
+        sleep = round(sleep, 2)
+        logging.warning(
+            f"Retry {self.attempt}/{policy.n_times - 1} (sleep: {sleep}s)"
+            f" of {policy.name} failed: {exc}"
+        )
+        if policy.verbose:
+            logging.warning(f"exc_info for {policy.name}", exc_info=exc)
+        return sleep
+
 
 class Retry:
     """
     A decorator class for retrying function calls on specified exceptions, with optional backoff and logging.
     This class can be used to decorate both synchronous and asynchronous functions.
+
+    All functions decorated by one instance share its `budget`, if any.
+    Settings are bound per decorated function, the instance itself is not modified.
     """
 
-    __slots__ = ("verbose", "n_times", "sleep_duration", "increasing")
+    __slots__ = ("verbose", "budget")
 
-    def __init__(self, verbose: bool = False) -> None:
+    def __init__(
+        self, verbose: bool = False, budget: RetryBudget | None = None
+    ) -> None:
         self.verbose: bool = verbose
+        self.budget = budget
 
     @overload
     def __call__(
@@ -37,8 +221,11 @@ class Retry:
         n_times: int = ...,
         sleep_duration: float = ...,
         increasing: bool = ...,
-        verbose: bool = ...,
+        verbose: bool | None = ...,
         allowed_exceptions: tuple[type[BaseException], ...] = ...,
+        deadline: float | None = ...,
+        max_sleep: float | None = ...,
+        retry_on: Callable[[BaseException], bool] = ...,
     ) -> Callable[[Callable[P, T]], Callable[P, T]]: ...
 
     @overload
@@ -47,8 +234,11 @@ class Retry:
         n_times: int = ...,
         sleep_duration: float = ...,
         increasing: bool = ...,
-        verbose: bool = ...,
+        verbose: bool | None = ...,
         allowed_exceptions: tuple[type[BaseException], ...] = ...,
+        deadline: float | None = ...,
+        max_sleep: float | None = ...,
+        retry_on: Callable[[BaseException], bool] = ...,
     ) -> Callable[
         [Callable[P, Coroutine[Any, Any, T]]], Callable[P, Coroutine[Any, Any, T]]
     ]: ...
@@ -58,78 +248,71 @@ class Retry:
         n_times: int = 5,
         sleep_duration: float = 1.2,
         increasing: bool = False,
-        verbose: bool = False,
+        verbose: bool | None = None,
         allowed_exceptions: tuple[type[BaseException], ...] = (Exception,),
+        deadline: float | None = None,
+        max_sleep: float | None = None,
+        retry_on: Callable[[BaseException], bool] = is_retryable,
     ) -> Callable[[AnyFunc], AnyFunc]:
-        self.n_times = n_times
-        self.sleep_duration = sleep_duration
-        self.increasing = increasing
-        self.verbose = verbose
+        """
+        `n_times` is the number of attempts. With `increasing` the sleeps grow
+        with decorrelated jitter up to `max_sleep` (`sleep_duration * n_times`
+        by default), a `Retry-After` from the server is never undercut.
+        `deadline` bounds the whole call, sleeps included: async attempts run
+        under a timeout of the time left, a retry that would start after it
+        is not made (sync attempts can not be interrupted, only the retries
+        are bounded). Without a deadline a `Retry-After` is capped by
+        `max_sleep`. `retry_on` filters the allowed exceptions, by default
+        client errors except 408/425/429 are raised at once.
+        """
 
         def decorator(func: AnyFunc) -> AnyFunc:
+            policy = RetryPolicy(
+                name=func.__qualname__,
+                n_times=max(n_times, 1),
+                sleep_duration=sleep_duration,
+                increasing=increasing,
+                verbose=self.verbose if verbose is None else verbose,
+                deadline=deadline,
+                max_sleep=max_sleep
+                if max_sleep is not None
+                else sleep_duration * n_times,
+                retry_on=retry_on,
+                budget=self.budget,
+            )
+
             @functools.wraps(func)
             async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
-                exc_info = (None, None, None)
-                for i in range(self.n_times):
+                state = policy.start()
+                while True:
+                    scope = asyncio.timeout(state.time_left)
                     try:
-                        return await func(*args, **kwargs)
-                    except allowed_exceptions as exc:
-                        sleep = (
-                            self.sleep_duration
-                            if not self.increasing
-                            else self._get_increasing_duration(i + 1)
-                        )
-                        sleep = round(sleep, 2)
-                        logging.warning(
-                            f"Retry {i + 1}/{self.n_times} (sleep: {sleep}s) of {func.__name__} failed: {exc}"
-                        )
-                        exc_info = sys.exc_info()
-                        if self.verbose:
-                            logging.warning(
-                                f"exc_info for {func.__name__}", exc_info=exc_info
-                            )
-                        await asyncio.sleep(sleep)
-                if exc_info[0] is not None:
-                    raise exc_info[1].with_traceback(exc_info[2])  # type: ignore
-                raise RuntimeError(
-                    f"{func.__name__} failed after {self.n_times} retries"
-                )
+                        async with scope:
+                            return await func(*args, **kwargs)
+                    except BaseException as exc:
+                        if scope.expired():
+                            # the attempt ran into the deadline, no time for another
+                            state.give_up("deadline")
+                            raise
+                        if not isinstance(exc, allowed_exceptions):
+                            raise
+                        sleep = state.next_sleep(exc)
+                        if sleep is None:
+                            raise
+                    await asyncio.sleep(sleep)
 
             @functools.wraps(func)
             def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
-                exc_info = (None, None, None)
-                for i in range(self.n_times):
+                state = policy.start()
+                while True:
                     try:
                         return func(*args, **kwargs)
                     except allowed_exceptions as exc:
-                        sleep = (
-                            self.sleep_duration
-                            if not self.increasing
-                            else self._get_increasing_duration(i + 1)
-                        )
-                        sleep = round(sleep, 2)
-                        logging.warning(
-                            f"Retry {i + 1}/{self.n_times} (sleep: {sleep}s) of {func.__name__} failed: {exc}"
-                        )
-                        exc_info = sys.exc_info()
-                        if self.verbose:
-                            logging.warning(
-                                f"exc_info for {func.__name__}", exc_info=exc_info
-                            )
-                        time.sleep(sleep)
-                if exc_info[0] is not None:
-                    raise exc_info[1].with_traceback(exc_info[2])
-                raise RuntimeError(
-                    f"{func.__name__} failed after {self.n_times} retries"
-                )
+                        sleep = state.next_sleep(exc)
+                        if sleep is None:
+                            raise
+                    time.sleep(sleep)
 
             return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
 
         return decorator
-
-    def _get_increasing_duration(self, step: int) -> float:
-        base = self.sleep_duration * (2 ** (step - 1))
-        max_duration = self.sleep_duration * self.n_times
-        duration = min(base, max_duration)
-        jitter = random.uniform(0.8, 1.2)
-        return duration * jitter
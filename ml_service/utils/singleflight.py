@@ -0,0 +1,70 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from ml_service.settings.metrics import Counters
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The caller running a computation was cancelled, followers have to retry."""
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls with the same key into one computation.
+
+    The first caller of a key (the leader) runs it, callers arriving while
+    it is in flight (followers) await its result or its exception. Nothing
+    is kept after it finishes, this is not a cache.
+    A cancelled follower does not affect the computation. A cancelled leader
+    cancels it and one of the followers starts it again.
+    Bound to the event loop of the first call.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._in_flight: dict[Hashable, asyncio.Future[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def _resolve(
+        self,
+        key: Hashable,
+        future: asyncio.Future[T],
+        result: T | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        self._in_flight.pop(key, None)
+        if error is None:
+            future.set_result(result)  # type: ignore[arg-type]
+            return
+        future.set_exception(error)
+        # followers get the error, without them it must not be logged as lost
+        future.exception()
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            Counters.SINGLEFLIGHT_CALLS.value.labels(self.name, "follower").inc()
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        Counters.SINGLEFLIGHT_CALLS.value.labels(self.name, "leader").inc()
+        future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            self._resolve(key, future, error=_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            self._resolve(key, future, error=exc)
+            raise
+        self._resolve(key, future, result=result)
+        return result
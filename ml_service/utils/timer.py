@@ -2,7 +2,8 @@ import time
 import asyncio
 from typing import TypeVar, ParamSpec
 from functools import wraps
-from collections.abc import Callable
+from contextlib import contextmanager
+from collections.abc import Callable, Iterator
 
 from ml_service.settings.logger import logger
 
@@ -44,3 +45,34 @@ def timer(func: Callable[P, T]) -> Callable[P, T | asyncio.Future]:
             logger.info(f"[Timer] {name}: {dt:0.3f} seconds")
 
     return sync_wrapper
+
+
+class StageTimings:
+    """
+    Collects wall-clock durations of named pipeline stages.
+    Works across awaits, so it can wrap both executor and I/O stages.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def as_dict(self) -> dict[str, float]:
+        return {name: round(dt, 4) for name, dt in self.stages.items()}
+
+    def server_timing(self) -> str:
+        """Formats the stages as a `Server-Timing` header value (milliseconds)."""
+        return ", ".join(
+            f"{name};dur={dt * 1000:.1f}" for name, dt in self.stages.items()
+        )
@@ -0,0 +1,47 @@
+"""
+Local stand-in for the DeepSeek chat completions API.
+
+Answers `POST /chat/completions` with `completion` as one message or,
+with `"stream": true`, as server-sent events of `chunk_size` characters.
+`usage` is reported as is, in the last chunk when the stream asks for it.
+Use it through `httpx.ASGITransport` or run it with uvicorn.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def create_app(
+    completion: str,
+    chunk_size: int = 8,
+    delay: float = 0.0,
+    usage: dict[str, int] | None = None,
+) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = []
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        app.state.requests.append(payload)
+        if not payload.get("stream"):
+            message = {"role": "assistant", "content": completion}
+            return JSONResponse({"choices": [{"message": message}], "usage": usage})
+
+        async def events() -> AsyncIterator[str]:
+            yield ": keep-alive\n\n"
+            for start in range(0, len(completion), chunk_size):
+                delta = {"content": completion[start : start + chunk_size]}
+                yield f"data: {json.dumps({'choices': [{'delta': delta}]})}\n\n"
+                await asyncio.sleep(delay)
+            if usage and payload.get("stream_options", {}).get("include_usage"):
+                yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
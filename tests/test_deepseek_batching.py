@@ -0,0 +1,95 @@
+import asyncio
+import json
+import re
+from typing import Any
+
+import pytest
+
+from ml_service.domains.extractors.multi_field.deepseek import (
+    BatchedDeepSeekMultiExtractor,
+)
+from ml_service.domains.llm.base import LLMClient, LLMResponse, PromptMessage
+
+
+class FakeLLM(LLMClient):
+    """Answers every text with its mileage, drops the text `drop` from batches."""
+
+    def __init__(self, drop: str | None = None) -> None:
+        self.drop = drop
+        self.prompts: list[str] = []
+
+    async def chat(self, prompt: list[PromptMessage], **kwargs: Any) -> LLMResponse:
+        content = prompt[-1].content
+        self.prompts.append(content)
+        if "Тексты:\n" not in content:
+            mileage = int(re.search(r"пробег (\d+)", content).group(1))
+            answer = {"mileage": mileage}
+        else:
+            items = json.loads(content.split("Тексты:\n", 1)[1])
+            answer = {
+                "results": [
+                    {"id": item["id"], "mileage": int(item["text"].split()[-1])}
+                    for item in items
+                    if item["text"] != self.drop
+                ]
+            }
+        return LLMResponse(
+            content=json.dumps(answer),
+            source=self.name,
+            data={"usage": {"prompt_tokens": len(content) // 4}},
+            prompt=prompt,
+            json_output=True,
+            error=None,
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_texts_are_batched_and_mapped_back():
+    llm = FakeLLM(drop="пробег 300")
+    extractor = BatchedDeepSeekMultiExtractor(llm, max_batch_size=4, batch_window=0.05)
+    texts = [f"пробег {mileage}" for mileage in (100, 200, 300, 400)]
+
+    results = await asyncio.gather(*(extractor.aextract_all(t) for t in texts))
+
+    mileages = [
+        next(f.value for f in r.content if f.field == "mileage") for r in results
+    ]
+    assert mileages == [100, 200, 300, 400]
+    # one batch, the text missing from its answer is extracted on its own
+    assert len(llm.prompts) == 2
+    assert "пробег 300" in llm.prompts[1] and "Тексты:\n" not in llm.prompts[1]
+    await extractor.batcher.aclose()
+
+
+class SlowLLM(FakeLLM):
+    """Takes `delay` seconds per request, counts the requests in flight."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def chat(self, prompt: list[PromptMessage], **kwargs: Any) -> LLMResponse:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return await super().chat(prompt, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_batches_overlap_up_to_the_concurrency_limit():
+    llm = SlowLLM(delay=0.2)
+    extractor = BatchedDeepSeekMultiExtractor(
+        llm, max_batch_size=2, batch_window=0.01, max_concurrency=2
+    )
+    texts = [f"пробег {mileage}" for mileage in (100, 200, 300, 400, 500, 600)]
+
+    await asyncio.gather(*(extractor.aextract_all(t) for t in texts))
+
+    assert len(llm.prompts) == 3
+    assert llm.max_in_flight == 2
+    await extractor.batcher.aclose()
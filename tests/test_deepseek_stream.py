@@ -0,0 +1,55 @@
+import json
+
+import httpx
+import pytest
+
+from ml_service.domains.extractors.base import ExtractionField, ExtractionResult
+from ml_service.domains.extractors.multi_field.deepseek import DeepSeekMultiExtractor
+from ml_service.domains.llm.deepseek import DeepSeekClient
+from ml_service.utils.json_stream import JSONObjectStream
+from tests.fake_deepseek import create_app
+
+COMPLETION = json.dumps(
+    {
+        "date": "2024-03-15",
+        "mileage": 120500,
+        "price": 15300,
+        "works": ["замена масла", "замена фильтра"],
+        "materials": [],
+    },
+    ensure_ascii=False,
+)
+
+
+def test_json_stream_emits_fields_once_complete():
+    parser = JSONObjectStream()
+    assert parser.feed('{"date": "2024-03') == []
+    assert parser.feed('-15", "mileage": 12') == [("date", "2024-03-15")]
+    assert parser.feed('0500, "works": ["a", "b"') == [("mileage", 120500)]
+    assert parser.feed("]}") == [("works", ["a", "b"])]
+    assert parser.done
+
+
+@pytest.mark.asyncio
+async def test_streaming_extraction_against_fake_server():
+    app = create_app(COMPLETION, chunk_size=5)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app), base_url="http://fake"
+    ) as client:
+        llm = DeepSeekClient(api_key="test", client=client)
+        llm.base_url = "http://fake"
+        extractor = DeepSeekMultiExtractor(llm)
+        items = [item async for item in extractor.astream_all("текст")]
+
+    fields = [item for item in items if isinstance(item, ExtractionField)]
+    result = items[-1]
+    assert [f.field for f in fields] == [
+        "date",
+        "mileage",
+        "price",
+        "works",
+        "materials",
+    ]
+    assert isinstance(result, ExtractionResult) and result.error is None
+    assert {f.field: f.value for f in result.content}["mileage"] == 120500
+    assert app.state.requests[0]["stream"] is True
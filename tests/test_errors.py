@@ -0,0 +1,54 @@
+import threading
+from io import BytesIO
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from PIL import Image
+
+from ml_service.api.errors import add_exception_handlers
+from ml_service.api.extract import extract_router
+from ml_service.domains.extractors.orchestrator import ExtractorOrchestrator
+from ml_service.domains.ocr.base import BaseOCRHandler, OCRResult
+from ml_service.domains.ocr.image import ImageEnvelope
+from ml_service.domains.pipeline import ExtractionPipeline
+from ml_service.utils.executors import BoundedExecutor, executors
+
+
+class LocalOCR(BaseOCRHandler):
+    def _process_image(self, image: ImageEnvelope) -> OCRResult:
+        return OCRResult(text="пробег 1000", confidence=1.0, engine=self.name)
+
+
+def png() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_saturated_ocr_executor_answers_503(monkeypatch):
+    ocr = BoundedExecutor("ocr", max_workers=1, max_queue=0)
+    monkeypatch.setitem(executors._executors, "ocr", ocr)
+    release = threading.Event()
+    ocr.submit(release.wait)
+
+    app = FastAPI()
+    add_exception_handlers(app)
+    app.include_router(extract_router)
+    app.state.pipeline = ExtractionPipeline(
+        LocalOCR(timeout=5), ExtractorOrchestrator()
+    )
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app), base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/extract", files={"file": ("page.png", png(), "image/png")}
+            )
+    finally:
+        release.set()
+        ocr.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,20 @@
+import httpx
+import pytest
+
+from ml_service.utils.http import HTTPClients
+
+
+def test_pool_internals_of_the_installed_httpcore():
+    pool = httpx.AsyncClient()._transport._pool
+    assert isinstance(pool.connections, list)
+    assert isinstance(pool._requests, list)
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_counts_the_pool_and_survives_other_transports():
+    async with httpx.AsyncClient() as client:
+        assert HTTPClients.pool_stats(client) == {"active": 0, "idle": 0, "pending": 0}
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200))
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert HTTPClients.pool_stats(client) == {"active": 0, "idle": 0, "pending": 0}
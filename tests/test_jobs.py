@@ -0,0 +1,71 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+
+from ml_service.domains.jobs import Job, JobQueue, JobStatus, utc_now
+
+
+class SlowStore:
+    """Saves take `delay` seconds, like an unreachable database."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.saved: list[JobStatus] = []
+
+    async def save(self, job: Job) -> None:
+        status = job.status
+        await asyncio.sleep(self.delay)
+        self.saved.append(status)
+
+    async def load(self, job_id: str) -> Job | None:
+        return None
+
+    async def fail_stale(self, before) -> int:
+        return 0
+
+
+async def process(data: bytes) -> dict:
+    return {"size": len(data)}
+
+
+@pytest.mark.asyncio
+async def test_saves_do_not_block_submit_and_end_with_the_final_state():
+    store = SlowStore(delay=0.2)
+    queue = JobQueue(process, workers=1, store=store)
+    queue.start()
+
+    start = time.monotonic()
+    job = await queue.submit(b"photo")
+    assert time.monotonic() - start < 0.1
+
+    statuses = [j.status async for j in queue.watch(job.id)]
+    assert statuses[-1] == JobStatus.DONE
+    await queue.aclose()
+    # saves write the current state of the job, one per change
+    assert len(store.saved) == 3
+    assert store.saved[-1] == JobStatus.DONE
+
+
+class OrphanStore(SlowStore):
+    """Holds a job of a worker that died while running it."""
+
+    def __init__(self, job: Job) -> None:
+        super().__init__(delay=0)
+        self.job = job
+
+    async def load(self, job_id: str) -> Job | None:
+        return Job(
+            id=self.job.id, status=self.job.status, started_at=self.job.started_at
+        )
+
+
+@pytest.mark.asyncio
+async def test_watch_fails_a_stale_job_of_another_worker():
+    orphan = Job(status=JobStatus.RUNNING, started_at=utc_now() - timedelta(minutes=20))
+    queue = JobQueue(process, store=OrphanStore(orphan), stale_after=10 * 60)
+
+    statuses = [job.status async for job in queue.watch(orphan.id)]
+
+    assert statuses == [JobStatus.FAILED]
@@ -0,0 +1,50 @@
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from ml_service.api.extract import extract_router
+from ml_service.domains.extractors.base import ExtractionField, ExtractionResult
+from ml_service.domains.extractors.orchestrator import ExtractorOrchestrator
+from ml_service.domains.pipeline import ExtractionPipeline, PipelineResult
+from tests.test_errors import LocalOCR, png
+
+
+class SilentOrchestrator(ExtractorOrchestrator):
+    """A stream that ends without a result."""
+
+    async def astream(
+        self, text: str
+    ) -> AsyncIterator[ExtractionField | ExtractionResult]:
+        return
+        yield
+
+
+@pytest.mark.asyncio
+async def test_stream_without_an_extraction_result_ends_with_an_error():
+    pipeline = ExtractionPipeline(LocalOCR(), SilentOrchestrator())
+
+    items = [item async for item in pipeline.astream(png())]
+
+    assert isinstance(items[-1], PipelineResult)
+    assert items[-1].extraction.content is None
+    assert items[-1].extraction.error == "No extraction result"
+
+
+@pytest.mark.asyncio
+async def test_too_many_files_are_rejected_before_they_are_read():
+    app = FastAPI()
+    app.include_router(extract_router)
+    app.state.pipeline = ExtractionPipeline(
+        LocalOCR(), SilentOrchestrator(), max_pages=2
+    )
+    files = [("files", (f"{i}.png", png(), "image/png")) for i in range(3)]
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app), base_url="http://test"
+    ) as client:
+        response = await client.post("/extract/pages", files=files)
+
+    assert response.status_code == 413
+    assert "3 pages" in response.json()["detail"]
@@ -0,0 +1,43 @@
+import httpx
+import pytest
+
+from ml_service.domains.extractors.multi_field.deepseek import DeepSeekMultiExtractor
+from ml_service.domains.llm.base import PromptRole
+from ml_service.domains.llm.deepseek import DeepSeekClient
+from ml_service.settings.metrics import Counters
+from tests.fake_deepseek import create_app
+from tests.test_deepseek_stream import COMPLETION
+
+USAGE = {
+    "prompt_tokens": 300,
+    "prompt_cache_hit_tokens": 256,
+    "prompt_cache_miss_tokens": 44,
+    "completion_tokens": 60,
+}
+
+
+def cache_tokens(cache: str) -> float:
+    return Counters.LLM_PROMPT_TOKENS.value.labels("DeepSeekClient", cache)._value.get()
+
+
+@pytest.mark.asyncio
+async def test_system_prefix_is_identical_and_cache_usage_is_exported():
+    app = create_app(COMPLETION, usage=USAGE)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app), base_url="http://fake"
+    ) as client:
+        llm = DeepSeekClient(api_key="test", client=client)
+        llm.base_url = "http://fake"
+        extractor = DeepSeekMultiExtractor(llm)
+        hits, misses = cache_tokens("hit"), cache_tokens("miss")
+
+        await extractor.aextract_all("пробег 1000")
+        async for _ in extractor.astream_all("пробег 2000"):
+            pass
+
+    first, second = (request["messages"] for request in app.state.requests)
+    assert first[0]["role"] == second[0]["role"] == PromptRole.SYSTEM
+    assert first[0]["content"] == second[0]["content"]
+    assert first[-1]["content"].endswith("пробег 1000")
+    assert cache_tokens("hit") - hits == 2 * 256
+    assert cache_tokens("miss") - misses == 2 * 44